@@ -18,18 +18,32 @@ import platform
 import re
 import json
 import argparse
+import atexit
+import contextlib
+import shutil
+import statistics
+import tempfile
+import threading
+import time
 import requests
-from typing import Any, Tuple, Optional, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Tuple, Optional, List, Iterator
 from serpapi import GoogleSearch
 
 from nexaai.llm import LLM, GenerationConfig
-from nexaai.common import ModelConfig, ChatMessage
+from nexaai.common import ModelConfig, ChatMessage, SamplerConfig
+from nexaai.embedder import Embedder, EmbeddingConfig
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 import sys
 import platform
 import os
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from serve_client.tool_grammar import tools_grammar
+from intent_router import ANSWER, IntentRouter, Route
+
 @dataclass
 class ModelInfo:
     """Model info for different platforms."""
@@ -64,8 +78,28 @@ def get_model_info() -> ModelInfo:
     # other
     return default_model
 
+def get_embedding_model_info() -> ModelInfo:
+    """Return the default embedding model (used by the intent router) for the current platform."""
+    gguf_model = ModelInfo(
+        model="jinaai/jina-embeddings-v4-text-retrieval-GGUF/jina-embeddings-v4-text-retrieval-Q4_K_M.gguf",
+        plugin_id="cpu_gpu",
+        device_id="cpu",
+    )
+    if sys.platform.startswith("win") and "arm" in platform.machine().lower():
+        # Windows ARM64
+        return ModelInfo(
+            model="NexaAI/embeddinggemma-300m-npu",
+            plugin_id="npu",
+            device_id="npu",
+        )
+    return gguf_model
+
 # Default model info
 DEFAULT_MODEL = get_model_info()
+DEFAULT_EMBED_MODEL = get_embedding_model_info()
+
+# Optional intent router, see enable_router()
+ROUTER: Optional[IntentRouter] = None
 
 # You can get a free API key from https://serpapi.com/
 SEARCH_API_KEY = "7467f292f9d4ce3324da285ca111ea11477ba7fc84ee7e9fa5f867a9d1b35856"
@@ -89,6 +123,7 @@ Output JSON for function calls:
 
 Rules:
 - JSON only for functions (no explanations)
+- For several independent requests, output one JSON function call per line
 - Summarize results in 2-3 sentences
 - Never invent function names
 
@@ -99,6 +134,10 @@ Assistant: {"name": "search_web", "arguments": {"query": "latest AI news"}}
 User: Save that.
 Assistant: {"name": "write_to_file", "arguments": {"file_path": "notes.txt"}}
 
+User: Nvidia news and the weather in Tokyo?
+Assistant: {"name": "search_web", "arguments": {"query": "Nvidia news"}}
+{"name": "search_web", "arguments": {"query": "Tokyo weather"}}
+
 User: Hello
 Assistant: How can I assist you today?
 """
@@ -132,6 +171,9 @@ FUNCTION_TOOLS = [
     }
 ]
 
+# Constrain tool decisions with a GBNF grammar built from FUNCTION_TOOLS
+USE_TOOL_GRAMMAR = True
+
 
 def search_web(query: str):
     """Search the web using SerpAPI"""
@@ -168,24 +210,41 @@ def write_to_file(file_path: str, content: str):
 FUNCTION_REGISTRY = {"search_web": search_web, "write_to_file": write_to_file}
 
 
-def handle_function_call(
-    func_name: str, func_args: dict, model: ModelInfo, system_prompt: str = ""
-):
-    """
-    Execute the registered function, print the tool result, then call Nexa to produce
-    a natural language summary based on the tool output.
-    """
+# Tool calls from one response run concurrently on this pool
+MAX_PARALLEL_TOOLS = 4
+_TOOL_POOL = ThreadPoolExecutor(max_workers=MAX_PARALLEL_TOOLS, thread_name_prefix="tool")
+
+
+def _tool_args(func_args) -> dict:
     if isinstance(func_args, str):
         try:
-            func_args = json.loads(func_args)
+            return json.loads(func_args)
         except json.JSONDecodeError:
-            func_args = {}
+            return {}
+    return func_args
 
-    tool_result = FUNCTION_REGISTRY[func_name](**func_args)
 
-    # Customize prompt based on function type
-    if func_name == "search_web":
-        user_followup_prompt = f"""
+def _save_last_message(func_args: dict, last_message: str) -> str:
+    file_path = func_args.get("file_path") or func_args.get("path")
+    write_to_file(file_path, last_message)
+    return f"Saved the previous answer to {file_path}"
+
+
+def submit_tool(func_name: str, func_args: dict, last_message: str = "") -> Future:
+    """Start a registered function on the tool pool. write_to_file saves last_message."""
+    func_args = _tool_args(func_args)
+    if func_name == "write_to_file":
+        return _TOOL_POOL.submit(_save_last_message, func_args, last_message)
+    return _TOOL_POOL.submit(FUNCTION_REGISTRY[func_name], **func_args)
+
+
+def _followup_prompt(results: List[Tuple[str, dict, Any]]) -> str:
+    """Follow-up prompt asking for a summary of one or more tool results."""
+    if len(results) == 1:
+        func_name, func_args, tool_result = results[0]
+        # Customize prompt based on function type
+        if func_name == "search_web":
+            return f"""
         You called search_web with query: {func_args.get('query')}
         
         Here are the search results:
@@ -199,8 +258,7 @@ def handle_function_call(
         
         Be verbose and helpful. Do NOT call any function again.
         """
-    else:
-        user_followup_prompt = f"""
+        return f"""
         You previously decided to call the function `{func_name}` with arguments {func_args}.
         Here is the result returned by that function:
 
@@ -210,58 +268,243 @@ def handle_function_call(
         Do NOT call any function again.
         """
 
+    sections = "\n".join(
+        f"""
+        {i}. You called `{func_name}` with arguments {func_args}. Result:
+        {tool_result}
+        """
+        for i, (func_name, func_args, tool_result) in enumerate(results, 1)
+    )
+    return f"""
+        You called several functions at once. Here are their results:
+        {sections}
+        Please answer the user's request using all of these results. For web search results, summarize
+        the key information in 2-3 bullet points per search and mention the sources.
+        Do NOT call any function again.
+        """
+
+
+def summarize_tool_results(results: List[Tuple[str, dict, Any]], model: ModelInfo, system_prompt: str = ""):
+    """Stream a natural language summary of (function name, arguments, result) tuples."""
     try:
         # Pass system prompt for NPU compatibility
-        for piece in nexa_chat_stream(model, user_followup_prompt, system_prompt):
-            yield piece
+        with contextlib.closing(nexa_chat_stream(model, _followup_prompt(results), system_prompt)) as pieces:
+            yield from pieces
     except Exception as e:
         print(f"[error] failed to call nexa for followup: {e}")
         yield f"\n[Error: {e}]"
         return
 
 
-def nexa_chat_stream(model: ModelInfo, prompt: str, system_prompt: str = ""):
+def handle_function_call(
+    func_name: str, func_args: dict, model: ModelInfo, system_prompt: str = ""
+):
     """
-    Generate streaming conversation with local LLM
-    NPU requires system prompt to be passed during model creation via ModelConfig
+    Execute the registered function, print the tool result, then call Nexa to produce
+    a natural language summary based on the tool output.
     """
-    m_cfg = ModelConfig(
-        system_prompt=system_prompt  # Pass system prompt for NPU plugin
-    )
-    llm = LLM.from_(model.model, plugin_id=model.plugin_id, device_id=model.device_id, m_cfg=m_cfg)
+    func_args = _tool_args(func_args)
+    tool_result = FUNCTION_REGISTRY[func_name](**func_args)
+    yield from summarize_tool_results([(func_name, func_args, tool_result)], model, system_prompt)
 
-    messages: List[ChatMessage] = [ChatMessage(role="user", content=prompt)]
-    prompt = llm.apply_chat_template(messages)
 
-    for token in llm.generate_stream(prompt, g_cfg=GenerationConfig(max_tokens=512)):
-        yield token
+@dataclass
+class LLMSession:
+    """
+    A long-lived LLM for one (model, plugin, device, system prompt).
+
+    The KV state of the prompt prefix (system prompt and, for the decision call,
+    the tool schema) is prefilled once and saved to a file. Before each call the
+    context is reset and that file loaded, so only the new user text is prefilled.
+    Plugins without KV save/load (e.g. NPU) fall back to a plain reset.
+    """
+    llm: LLM
+    lock: threading.Lock
+    prefix_kv: dict = field(default_factory=dict)  # with tools? -> KV cache file
+    kv_supported: bool = True
+    ttft_ms: List[float] = field(default_factory=list)
+
+
+_SESSIONS: dict = {}
+_SESSIONS_LOCK = threading.Lock()
+# How long a call waits for a session another stream is using
+SESSION_LOCK_TIMEOUT_S = 300
+_KV_DIR: Optional[str] = None
+
+# Placeholder user message used to cut the rendered template at the prefix end
+_PREFIX_MARKER = "<<prefix-end>>"
+
+
+def _kv_dir() -> str:
+    global _KV_DIR
+    if _KV_DIR is None:
+        _KV_DIR = tempfile.mkdtemp(prefix="granite-agent-kv-")
+        atexit.register(shutil.rmtree, _KV_DIR, ignore_errors=True)
+    return _KV_DIR
+
+
+def get_session(model: ModelInfo, system_prompt: str = "") -> LLMSession:
+    """Return the shared session for the model, loading it on first use."""
+    key = (model.model, model.plugin_id, model.device_id, system_prompt)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            m_cfg = ModelConfig(
+                system_prompt=system_prompt  # Pass system prompt for NPU plugin
+            )
+            llm = LLM.from_(model.model, plugin_id=model.plugin_id, device_id=model.device_id, m_cfg=m_cfg)
+            session = LLMSession(llm=llm, lock=threading.Lock())
+            _SESSIONS[key] = session
+        return session
 
 
-def nexa_chat_completion(model: ModelInfo, messages: list, system_prompt: str = ""):
+def _apply_template(llm: LLM, messages: list, tools: Optional[list]) -> str:
+    if tools:
+        return llm.apply_chat_template(messages, tools=tools)
+    return llm.apply_chat_template(messages)
+
+
+def _restore_prefix(session: LLMSession, tools: Optional[list]) -> None:
     """
-    Non-streaming conversation with local LLM
-    NPU requires system prompt to be passed during model creation via ModelConfig
+    Reset the context to the cached prompt prefix, prefilling and saving it first
+    if needed. The engine reuses the longest common prefix of the KV cache and
+    the next prompt, so the full prompt can be passed to generate afterwards.
     """
-    m_cfg = ModelConfig(
-        system_prompt=system_prompt  # Pass system prompt for NPU plugin
-    )
-    
-    llm = LLM.from_(model.model, plugin_id=model.plugin_id, device_id=model.device_id, m_cfg=m_cfg)
-
+    session.llm.reset()
+    if not session.kv_supported:
+        return
+    key = bool(tools)
+    try:
+        path = session.prefix_kv.get(key)
+        if path is None:
+            rendered = _apply_template(session.llm, [ChatMessage(role="user", content=_PREFIX_MARKER)], tools)
+            prefix = rendered[: rendered.index(_PREFIX_MARKER)]
+            session.llm.generate(prefix, g_cfg=GenerationConfig(max_tokens=1))
+            path = os.path.join(_kv_dir(), f"{id(session)}-{'tools' if key else 'chat'}.kv")
+            session.llm.save_kv_cache(path)
+            session.prefix_kv[key] = path
+            session.llm.reset()
+        session.llm.load_kv_cache(path)
+    except Exception as e:
+        print(f"[info] prefix KV cache not available, prefilling every call: {e}")
+        session.kv_supported = False
+        session.llm.reset()
+
+
+def _generate_stream(
+    session: LLMSession,
+    messages: list,
+    tools: Optional[list] = None,
+    max_tokens: int = 512,
+    grammar: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Stream tokens for messages on a session, recording the time to first token.
+    The session stays locked until the stream is exhausted or closed, so callers
+    that may stop early should close it (e.g. with contextlib.closing).
+    """
+    if grammar:
+        sampler_config = SamplerConfig()
+        sampler_config.grammar_string = grammar
+        g_cfg = GenerationConfig(max_tokens=max_tokens, sampler_config=sampler_config)
+    else:
+        g_cfg = GenerationConfig(max_tokens=max_tokens)
+    if not session.lock.acquire(timeout=SESSION_LOCK_TIMEOUT_S):
+        raise RuntimeError(
+            f"LLM session busy for over {SESSION_LOCK_TIMEOUT_S}s: an earlier response stream "
+            "was neither finished nor closed"
+        )
+    try:
+        _restore_prefix(session, tools)
+        prompt = _apply_template(session.llm, messages, tools)
+        start = time.perf_counter()
+        first = True
+        stream = session.llm.generate_stream(prompt, g_cfg=g_cfg)
+        try:
+            for token in stream:
+                if first:
+                    session.ttft_ms.append((time.perf_counter() - start) * 1000)
+                    first = False
+                yield token
+        finally:
+            # Stops decoding when the caller closes this generator early
+            stream.close()
+    finally:
+        session.lock.release()
+
+
+def _chat_messages(model: ModelInfo, messages: list) -> list:
     if model.plugin_id == 'npu':
         # Convert messages to ChatMessage format, excluding system messages
         # (system prompt is already in model config for NPU)
-        chat_messages = [
+        return [
             ChatMessage(role=msg["role"], content=msg["content"])
             for msg in messages
             if msg["role"] != "system"  # Skip system messages - already in ModelConfig
         ]
-    else:
-        chat_messages = messages
+    return messages
 
-    prompt = llm.apply_chat_template(chat_messages, tools=FUNCTION_TOOLS)
 
-    return llm.generate(prompt, g_cfg=GenerationConfig(max_tokens=512))
+def nexa_chat_stream(model: ModelInfo, prompt: str, system_prompt: str = ""):
+    """
+    Generate streaming conversation with local LLM
+    NPU requires system prompt to be passed during model creation via ModelConfig
+    """
+    session = get_session(model, system_prompt)
+    messages: List[ChatMessage] = [ChatMessage(role="user", content=prompt)]
+    yield from _generate_stream(session, messages)
+
+
+def nexa_decision_stream(model: ModelInfo, messages: list, system_prompt: str = ""):
+    """
+    Stream the tool decision response (messages rendered with FUNCTION_TOOLS).
+    Close the generator to stop generation early.
+
+    With USE_TOOL_GRAMMAR, decoding is constrained to either a valid call of one
+    of FUNCTION_TOOLS or a plain-text answer, so calls parse on the first try.
+    """
+    session = get_session(model, system_prompt)
+    grammar = tools_grammar(FUNCTION_TOOLS, allow_text=True, parallel=True) if USE_TOOL_GRAMMAR else None
+    yield from _generate_stream(session, _chat_messages(model, messages), tools=FUNCTION_TOOLS, grammar=grammar)
+
+
+def nexa_chat_completion(model: ModelInfo, messages: list, system_prompt: str = ""):
+    """
+    Non-streaming conversation with local LLM
+    NPU requires system prompt to be passed during model creation via ModelConfig
+    """
+    return "".join(nexa_decision_stream(model, messages, system_prompt))
+
+
+def bench_ttft(model: ModelInfo, query: str, rounds: int = 5) -> None:
+    """
+    Print the TTFT of the tool decision call with a new LLM per call (the previous
+    behaviour, model load excluded) and with the shared session and prefix KV cache.
+    """
+    messages = _chat_messages(model, [{"role": "user", "content": query}])
+
+    fresh = []
+    for _ in range(rounds):
+        llm = LLM.from_(
+            model.model, plugin_id=model.plugin_id, device_id=model.device_id,
+            m_cfg=ModelConfig(system_prompt=SYSTEM_PROMPT),
+        )
+        prompt = llm.apply_chat_template(messages, tools=FUNCTION_TOOLS)
+        start = time.perf_counter()
+        for _ in llm.generate_stream(prompt, g_cfg=GenerationConfig(max_tokens=1)):
+            fresh.append((time.perf_counter() - start) * 1000)
+            break
+        del llm
+
+    session = get_session(model, SYSTEM_PROMPT)
+    session.ttft_ms.clear()
+    for _ in range(rounds):
+        for _ in _generate_stream(session, messages, tools=FUNCTION_TOOLS, max_tokens=1):
+            pass
+
+    print(f"[bench] TTFT new LLM per call: median {statistics.median(fresh):.1f} ms over {rounds} calls")
+    print(f"[bench] TTFT persistent LLM:   median {statistics.median(session.ttft_ms):.1f} ms over {rounds} calls"
+          + ("" if session.kv_supported else " (prefix KV cache not supported by this plugin)"))
 
 
 def extract_function_call(text: str) -> Optional[Tuple[str, dict]]:
@@ -313,14 +556,136 @@ def extract_function_call(text: str) -> Optional[Tuple[str, dict]]:
     return None
 
 
+class ToolCallDetector:
+    """
+    Incremental detector for {"name": ..., "arguments": ...} objects in a token stream.
+
+    feed() returns the text that can be shown right away. Text from an opening
+    brace is held back until the braces balance: a complete call with a known
+    function name is appended to `calls`, any other JSON is released as text.
+    After a call, further calls may follow (separated by whitespace, commas or
+    brackets); anything else sets `done` and the caller stops generating.
+    """
+
+    def __init__(self, names):
+        self.names = set(names)
+        self.calls: List[Tuple[str, dict]] = []
+        self.done = False
+        self._candidate = ""
+        self._lead = ""  # leading whitespace or "[" that may open a list of calls
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, piece: str) -> str:
+        out = []
+        for c in piece:
+            if self.done:
+                break
+            if not self._candidate:
+                if c == "{":
+                    self._candidate = c
+                    self._depth = 1
+                elif self.calls:
+                    if c not in " \t\r\n,[]":
+                        self.done = True
+                elif not out and c in " \t\r\n[":
+                    self._lead += c
+                else:
+                    out.append(self._lead + c)
+                    self._lead = ""
+                continue
+
+            self._candidate += c
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    call = self._parse(self._candidate)
+                    if call:
+                        self.calls.append(call)
+                    elif self.calls:
+                        self.done = True
+                    else:
+                        out.append(self._lead + self._candidate)
+                    self._candidate = self._lead = ""
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Release held-back text of an unfinished object at the end of the stream."""
+        rest = self._candidate if self.calls else self._lead + self._candidate
+        self._candidate = self._lead = ""
+        return rest
+
+    def _parse(self, text: str) -> Optional[Tuple[str, dict]]:
+        try:
+            parsed = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(parsed, dict) or parsed.get("name") not in self.names or "arguments" not in parsed:
+            return None
+        args = parsed["arguments"]
+        if isinstance(args, str):
+            try:
+                args = json.loads(args)
+            except json.JSONDecodeError:
+                return None
+        return parsed["name"], args
+
+
+def enable_router(embed_model: ModelInfo = DEFAULT_EMBED_MODEL, threshold: float = 0.6, margin: float = 0.05) -> IntentRouter:
+    """Route queries with an embedding model before asking the LLM to decide."""
+    global ROUTER
+    embedder = Embedder.from_(name_or_path=embed_model.model, plugin_id=embed_model.plugin_id)
+
+    def embed(texts: List[str]):
+        return embedder.generate(texts=texts, config=EmbeddingConfig(batch_size=len(texts)))
+
+    ROUTER = IntentRouter(embed, threshold=threshold, margin=margin)
+    return ROUTER
+
+
+def routed_call(intent: str, query: str) -> Optional[Tuple[str, dict]]:
+    """
+    Build the function call for a routed tool intent from the query alone, or
+    return None when the arguments cannot be derived (the LLM decides instead).
+    """
+    if intent == "search_web":
+        return "search_web", {"query": query}
+    if intent == "write_to_file":
+        match = re.search(r"[\w./\\-]+\.[A-Za-z0-9]{1,5}\b", query)
+        if match:
+            return "write_to_file", {"file_path": match.group(0)}
+    return None
+
+
 def nexa_start_search_stream(
     query: str,
     last_message: str = "",
     model: ModelInfo = DEFAULT_MODEL,
+    router: Optional[IntentRouter] = None,
 ):
     """
     Main agent function that handles user query and function calling.
     Yields JSON-formatted status messages.
+
+    With a router (or ROUTER set by enable_router), confidently classified
+    queries skip the LLM tool decision; the others fall back to it.
+
+    The decision response is streamed: plain text reaches the user as it is
+    generated, and generation stops once the function calls are complete. Each
+    call starts on the tool pool as soon as it is parsed, and the results are
+    summarized together in one follow-up.
     """
     # For NPU, don't include system prompt in messages - pass it via ModelConfig
     messages = [
@@ -329,86 +694,110 @@ def nexa_start_search_stream(
 
     try:
         yield json.dumps({"status": "proccess", "message": "Starting analysis..."})
-        # Pass system prompt via ModelConfig for NPU compatibility
-        result = nexa_chat_completion(model, messages, system_prompt=SYSTEM_PROMPT)
-
-        # Try to extract function call using helper function
-        function_call = extract_function_call(result)
 
-        if function_call:
-            func_name, func_args = function_call
-
-            # Validate function exists in registry
-            if func_name in FUNCTION_REGISTRY:
+        router = router or ROUTER
+        route: Optional[Route] = router.route(query) if router else None
+        calls: List[Tuple[str, dict]] = []
+        futures: List[Future] = []
+        if route and route.intent == ANSWER:
+            router.record_routed(route)
+            yield json.dumps({"status": "proccess", "message": f"Routed: direct answer ({route.score:.2f})"})
+            # closing() releases the session even if the caller abandons this generator
+            with contextlib.closing(nexa_chat_stream(model, query, SYSTEM_PROMPT)) as pieces:
+                for piece in pieces:
+                    yield json.dumps({"status": "stream", "message": piece})
+            return
+        if route and route.intent:
+            function_call = routed_call(route.intent, query)
+            if function_call:
+                router.record_routed(route)
+                yield json.dumps({"status": "proccess", "message": f"Routed: {route.intent} ({route.score:.2f})"})
+                calls.append(function_call)
+
+        if not calls:
+            # Pass system prompt via ModelConfig for NPU compatibility
+            detector = ToolCallDetector(FUNCTION_REGISTRY)
+            start = time.perf_counter()
+            decision_ms = None
+            with contextlib.closing(nexa_decision_stream(model, messages, system_prompt=SYSTEM_PROMPT)) as stream:
+                for token in stream:
+                    text = detector.feed(token)
+                    if decision_ms is None and (text.strip() or detector.calls):
+                        decision_ms = (time.perf_counter() - start) * 1000
+                    if text:
+                        yield json.dumps({"status": "stream", "message": text})
+                    # Start each tool as soon as its call is parsed, while later calls decode
+                    for func_name, func_args in detector.calls[len(futures):]:
+                        futures.append(submit_tool(func_name, func_args, last_message))
+                    if detector.done:
+                        break
+
+            calls = detector.calls
+            rest = detector.flush()
+            if rest:
+                # Unbalanced JSON at the end, e.g. cut off by max_tokens: try the lenient parser
+                function_call = extract_function_call(rest)
+                if function_call is not None and function_call[0] in FUNCTION_REGISTRY:
+                    calls.append(function_call)
+                elif not calls:
+                    yield json.dumps({"status": "stream", "message": rest})
+            if route:
+                # Not confident, or the routed tool's arguments could not be derived from the query
+                llm_intent = calls[0][0] if calls else ANSWER
+                router.record_fallback(route, llm_intent, decision_ms or (time.perf_counter() - start) * 1000)
+            if not calls:
+                return
+
+        for func_name, func_args in calls:
+            yield json.dumps(
+                {
+                    "status": "function",
+                    "message": json.dumps(
+                        {"name": func_name, "arguments": func_args}
+                    ),
+                }
+            )
+        for func_name, func_args in calls[len(futures):]:
+            futures.append(submit_tool(func_name, func_args, last_message))
+
+        yield json.dumps(
+            {"status": "proccess", "message": "Function calling..."}
+        )
+        # Wait for all tools; the turn takes as long as the slowest one
+        results: List[Tuple[str, dict, Any]] = []
+        for (func_name, func_args), future in zip(calls, futures):
+            try:
+                results.append((func_name, func_args, future.result()))
+            except Exception as e:
                 yield json.dumps(
-                    {
-                        "status": "function",
-                        "message": json.dumps(
-                            {"name": func_name, "arguments": func_args}
-                        ),
-                    }
+                    {"status": "function_call_error", "message": f"{e}"}
                 )
-
-                if func_name == "write_to_file":
-                    yield json.dumps(
-                        {"status": "proccess", "message": "Function calling..."}
-                    )
-
-                    file_path = func_args.get("file_path") or func_args.get("path")
-                    write_to_file(file_path, last_message)
-
+                # try again
+                try:
+                    results.append((func_name, func_args, submit_tool(func_name, func_args, last_message).result()))
+                except Exception as retry_error:
                     yield json.dumps(
                         {
-                            "status": "proccess",
-                            "message": "Function call finished.",
+                            "status": "error",
+                            "message": f"Retry failed: {retry_error}",
                         }
                     )
+                    results.append((func_name, func_args, f"Error: {retry_error}"))
+        yield json.dumps(
+            {
+                "status": "proccess",
+                "message": "Function call finished.",
+            }
+        )
 
-                    message = f"Successfully saved the previous answer to **{file_path}**. You can check it anytime!"
-                    yield json.dumps({"status": "stream", "message": message})
-                else:
-                    # Execute the function and stream results
-                    try:
-                        yield json.dumps(
-                            {"status": "proccess", "message": "Function calling..."}
-                        )
-                        flag = False
-                        for piece in handle_function_call(
-                            func_name, func_args, model, SYSTEM_PROMPT
-                        ):
-                            if not flag:
-                                yield json.dumps(
-                                    {
-                                        "status": "proccess",
-                                        "message": "Function call finished.",
-                                    }
-                                )
-                                flag = True
-
-                            yield json.dumps({"status": "stream", "message": piece})
-                    except Exception as e:
-                        yield json.dumps(
-                            {"status": "function_call_error", "message": f"{e}"}
-                        )
-                        # try again
-                        try:
-                            for piece in handle_function_call(
-                                func_name, func_args, model, SYSTEM_PROMPT
-                            ):
-                                yield json.dumps({"status": "stream", "message": piece})
-                        except Exception as retry_error:
-                            yield json.dumps(
-                                {
-                                    "status": "error",
-                                    "message": f"Retry failed: {retry_error}",
-                                }
-                            )
-            else:
-                # Function not in registry, treat as regular response
-                yield json.dumps({"status": "stream", "message": result})
+        if all(func_name == "write_to_file" for func_name, _, _ in results):
+            for _, func_args, _ in results:
+                file_path = _tool_args(func_args).get("file_path") or _tool_args(func_args).get("path")
+                message = f"Successfully saved the previous answer to **{file_path}**. You can check it anytime!"
+                yield json.dumps({"status": "stream", "message": message})
         else:
-            # No function call detected, treat as regular response
-            yield json.dumps({"status": "stream", "message": result})
+            for piece in summarize_tool_results(results, model, SYSTEM_PROMPT):
+                yield json.dumps({"status": "stream", "message": piece})
 
     except (ConnectionError, TimeoutError) as e:
         yield json.dumps({"status": "error", "message": f"Connection error: {e}"})
@@ -426,12 +815,30 @@ def main():
     ap.add_argument("--model", default=DEFAULT_MODEL.model, help="Nexa model path.")
     ap.add_argument("--plugin_id", default=DEFAULT_MODEL.plugin_id, help="Plugin id.")
     ap.add_argument("--device_id", default=DEFAULT_MODEL.device_id, help="Device id")
+    ap.add_argument("--bench-ttft", type=int, default=0, metavar="N",
+                    help="Compare the TTFT of N decision calls with and without the persistent LLM, then exit.")
+    ap.add_argument("--router", action="store_true", help="Route queries with an embedding model first.")
+    ap.add_argument("--embed_model", default=DEFAULT_EMBED_MODEL.model, help="Embedding model for the router.")
+    ap.add_argument("--embed_plugin_id", default=DEFAULT_EMBED_MODEL.plugin_id, help="Embedding plugin id.")
+    ap.add_argument("--router-threshold", type=float, default=0.6, help="Minimum similarity to route a query.")
+    ap.add_argument("--router-margin", type=float, default=0.05, help="Minimum lead over the second intent.")
+    ap.add_argument("--eval-router", action="store_true", help="Print router accuracy on labelled queries, then exit.")
     args = ap.parse_args()
 
+    model = ModelInfo(model=args.model, plugin_id=args.plugin_id, device_id=args.device_id)
+    if args.bench_ttft > 0:
+        bench_ttft(model, "What's the latest AI news?", args.bench_ttft)
+        return
+    if args.router or args.eval_router:
+        embed_model = ModelInfo(model=args.embed_model, plugin_id=args.embed_plugin_id, device_id="")
+        router = enable_router(embed_model, args.router_threshold, args.router_margin)
+        if args.eval_router:
+            print(f"[router] {json.dumps(router.evaluate())}")
+            return
+
     print(f"[info] Ready. Using model={args.model}, plugin_id={args.plugin_id}, device_id={args.device_id}")
     print("Type your question (or just press Enter to quit):")
     
-    model = ModelInfo(model=args.model, plugin_id=args.plugin_id, device_id=args.device_id)
     last_message = ""
     while True:
         try:
@@ -478,6 +885,9 @@ def main():
             print(f"\n[error] {e}")
             continue
 
+    if ROUTER is not None:
+        print(f"[router] {json.dumps(ROUTER.stats.summary())}")
+
 
 if __name__ == "__main__":
     main()
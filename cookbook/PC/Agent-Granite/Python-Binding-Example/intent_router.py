@@ -0,0 +1,205 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Embedding-based intent router for the Granite agent.
+
+The query is embedded and compared (cosine) with exemplar queries of each
+intent. If the best intent scores above `threshold` and beats the runner-up
+by `margin`, the agent acts on it without asking the LLM to decide; otherwise
+it falls back to the LLM decision. `RouterStats` keeps coverage, agreement
+with the LLM on fallbacks and the decision time saved.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Intent that answers directly, without a tool
+ANSWER = "answer"
+
+EXEMPLARS: Dict[str, List[str]] = {
+    "search_web": [
+        "What's the latest AI news?",
+        "Search the web for the newest iPhone release date",
+        "Who won the football game last night?",
+        "What is the weather in Paris today?",
+        "Find recent articles about electric cars",
+        "Look up the current stock price of Nvidia",
+        "What happened in the news this morning?",
+    ],
+    "write_to_file": [
+        "Save that to notes.txt",
+        "Write the previous answer to a file",
+        "Save this conversation to notes.md",
+        "Store the summary in report.txt",
+        "Put that answer into a file called todo.txt",
+    ],
+    ANSWER: [
+        "Hello",
+        "How are you?",
+        "Thanks, that was helpful!",
+        "Explain what a linked list is",
+        "Write a haiku about autumn",
+        "What can you do?",
+        "Translate 'good morning' into Spanish",
+    ],
+}
+
+# Labelled queries for --eval-router, distinct from the exemplars
+EVAL_QUERIES: List[Tuple[str, str]] = [
+    ("Any news about the Mars mission this week?", "search_web"),
+    ("Search for the best pizza places in Chicago", "search_web"),
+    ("What is the exchange rate of euro to dollar right now?", "search_web"),
+    ("Who is the current CEO of OpenAI?", "search_web"),
+    ("Save it to summary.txt", "write_to_file"),
+    ("Write this down in meeting_notes.md", "write_to_file"),
+    ("Please store the answer in a file named result.txt", "write_to_file"),
+    ("Hi there!", ANSWER),
+    ("Tell me a joke", ANSWER),
+    ("What does recursion mean in programming?", ANSWER),
+    ("Good night", ANSWER),
+]
+
+
+def _normalize(vec: Sequence[float]) -> List[float]:
+    values = [float(v) for v in vec]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def _dot(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+@dataclass
+class Route:
+    """Routing result. `intent` is None when the router is not confident."""
+    intent: Optional[str]
+    best: str
+    score: float
+    margin: float
+    elapsed_ms: float
+
+
+@dataclass
+class RouterStats:
+    queries: int = 0
+    routed: int = 0
+    fallbacks: int = 0
+    # On fallbacks: how often the router's best intent matched the LLM decision
+    shadow_checked: int = 0
+    shadow_agreed: int = 0
+    router_ms: float = 0.0
+    decision_ms: List[float] = field(default_factory=list)
+
+    def summary(self) -> Dict[str, float]:
+        """Coverage, shadow accuracy and estimated time saved (routed turns x mean LLM decision time)."""
+        mean_decision = sum(self.decision_ms) / len(self.decision_ms) if self.decision_ms else 0.0
+        mean_router = self.router_ms / self.queries if self.queries else 0.0
+        return {
+            "queries": self.queries,
+            "routed": self.routed,
+            "coverage": round(self.routed / self.queries, 3) if self.queries else 0.0,
+            "shadow_accuracy": round(self.shadow_agreed / self.shadow_checked, 3) if self.shadow_checked else 0.0,
+            "mean_router_ms": round(mean_router, 1),
+            "mean_llm_decision_ms": round(mean_decision, 1),
+            "est_saved_ms": round(self.routed * max(mean_decision - mean_router, 0.0), 1),
+        }
+
+
+class IntentRouter:
+    """
+    Classify queries against per-intent exemplar embeddings.
+
+    Args:
+        embed: Function that embeds a list of texts (e.g. the binding's Embedder)
+        exemplars: Example queries per intent; ANSWER means no tool
+        threshold: Minimum cosine similarity of the best intent
+        margin: Minimum lead of the best intent over the runner-up
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], Sequence[Sequence[float]]],
+        exemplars: Optional[Dict[str, List[str]]] = None,
+        threshold: float = 0.6,
+        margin: float = 0.05,
+    ):
+        self.embed = embed
+        self.exemplars = exemplars or EXEMPLARS
+        self.threshold = threshold
+        self.margin = margin
+        self.stats = RouterStats()
+        self._vectors: Optional[List[Tuple[str, List[float]]]] = None
+        self._lock = threading.Lock()
+
+    def _exemplar_vectors(self) -> List[Tuple[str, List[float]]]:
+        with self._lock:
+            if self._vectors is None:
+                texts = [(intent, t) for intent, ts in self.exemplars.items() for t in ts]
+                vecs = self.embed([t for _, t in texts])
+                self._vectors = [(intent, _normalize(v)) for (intent, _), v in zip(texts, vecs)]
+            return self._vectors
+
+    def route(self, query: str) -> Route:
+        exemplars = self._exemplar_vectors()
+        start = time.perf_counter()
+        q = _normalize(self.embed([query])[0])
+        best: Dict[str, float] = {}
+        for intent, vec in exemplars:
+            best[intent] = max(best.get(intent, -1.0), _dot(q, vec))
+        ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+        top, score = ranked[0]
+        margin = score - ranked[1][1] if len(ranked) > 1 else score
+        elapsed = (time.perf_counter() - start) * 1000
+
+        confident = score >= self.threshold and margin >= self.margin
+        self.stats.queries += 1
+        self.stats.router_ms += elapsed
+        return Route(top if confident else None, top, score, margin, elapsed)
+
+    def record_routed(self, route: Route) -> None:
+        """Record a query answered on the router's decision."""
+        self.stats.routed += 1
+
+    def record_fallback(self, route: Route, llm_intent: str, decision_ms: float) -> None:
+        """Record what the LLM decided for a query the router passed on."""
+        self.stats.fallbacks += 1
+        self.stats.shadow_checked += 1
+        self.stats.shadow_agreed += route.best == llm_intent
+        self.stats.decision_ms.append(decision_ms)
+
+    def evaluate(self, labelled: Optional[List[Tuple[str, str]]] = None) -> Dict[str, float]:
+        """Accuracy of confident routes and of the best intent over labelled queries."""
+        labelled = labelled or EVAL_QUERIES
+        routed = correct = best_correct = 0
+        stats, self.stats = self.stats, RouterStats()
+        for query, label in labelled:
+            r = self.route(query)
+            best_correct += r.best == label
+            if r.intent is not None:
+                routed += 1
+                correct += r.intent == label
+        self.stats = stats
+        return {
+            "queries": len(labelled),
+            "coverage": round(routed / len(labelled), 3),
+            "routed_accuracy": round(correct / routed, 3) if routed else 0.0,
+            "top1_accuracy": round(best_correct / len(labelled), 3),
+        }
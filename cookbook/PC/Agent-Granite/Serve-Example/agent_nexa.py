@@ -22,9 +22,14 @@ from typing import Any, Tuple, Optional
 from serpapi import GoogleSearch
 
 from dataclasses import dataclass
+from pathlib import Path
 import sys
 import platform
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from serve_client import get_client
+from serve_client.sse import iter_chat_content
+
 # Nexa config
 if sys.platform == "darwin":
     DEFAULT_MODEL = "NexaAI/granite-4.0-micro-GGUF"
@@ -162,18 +167,12 @@ def handle_function_call(func_name: str, func_args: dict, model: str, endpoint:
 
 
 # Nexa low-level call with better error handling
-def _post_json(url: str, payload: dict, timeout: int = 300) -> dict:
-    """Make a POST request with JSON payload"""
-    headers = {"Content-Type": "application/json"}
+def _post_json(base: str, path: str, payload: dict, timeout: int = 300) -> dict:
+    """Make a POST request with JSON payload over the shared keep-alive client"""
+    client = get_client(base)
+    url = client.url(path)
     try:
-        resp = requests.post(
-            url, headers=headers, data=json.dumps(payload), timeout=timeout
-        )
-        if resp.status_code >= 400:
-            raise requests.HTTPError(
-                f"{resp.status_code} {url}\n{resp.text}", response=resp
-            )
-        return resp.json()
+        return client.post_json(path, payload, timeout=timeout)
     except requests.exceptions.ConnectionError as e:
         raise ConnectionError(
             f"Failed to connect to {url}. Is the Nexa server running? Error: {e}"
@@ -184,9 +183,9 @@ def _post_json(url: str, payload: dict, timeout: int = 300) -> dict:
 
 def call_nexa_chat(model: str, prompt: str, base: str) -> str:
     """Call Nexa chat completion endpoint"""
-    url = base.rstrip("/") + "/v1/chat/completions"
     data = _post_json(
-        url,
+        base,
+        "/v1/chat/completions",
         {
             "model": model,
             "messages": [{"role": "user", "content": prompt}],
@@ -214,8 +213,8 @@ def stream_call_nexa_chat(model: str, prompt: str, base: str):
     Stream /v1/chat/completions.
     Yields incremental text pieces as they arrive.
     """
-    url = base.rstrip("/") + "/v1/chat/completions"
-    headers = {"Content-Type": "application/json"}
+    client = get_client(base)
+    url = client.url("/v1/chat/completions")
     payload = {
         "model": model,
         "messages": [{"role": "user", "content": prompt}],
@@ -224,29 +223,8 @@ def stream_call_nexa_chat(model: str, prompt: str, base: str):
     }
 
     try:
-        with requests.post(
-            url, headers=headers, data=json.dumps(payload), stream=True, timeout=300
-        ) as resp:
-            resp.raise_for_status()
-            for raw in resp.iter_lines(decode_unicode=True):
-                if not raw:
-                    continue
-                # typical line: "data: {json}" or "data: [DONE]"
-                if raw.startswith("data:"):
-                    data = raw[len("data:") :].strip()
-                    if data == "[DONE]":
-                        break
-                    try:
-                        obj = json.loads(data)
-                    except Exception:
-                        continue
-                    # chat stream usually in choices[0].delta.content
-                    choices = obj.get("choices", [])
-                    if choices:
-                        delta = choices[0].get("delta") or {}
-                        piece = delta.get("content", "")
-                        if piece:
-                            yield piece
+        with client.stream("/v1/chat/completions", payload, timeout=300) as resp:
+            yield from iter_chat_content(resp.iter_content(chunk_size=None))
     except requests.exceptions.ConnectionError as e:
         raise ConnectionError(f"Connection lost to {url}. The server may have crashed.")
 
@@ -256,9 +234,8 @@ def nexa_chat_messages(model: str, messages: list, base: str):
     Use /v1/chat/completions.
     By default this function returns the full response string.
     """
-    url = base.rstrip("/") + "/v1/chat/completions"
     data = _post_json(
-        url, {"model": model, "messages": messages, "stream": False, "max_tokens": 512}
+        base, "/v1/chat/completions", {"model": model, "messages": messages, "stream": False, "max_tokens": 512}
     )
     try:
         return data["choices"][0]["message"]["content"]
@@ -37,6 +37,9 @@ from nexaai.common import ModelConfig
 from nexaai.embedder import Embedder, EmbeddingConfig
 from nexaai.rerank import Reranker, RerankConfig
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from serve_client.adaptive_batch import get_batcher
+
 # ============================================================================
 # Configuration Constants
 # ============================================================================
@@ -210,16 +213,17 @@ def call_nexa_embeddings(embed_model: ModelInfo, inputs: List[str], model_folder
      
     embedder = Embedder.from_(name_or_path=embed_model.model, plugin_id=embed_model.plugin_id)
 
-    # Process in batches to avoid large payloads
-    BATCH_SIZE = 64
-    for i in range(0, len(inputs), BATCH_SIZE):
-        batch = inputs[i:i+BATCH_SIZE]
-        batch_size = len(batch)
-        embeddings = embedder.generate(
-        texts=batch, config=EmbeddingConfig(batch_size=batch_size))
-        
+    # Batch size adapts to observed latency per (model, plugin)
+    batcher = get_batcher(f"{embed_model.model}|{embed_model.plugin_id}", max_batch=256, target_latency=1.0)
+
+    def embed_batch(batch: List[str]):
+        return embedder.generate(texts=batch, config=EmbeddingConfig(batch_size=len(batch)))
+
+    for _, _, embeddings in batcher.run(inputs, embed_batch):
         for embedding in embeddings:
             out.append(embedding.tolist())
+    if len(inputs) > 1:
+        print(f"[info] Embedding batch: {batcher.operating_point()}")
            
     return out
 
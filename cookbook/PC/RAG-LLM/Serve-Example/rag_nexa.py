@@ -22,6 +22,7 @@ import argparse
 from typing import List, Dict, Any, Iterable, Tuple
 from pathlib import Path
 import requests
+import numpy as np
 
 import docx
 
@@ -31,6 +32,12 @@ import sys
 from io import StringIO
 from contextlib import contextmanager
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from serve_client import get_client
+from serve_client.adaptive_batch import get_batcher
+from serve_client.embeddings import ENCODING_FORMAT, decode_embeddings
+from serve_client.sse import iter_chat_content
+
 # ============================================================================
 # Configuration Constants
 # ============================================================================
@@ -79,12 +86,13 @@ def get_default_data_folder() -> str:
 # ============================================================================
 # HTTP and API Communication
 # ============================================================================
-def _post_json(url: str, payload: dict, timeout: int = 300) -> dict:
+def _post_json(base: str, path: str, payload: dict, timeout: int = 300) -> dict:
     """
-    Send POST request with JSON payload.
+    Send POST request with JSON payload over the shared keep-alive client.
     
     Args:
-        url: Target endpoint URL
+        base: Base URL for the API endpoint
+        path: Endpoint path, e.g. /v1/embeddings
         payload: JSON payload dictionary
         timeout: Request timeout in seconds
         
@@ -94,12 +102,12 @@ def _post_json(url: str, payload: dict, timeout: int = 300) -> dict:
     Raises:
         requests.HTTPError: If request fails with 4xx or 5xx status
     """
-    headers = {"Content-Type": "application/json"}
+    client = get_client(base)
+    url = client.url(path)
     try:
-        resp = requests.post(url, headers=headers, data=json.dumps(payload), timeout=timeout)
-        if resp.status_code >= 400:
-            raise requests.HTTPError(f"{resp.status_code} {url}\n{resp.text}", response=resp)
-        return resp.json()
+        return client.post_json(path, payload, timeout=timeout)
+    except requests.HTTPError:
+        raise
     except requests.Timeout:
         raise requests.HTTPError(f"Request timeout after {timeout}s: {url}")
     except requests.RequestException as e:
@@ -123,13 +131,11 @@ def call_nexa_chat(model: str, messages: List[Dict[str, Any]], base: str, stream
     Raises:
         requests.HTTPError: If API request fails
     """
-    url = base.rstrip("/") + "/v1/chat/completions"
-    headers = {"Content-Type": "application/json"}
     payload = {"model": model, "messages": messages, "stream": stream, "max_tokens": 512, "enable_think": False}
 
     if not stream:
         # Non-streaming: return complete text
-        data = _post_json(url, payload)
+        data = _post_json(base, "/v1/chat/completions", payload)
         try:
             return data["choices"][0]["message"]["content"]
         except (KeyError, IndexError):
@@ -138,81 +144,58 @@ def call_nexa_chat(model: str, messages: List[Dict[str, Any]], base: str, stream
 
     # Streaming mode: yield text pieces via SSE
     try:
-        with requests.post(url, headers=headers, data=json.dumps(payload), stream=True, timeout=300) as resp:
-            resp.raise_for_status()
-            for raw in resp.iter_lines(decode_unicode=True):
-                if not raw:
-                    continue
-                if raw.startswith("data:"):
-                    chunk = raw[len("data:"):].strip()
-                    if chunk == "[DONE]":
-                        break
-                    try:
-                        obj = json.loads(chunk)
-                        choices = obj.get("choices", [])
-                        if choices:
-                            delta = choices[0].get("delta") or {}
-                            piece = delta.get("content", "")
-                            if piece:
-                                yield piece
-                    except json.JSONDecodeError:
-                        continue  # Skip malformed JSON chunks
+        with get_client(base).stream("/v1/chat/completions", payload, timeout=300) as resp:
+            # Malformed frames are skipped by the parser; stops at [DONE]
+            yield from iter_chat_content(resp.iter_content(chunk_size=None))
     except requests.RequestException as e:
         raise requests.HTTPError(f"Streaming request failed: {str(e)}")
 
 
-def call_nexa_embeddings(embed_model: str, inputs: List[str], base: str) -> List[List[float]]:
+def call_nexa_embeddings(embed_model: str, inputs: List[str], base: str) -> np.ndarray:
     """
     Call Nexa-compatible /v1/embeddings endpoint to embed a batch of strings.
     
+    Vectors are requested as base64 little-endian float32 and decoded with
+    np.frombuffer straight into the result matrix.
+    
     Args:
         embed_model: Embedding model name
         inputs: List of text strings to embed
         base: Base URL for the API endpoint
         
     Returns:
-        List[List[float]]: List of embedding vectors aligned to input order
+        np.ndarray: float32 matrix of shape (len(inputs), D) aligned to input order
         
     Raises:
         requests.HTTPError: If API request fails
         ValueError: If response format is invalid
     """
     if not inputs:
-        return []
+        return np.empty((0, 0), dtype=np.float32)
     
-    url = base.rstrip("/") + "/v1/embeddings"
-    out: List[List[float]] = []
+    mat = None
     
-    # Process in batches to avoid large payloads
-    BATCH_SIZE = 64
-    for i in range(0, len(inputs), BATCH_SIZE):
-        batch = inputs[i:i+BATCH_SIZE]
+    # Batch size adapts to observed latency per (server, model); payloads stay bounded
+    batcher = get_batcher(f"{base}|{embed_model}", max_batch=256, target_latency=1.0)
+
+    def embed_batch(batch: List[str]) -> Dict[str, Any]:
         payload = {
             "model": embed_model,
             "input": batch,
-            "encoding_format": "float"
+            "encoding_format": ENCODING_FORMAT
         }
-        data = _post_json(url, payload)
-        
-        # Parse response and sort by index
-        vecs = [None] * len(batch)
-        for item in data.get("data", []):
-            idx = item.get("index", 0)
-            vec = item.get("embedding", [])
-            if 0 <= idx < len(batch):
-                vecs[idx] = vec
-        
-        # Fallback: assume response order matches input order
-        if any(v is None for v in vecs):
-            vecs = [item.get("embedding", []) for item in data.get("data", [])]
-        
-        # Validate we got embeddings for all inputs
-        if len(vecs) != len(batch):
-            raise ValueError(f"Expected {len(batch)} embeddings, got {len(vecs)}")
-            
-        out.extend(vecs)
+        return _post_json(base, "/v1/embeddings", payload)
+
+    for start, end, data in batcher.run(inputs, embed_batch):
+        # Decode by index; the first batch fixes the dimension of the full matrix
+        if mat is None:
+            first = decode_embeddings(data, end - start)
+            mat = np.empty((len(inputs), first.shape[1]), dtype=np.float32)
+            mat[start:end] = first
+        else:
+            decode_embeddings(data, end - start, out=mat[start:end])
     
-    return out
+    return mat
 
 
 def call_nexa_rerank(rerank_model: str, query: str, documents: List[str], base: str, top_n: int = 3) -> List[int]:
@@ -235,7 +218,6 @@ def call_nexa_rerank(rerank_model: str, query: str, documents: List[str], base:
     if not documents:
         return []
     
-    url = base.rstrip("/") + "/v1/reranking"
     payload = {
         "model": rerank_model,
         "query": query,
@@ -244,7 +226,7 @@ def call_nexa_rerank(rerank_model: str, query: str, documents: List[str], base:
         "normalize": True,
         "normalize_method": "softmax"
     }
-    data = _post_json(url, payload)
+    data = _post_json(base, "/v1/reranking", payload)
     
     # Sort by relevance score (descending) and return top_n indices
     results = data.get("results", [])
@@ -494,11 +476,12 @@ def build_json_index(
                 "text": txt,
                 "source": os.path.abspath(path),
                 "chunk_index": i,
-                "vector": vec,
+                "vector": vec.tolist(),
             })
 
     if not items:
         raise RuntimeError("No chunks found. Check your --data path and files.")
+    print(f"[build] Embedding batch: {get_batcher(f'{endpoint_base}|{embed_model}').operating_point()}")
 
     # Build and save index
     dim = len(items[0]["vector"])
@@ -585,8 +568,7 @@ def embed_query_server(query: str, embed_model: str, endpoint_base: str) -> np.n
     Returns:
         np.ndarray: Query embedding vector
     """
-    vecs = call_nexa_embeddings(embed_model, [query], endpoint_base)
-    return np.array(vecs[0], dtype=np.float32)
+    return call_nexa_embeddings(embed_model, [query], endpoint_base)[0]
 
 
 def search_numpy(
@@ -16,12 +16,16 @@ from __future__ import annotations
 
 import os
 import re
+import sys
 import json
+import hashlib
 import argparse
 import requests
 import faiss
+import numpy as np
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any, Iterable, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+from pathlib import Path
 
 import docx
 
@@ -32,24 +36,30 @@ from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.schema.runnable import RunnableLambda
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from serve_client import get_client
+from serve_client.adaptive_batch import get_batcher
+from serve_client.embeddings import ENCODING_FORMAT, decode_embeddings
+from serve_client.sse import iter_chat_content
+
 
 # Nexa config
 DEFAULT_MODEL = "NexaAI/Qwen3-VL-4B-Instruct-GGUF"
 DEFAULT_ENDPOINT = "http://127.0.0.1:18181"
 DEFAULT_EMBED_MODEL = "djuna/jina-embeddings-v2-small-en-Q5_K_M-GGUF" 
 
+# Chunking config
+DEFAULT_SEPARATORS = ["\n\n", "\n", ". ", "。", "；", "，", " ", ""]
+DEFAULT_CHUNK_CACHE_DIR = "./.chunk_cache"
+
 
 # Nexa low-level call
-def _post_json(url: str, payload: dict, timeout: int = 300) -> dict:
-    headers = {"Content-Type": "application/json"}
-    resp = requests.post(url, headers=headers, data=json.dumps(payload), timeout=timeout)
-    if resp.status_code >= 400:
-        raise requests.HTTPError(f"{resp.status_code} {url}\n{resp.text}", response=resp)
-    return resp.json()
+def _post_json(base: str, path: str, payload: dict, timeout: int = 300) -> dict:
+    """POST JSON over the shared keep-alive client; raises requests.HTTPError on 4xx/5xx."""
+    return get_client(base).post_json(path, payload, timeout=timeout)
 
 def call_nexa_chat(model: str, prompt: str, base: str) -> str:
-    url = base.rstrip("/") + "/v1/chat/completions"
-    data = _post_json(url, {
+    data = _post_json(base, "/v1/chat/completions", {
         "model": model,
         "messages": [{"role": "user", "content": prompt}],
         "stream": False,
@@ -73,58 +83,35 @@ def stream_nexa_chat_messages(model: str, messages: list, base: str):
     Stream /v1/chat/completions.
     Yields incremental text pieces as they arrive.
     """
-    url = base.rstrip("/") + "/v1/chat/completions"
-    headers = {"Content-Type": "application/json"}
     payload = {"model": model, "messages": messages, "stream": True, "max_tokens": 512}
 
-    with requests.post(url, headers=headers, data=json.dumps(payload), stream=True, timeout=300) as resp:
-        resp.raise_for_status()
-        for raw in resp.iter_lines(decode_unicode=True):
-            if not raw:
-                continue
-            # typical line: "data: {json}" or "data: [DONE]"
-            if raw.startswith("data:"):
-                data = raw[len("data:"):].strip()
-                if data == "[DONE]":
-                    break
-                try:
-                    obj = json.loads(data)
-                except Exception:
-                    continue
-                # chat stream usually in choices[0].delta.content
-                choices = obj.get("choices", [])
-                if choices:
-                    delta = choices[0].get("delta") or {}
-                    piece = delta.get("content", "")
-                    if piece:
-                        yield piece
-
-def call_nexa_embeddings(embed_model: str, inputs: List[str], base: str) -> List[List[float]]:
+    with get_client(base).stream("/v1/chat/completions", payload, timeout=300) as resp:
+        yield from iter_chat_content(resp.iter_content(chunk_size=None))
+
+def call_nexa_embeddings(embed_model: str, inputs: List[str], base: str) -> np.ndarray:
     """
-    Call Nexa /v1/embeddings to embed batch texts. Return list of vectors aligned with inputs.
+    Call Nexa /v1/embeddings to embed batch texts. Return a float32 (N, D) matrix aligned with inputs.
+    Vectors travel as base64 float32 and are decoded with np.frombuffer straight into the matrix.
     """
-    url = base.rstrip("/") + "/v1/embeddings"
-    out: List[List[float]] = []
-    B = 64
-    for i in range(0, len(inputs), B):
-        batch = inputs[i:i+B]
+    mat = None
+    batcher = get_batcher(f"{base}|{embed_model}", max_batch=256, target_latency=1.0)
+
+    def embed_batch(batch: List[str]) -> Dict[str, Any]:
         payload = {
             "model": embed_model,
             "input": batch,
-            "encoding_format": "float"
+            "encoding_format": ENCODING_FORMAT
         }
-        data = _post_json(url, payload)
-        # Expected: {"data":[{"embedding":[...],"index":0}, ...]}
-        vecs = [None] * len(batch)
-        for item in data.get("data", []):
-            idx = item.get("index", 0)
-            vec = item.get("embedding", [])
-            if 0 <= idx < len(batch):
-                vecs[idx] = vec
-        if any(v is None for v in vecs):
-            vecs = [d.get("embedding", []) for d in data.get("data", [])]
-        out.extend(vecs)
-    return out
+        return _post_json(base, "/v1/embeddings", payload)
+
+    for start, end, data in batcher.run(inputs, embed_batch):
+        if mat is None:
+            first = decode_embeddings(data, end - start)
+            mat = np.empty((len(inputs), first.shape[1]), dtype=np.float32)
+            mat[start:end] = first
+        else:
+            decode_embeddings(data, end - start, out=mat[start:end])
+    return mat if mat is not None else np.empty((0, 0), dtype=np.float32)
 
 
 class NexaLLM(LLM):
@@ -214,36 +201,105 @@ def retrieve_topk_images(query: str, k: int,
     return []
 
 
+# Chunk cache
+def _file_sha256(path: str) -> str:
+    """Hash raw file bytes so unchanged files skip loading and splitting."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _chunk_cache_key(content_hash: str, chunk_size: int, chunk_overlap: int, separators: List[str]) -> str:
+    """Cache key covering the file content and every splitter setting."""
+    spec = json.dumps([content_hash, chunk_size, chunk_overlap, separators], ensure_ascii=False)
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
+
+def _load_cached_chunks(cache_dir: str, key: str) -> Optional[dict]:
+    path = os.path.join(cache_dir, key[:2], key + ".json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or not isinstance(entry.get("chunks"), list):
+        return None
+    return entry
+
+def _store_cached_chunks(cache_dir: str, key: str, entry: dict) -> None:
+    """Write atomically so an interrupted rebuild never leaves a corrupt entry."""
+    folder = os.path.join(cache_dir, key[:2])
+    path = os.path.join(folder, key + ".json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"[warn] Failed to write chunk cache {path}: {e}")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
 # Chunking & retriever
 def build_chunks_from_folder(folder: str,
                             chunk_size: int = 1000,
-                            chunk_overlap: int = 150) -> List[Document]:
-    """Load files from folder, split into chunks, attach metadata."""
+                            chunk_overlap: int = 150,
+                            cache_dir: Optional[str] = DEFAULT_CHUNK_CACHE_DIR,
+                            separators: Optional[List[str]] = None) -> List[Document]:
+    """
+    Load files from folder, split into chunks, attach metadata.
+    Split results are cached on disk under cache_dir, keyed by
+    (file content hash, chunk_size, chunk_overlap, separators), so a rebuild
+    only reloads and re-splits files that actually changed.
+    Pass cache_dir=None (or "") to disable the cache.
+    """
+    separators = list(separators) if separators is not None else list(DEFAULT_SEPARATORS)
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
-        separators=["\n\n", "\n", ". ", "。", "；", "，", " ", ""],
+        separators=separators,
     )
 
     docs: List[Document] = []
+    hits = misses = 0
     for path in yield_files(folder):
-        raw = load_file(path)
-        raw = normalize_ws(raw)
-        if not raw:
-            continue
-
-        chunks = splitter.split_text(raw)
-        for i, ch in enumerate(chunks):
+        key = None
+        entry = None
+        if cache_dir:
+            try:
+                key = _chunk_cache_key(_file_sha256(path), chunk_size, chunk_overlap, separators)
+                entry = _load_cached_chunks(cache_dir, key)
+            except OSError as e:
+                print(f"[warn] Failed to hash {path}: {e}")
+
+        if entry is not None:
+            hits += 1
+        else:
+            misses += 1
+            raw = load_file(path)
+            raw = normalize_ws(raw)
+            entry = {"chunks": splitter.split_text(raw) if raw else [], "total_chars": len(raw)}
+            # Don't cache empty loads: they may come from a transient read error
+            if key is not None and raw:
+                _store_cached_chunks(cache_dir, key, entry)
+
+        for i, ch in enumerate(entry["chunks"]):
             docs.append(
                 Document(
                     page_content=ch,
                     metadata={
                         "source": os.path.abspath(path),
                         "chunk_index": i,
-                        "total_chars": len(raw),
+                        "total_chars": entry.get("total_chars", 0),
                     },
                 )
             )
+    if cache_dir:
+        print(f"[info] Chunk cache: {hits} hit(s), {misses} re-split")
     return docs
 
 class _ServerEmbeddingRetriever:
@@ -258,28 +314,20 @@ class _ServerEmbeddingRetriever:
         self.texts = texts
         self.metas = metas
 
-        vecs = call_nexa_embeddings(self.embed_model, self.texts, self.endpoint)
-        mat = [[v for v in vec] for vec in vecs]
-        mat_flat = []
-        for vec in mat:
-            norm = sum(x**2 for x in vec) ** 0.5 + 1e-8
-            mat_flat.append([x / norm for x in vec])
+        mat = call_nexa_embeddings(self.embed_model, self.texts, self.endpoint)
+        if self.texts:
+            print(f"[info] Embedding batch: {get_batcher(f'{endpoint}|{embed_model}').operating_point()}")
+        mat /= np.linalg.norm(mat, axis=1, keepdims=True) + 1e-8
 
-        import array
-        dim = len(mat_flat[0]) if mat_flat else 128
+        dim = mat.shape[1] if mat.size else 128
         self.index = faiss.IndexFlatIP(dim)
-        for vec in mat_flat:
-            arr = array.array('f', vec)
-            self.index.add(arr.tobytes())
+        if mat.size:
+            self.index.add(mat)
 
     def get_relevant_documents(self, query: str) -> List[Document]:
-        q_vec = call_nexa_embeddings(self.embed_model, [query], self.endpoint)[0]
-        norm = sum(x**2 for x in q_vec) ** 0.5 + 1e-8
-        q = [x / norm for x in q_vec]
-        
-        import array
-        q_arr = array.array('f', q)
-        D, I = self.index.search(q_arr.tobytes(), self.k)
+        q = call_nexa_embeddings(self.embed_model, [query], self.endpoint)
+        q /= np.linalg.norm(q, axis=1, keepdims=True) + 1e-8
+        D, I = self.index.search(q, self.k)
         docs: List[Document] = []
         for i in I[0]:
             if 0 <= i < len(self.texts):
@@ -333,6 +381,7 @@ def main():
     ap.add_argument("--k", type=int, default=5, help="Top-k documents to retrieve.")
     ap.add_argument("--chunk_size", type=int, default=1000, help="Chunk size for splitting.")
     ap.add_argument("--chunk_overlap", type=int, default=150, help="Chunk overlap for splitting.")
+    ap.add_argument("--chunk_cache", default=DEFAULT_CHUNK_CACHE_DIR, help="Folder for cached split results ('' disables).")
     ap.add_argument("--model", default=DEFAULT_MODEL, help="Nexa model name or alias.")
     ap.add_argument("--endpoint", default=DEFAULT_ENDPOINT, help="Nexa base endpoint, e.g. http://127.0.0.1:18181")
     ap.add_argument("--embed_model", default=DEFAULT_EMBED_MODEL, help="Embedding model served by Nexa /v1/embeddings")
@@ -343,7 +392,7 @@ def main():
         print(f"[info] Created empty data folder: {args.data}")
         
     print(f"[info] Loading files from: {args.data}")
-    docs = build_chunks_from_folder(args.data, args.chunk_size, args.chunk_overlap)
+    docs = build_chunks_from_folder(args.data, args.chunk_size, args.chunk_overlap, cache_dir=args.chunk_cache)
     if not docs:
         print("[error] No documents loaded. Check your --data path and file types.")
         return
@@ -368,7 +417,7 @@ def main():
             # Hot-reload index on demand
             if q.lower() == ":reload":
                 print("[info] Rebuilding index ...")
-                docs = build_chunks_from_folder(args.data, args.chunk_size, args.chunk_overlap)
+                docs = build_chunks_from_folder(args.data, args.chunk_size, args.chunk_overlap, cache_dir=args.chunk_cache)
                 retriever = build_retriever(docs, k=args.k, endpoint=args.endpoint, embed_model=args.embed_model)
                 print(f"[info] Rebuilt. Chunks: {len(docs)}")
                 continue
@@ -21,14 +21,18 @@ import os
 import sys
 import argparse
 import re
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
 
-from nexaai import GenerationConfig, ModelConfig, VlmChatMessage, VlmContent, setup_logging
+from nexaai import GenerationConfig, ModelConfig, SamplerConfig, VlmChatMessage, VlmContent, setup_logging
 from nexaai.vlm import VLM
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from serve_client.tool_grammar import tools_grammar
+
 
 def _convert_schema_property(prop_schema: Dict[str, Any]) -> Dict[str, Any]:
     """Recursively convert a schema property, handling nested objects."""
@@ -181,6 +185,42 @@ def extract_function_call(text: str):
     return None
 
 
+def extract_function_calls(text: str) -> List[Tuple[str, Dict[str, Any]]]:
+    """Extract every function call JSON object from LLM response, in order."""
+    if not text:
+        return []
+
+    text = re.sub(r"<\|[^|]+\|>", "", text.strip())
+    decoder = json.JSONDecoder()
+    calls = []
+    pos = text.find('{')
+    while pos != -1:
+        try:
+            parsed, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            pos = text.find('{', pos + 1)
+            continue
+        if isinstance(parsed, dict) and "name" in parsed:
+            calls.append((parsed.get("name"), parsed.get("arguments", {})))
+        pos = text.find('{', end)
+    if not calls:
+        # Fall back to the lenient single-call parser
+        func_call = extract_function_call(text)
+        if func_call:
+            calls.append(func_call)
+    return calls
+
+
+def _call_arguments(args: Any) -> Dict[str, Any]:
+    """Arguments of a parsed call as a dict; models sometimes emit them as a JSON string."""
+    if isinstance(args, str):
+        try:
+            args = json.loads(args)
+        except json.JSONDecodeError:
+            return {}
+    return args if isinstance(args, dict) else {}
+
+
 def _format_nested_properties(props: Dict[str, Any], required: List[str], prefix: str = "", indent: int = 2) -> List[str]:
     """Recursively format nested object properties with required field indicators."""
     param_list = []
@@ -257,6 +297,8 @@ def build_system_prompt(tools: list) -> str:
 
 {{"name": "function_name", "arguments": {{"param": "value"}}}}
 
+If the request needs several independent actions, output one such JSON object per line.
+
 CRITICAL RULES:
 - You MUST include ALL required parameters (marked as REQUIRED)
 - For nested objects, ALL required fields within the object must be included
@@ -332,6 +374,28 @@ async def _execute_with_retry(session: ClientSession, func_name: str, func_args:
     return func_result or ""
 
 
+def tool_sampler_config(tools: List[Dict[str, Any]]) -> SamplerConfig:
+    """Sampler that only allows valid calls of the tools (one per line), or a plain-text answer."""
+    sampler_config = SamplerConfig()
+    sampler_config.grammar_string = tools_grammar(tools, allow_text=True, parallel=True)
+    return sampler_config
+
+
+def _result_message(func_result: str) -> str:
+    """Extract the success or error message of an MCP tool result."""
+    result_message = ""
+    try:
+        result_data = json.loads(func_result) if isinstance(func_result, str) else func_result
+        if isinstance(result_data.get('content'), list):
+            for item in result_data['content']:
+                if item.get('type') == 'text':
+                    result_message = item.get('text', '')
+                    break
+    except Exception:
+        result_message = str(func_result)
+    return result_message
+
+
 def init_vlm(tools: List[Dict[str, Any]]) -> VLM:
     """Initialize VLM with tools."""
     system_prompt = build_system_prompt(tools)
@@ -346,10 +410,14 @@ def init_vlm(tools: List[Dict[str, Any]]) -> VLM:
 
 @dataclass
 class FunctionCallAgentResult:
-    """Result of function call agent execution."""
+    """
+    Result of function call agent execution. func_name and func_result are set
+    for a single call; every call of the turn is listed in calls.
+    """
     func_name: Optional[str]
     func_result: Optional[str]
     response_text: str
+    calls: List[Dict[str, Any]] = field(default_factory=list)
 
 async def call_agent(
     vlm: VLM,
@@ -392,14 +460,19 @@ async def call_agent(
     response_text = ""
     for token in vlm.generate_stream(prompt, config=GenerationConfig(
         max_tokens=2048, image_paths=image_paths or None, 
-        audio_paths=audio_paths or None, image_max_length=512
+        audio_paths=audio_paths or None, image_max_length=512,
+        sampler_config=tool_sampler_config(tools)
     )):
         print(token, end="", flush=True)
         response_text += token
     print()
     print('[debug] response_text:', response_text)
-    func_call = extract_function_call(response_text)
-    if not func_call:
+    func_calls = [
+        (func_name, _call_arguments(func_args))
+        for func_name, func_args in extract_function_calls(response_text)
+        if func_name and isinstance(func_name, str)
+    ]
+    if not func_calls:
         print(f"[error] Failed to extract function call from response")
         return FunctionCallAgentResult(
             func_name=None,
@@ -407,60 +480,48 @@ async def call_agent(
             response_text=response_text
         )
     
-    func_name, func_args = func_call
-    if func_name and isinstance(func_name, str):
-        print('[debug] calling function:', func_name)
-        func_result = await _execute_with_retry(session, func_name, func_args, tools)
-        print('[debug] func_result:', func_result)
-        
-        # Parse function result to extract success/error message
-        result_message = ""
-        try:
-            result_data = json.loads(func_result) if isinstance(func_result, str) else func_result
-            if result_data.get('isError', False):
-                # Extract error message
-                if isinstance(result_data.get('content'), list):
-                    for item in result_data['content']:
-                        if item.get('type') == 'text':
-                            result_message = item.get('text', '')
-                            break
-            else:
-                # Extract success message or summary
-                if isinstance(result_data.get('content'), list):
-                    for item in result_data['content']:
-                        if item.get('type') == 'text':
-                            result_message = item.get('text', '')
-                            break
-        except Exception:
-            result_message = str(func_result)
-        
-        followup = conversation + [
-            VlmChatMessage(role="assistant", contents=[VlmContent(type="text", text=response_text)]),
-            VlmChatMessage(role="user", contents=[VlmContent(type="text", 
-                text=f"Function execution completed. Result: {result_message}\n\n"
-                     f"Now respond to the user in natural language. You are in RESPONSE MODE, not function calling mode.\n"
-                     f"- DO NOT output any JSON format\n"
-                     f"- DO NOT use {{}} brackets\n"
-                     f"- DO NOT call any function\n"
-                     f"- Just speak naturally like a helpful assistant\n"
-                     f"- Tell the user what happened with the calendar event in a friendly way")])
-        ]
-        followup_response = ""
-        for token in vlm.generate_stream(
-            vlm.apply_chat_template(followup, enable_thinking=False),
-            config=GenerationConfig(max_tokens=2048)
-        ):
-            followup_response += token
-        return FunctionCallAgentResult(
-            func_name=func_name,
-            func_result=func_result,
-            response_text=followup_response
+    print('[debug] calling functions:', [func_name for func_name, _ in func_calls])
+    # Independent calls run concurrently over the one MCP session
+    func_results = await asyncio.gather(*(
+        _execute_with_retry(session, func_name, func_args, tools) for func_name, func_args in func_calls
+    ))
+    print('[debug] func_results:', func_results)
+    
+    # Parse function results to extract success/error messages
+    if len(func_calls) == 1:
+        result_text = f"Result: {_result_message(func_results[0])}"
+    else:
+        result_text = "Results:\n" + "\n".join(
+            f"- {func_name}: {_result_message(func_result)}"
+            for (func_name, _), func_result in zip(func_calls, func_results)
         )
     
+    followup = conversation + [
+        VlmChatMessage(role="assistant", contents=[VlmContent(type="text", text=response_text)]),
+        VlmChatMessage(role="user", contents=[VlmContent(type="text", 
+            text=f"Function execution completed. {result_text}\n\n"
+                 f"Now respond to the user in natural language. You are in RESPONSE MODE, not function calling mode.\n"
+                 f"- DO NOT output any JSON format\n"
+                 f"- DO NOT use {{}} brackets\n"
+                 f"- DO NOT call any function\n"
+                 f"- Just speak naturally like a helpful assistant\n"
+                 f"- Tell the user what happened with the calendar event in a friendly way")])
+    ]
+    followup_response = ""
+    for token in vlm.generate_stream(
+        vlm.apply_chat_template(followup, enable_thinking=False),
+        config=GenerationConfig(max_tokens=2048)
+    ):
+        followup_response += token
+    single = len(func_calls) == 1
     return FunctionCallAgentResult(
-        func_name=None,
-        func_result=None,
-        response_text=response_text
+        func_name=func_calls[0][0] if single else None,
+        func_result=func_results[0] if single else None,
+        response_text=followup_response,
+        calls=[
+            {"name": func_name, "arguments": func_args, "result": func_result}
+            for (func_name, func_args), func_result in zip(func_calls, func_results)
+        ],
     )
 
 
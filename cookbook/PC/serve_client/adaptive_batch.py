@@ -0,0 +1,239 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# HTTP statuses worth retrying with a smaller batch: payload too large or server-side failure
+_SPLIT_STATUS = {413} | set(range(500, 600))
+
+
+def is_batch_size_error(err: BaseException) -> bool:
+    """
+    True for errors a smaller batch may avoid: timeouts and 413/5xx responses.
+    Works for requests and httpx exceptions without importing either; 4xx
+    other than 413, connection refused and decoding errors are not retried.
+    """
+    if isinstance(err, TimeoutError):
+        return True
+    if any("Timeout" in cls.__name__ for cls in type(err).__mro__):
+        return True
+    status = getattr(getattr(err, "response", None), "status_code", None)
+    return status in _SPLIT_STATUS
+
+
+class AdaptiveBatcher:
+    """
+    Online batch sizing for embedding calls.
+
+    Instead of a fixed batch size, each batch is filled until its predicted
+    latency reaches `target_latency`, its payload reaches `max_payload_bytes`
+    or it holds `max_batch` items. The prediction is an affine cost model,
+    `latency = fixed + per_byte * bytes`, fitted by exponentially weighted
+    least squares over previous batches: the fixed part (request and
+    dispatch overhead) is paid once per call, so it is not charged to each
+    byte and single-query calls do not inflate the estimate for bulk ingest.
+    Long chunks get small batches and short ones get large batches, and the
+    fit follows whichever model and backend (cpu_gpu, npu, ...) is serving.
+
+    A batch that fails with a timeout or a 413/5xx response is split in half
+    and retried down to `min_batch`; other errors are re-raised at once.
+    The same instance works for the binding path
+    (`Embedder.embed`) and the HTTP path (`/v1/embeddings`): it only sees a
+    callable that embeds a list of strings.
+
+    Args:
+        min_batch: Smallest batch size; failures at this size are re-raised
+        max_batch: Largest batch size
+        initial_batch: Batch size used before anything has been measured
+        target_latency: Target seconds per embedding call
+        max_payload_bytes: Upper bound on the UTF-8 size of one batch
+        smoothing: Weight of the newest measurement in the moving average
+        max_growth: Max factor by which the batch size may grow per step
+        name: Label used in log messages
+        split_on: Predicate choosing which errors halve the batch (default
+            `is_batch_size_error`)
+    """
+
+    def __init__(
+        self,
+        min_batch: int = 1,
+        max_batch: int = 256,
+        initial_batch: int = 16,
+        target_latency: float = 1.0,
+        max_payload_bytes: int = 2 << 20,
+        smoothing: float = 0.3,
+        max_growth: float = 2.0,
+        name: str = "embed",
+        split_on: Optional[Callable[[BaseException], bool]] = None,
+    ) -> None:
+        if not 1 <= min_batch <= max_batch:
+            raise ValueError("require 1 <= min_batch <= max_batch")
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.target_latency = target_latency
+        self.max_payload_bytes = max_payload_bytes
+        self.smoothing = smoothing
+        self.max_growth = max_growth
+        self.name = name
+        self.split_on = split_on or is_batch_size_error
+
+        self.batch_size = max(min_batch, min(initial_batch, max_batch))
+        # latency ~= fixed_sec + sec_per_byte * payload; 0.0 until the first batch
+        self.fixed_sec: float = 0.0
+        self.sec_per_byte: float = 0.0
+        # Exponentially weighted sums for the least squares fit
+        self._sw = self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self.last_latency: float = 0.0
+        self.items_per_sec: float = 0.0
+        self.failures = 0
+        self._logged_size = self.batch_size
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ sizing
+    def _over_target(self, payload: int) -> bool:
+        """Whether a batch of payload bytes is predicted to exceed the target latency."""
+        if not self.sec_per_byte or self.fixed_sec >= self.target_latency:
+            # Nothing measured yet, or the per-call overhead alone misses the target:
+            # larger batches then only amortize it, so leave the bound to max_batch/payload
+            return False
+        return self.fixed_sec + payload * self.sec_per_byte > self.target_latency
+
+    def _fit(self, payload: int, elapsed: float) -> None:
+        """Fold one (payload, latency) sample into the affine model."""
+        decay = 1 - self.smoothing
+        self._sw = self._sw * decay + 1
+        self._sx = self._sx * decay + payload
+        self._sy = self._sy * decay + elapsed
+        self._sxx = self._sxx * decay + payload * payload
+        self._sxy = self._sxy * decay + payload * elapsed
+        mean_x, mean_y = self._sx / self._sw, self._sy / self._sw
+        var = self._sxx / self._sw - mean_x * mean_x
+        cov = self._sxy / self._sw - mean_x * mean_y
+        if var > (0.05 * mean_x) ** 2 and cov > 0:
+            slope = cov / var
+            fixed = mean_y - slope * mean_x
+            if fixed >= 0:
+                self.fixed_sec, self.sec_per_byte = fixed, slope
+                return
+        # Payload sizes too similar (or noise) to separate the two terms: keep the last
+        # fixed cost and attribute the rest of the mean latency to bytes
+        self.fixed_sec = min(self.fixed_sec, mean_y)
+        self.sec_per_byte = max(mean_y - self.fixed_sec, 0.0) / max(mean_x, 1.0) or 1e-12
+
+    def _next_size(self, sizes: Sequence[int], start: int) -> int:
+        """How many items starting at `start` go into the next batch."""
+        limit = min(self.max_batch, len(sizes) - start, self.batch_size)
+        n, payload = 0, 0
+        while n < limit:
+            size = sizes[start + n]
+            if n >= self.min_batch:
+                if payload + size > self.max_payload_bytes:
+                    break
+                if self._over_target(payload + size):
+                    break
+            payload += size
+            n += 1
+        return max(n, 1)
+
+    def _observe(self, n: int, payload: int, elapsed: float) -> None:
+        with self._lock:
+            self._fit(max(payload, 1), elapsed)
+            self.last_latency = elapsed
+            self.items_per_sec = n / elapsed if elapsed > 0 else 0.0
+
+            # Size the next batch for the target latency at the average item size just seen
+            avg_item = max(payload / n, 1.0)
+            budget = self.target_latency - self.fixed_sec
+            ideal = budget / (self.sec_per_byte * avg_item) if budget > 0 else self.max_batch
+            ideal = min(ideal, self.batch_size * self.max_growth)
+            new_size = int(max(self.min_batch, min(self.max_batch, ideal)))
+            # Only log moves of 25% or more so jitter around the operating point stays quiet
+            if abs(new_size - self._logged_size) * 4 >= self._logged_size:
+                logger.info(
+                    "[%s] batch size %d -> %d (%.0f ms/call, %.1f items/s, %.1f ms fixed + %.3f us/byte)",
+                    self.name, self._logged_size, new_size, elapsed * 1000, self.items_per_sec,
+                    self.fixed_sec * 1000, self.sec_per_byte * 1e6,
+                )
+                self._logged_size = new_size
+            self.batch_size = new_size
+
+    def _shrink(self, n: int, err: BaseException) -> int:
+        with self._lock:
+            self.failures += 1
+            self.batch_size = self._logged_size = max(self.min_batch, n // 2)
+            logger.warning("[%s] batch of %d failed (%s); retrying with %d", self.name, n, err, self.batch_size)
+            return self.batch_size
+
+    # --------------------------------------------------------------------- run
+    def run(self, texts: Sequence[str], fn: Callable[[List[str]], R]) -> Iterator[Tuple[int, int, R]]:
+        """
+        Call fn on consecutive batches of texts, yielding (start, end, result).
+
+        Batches cover texts in order without gaps, so callers can write each
+        result into rows start:end of a preallocated matrix.
+        """
+        sizes = [len(t.encode("utf-8")) for t in texts]
+        start = 0
+        while start < len(texts):
+            n = self._next_size(sizes, start)
+            batch = list(texts[start:start + n])
+            t0 = time.perf_counter()
+            try:
+                result = fn(batch)
+            except Exception as e:
+                if n <= self.min_batch or not self.split_on(e):
+                    raise
+                self._shrink(n, e)
+                continue
+            self._observe(n, sum(sizes[start:start + n]), time.perf_counter() - t0)
+            yield start, start + n, result
+            start += n
+
+    def operating_point(self) -> Dict[str, Any]:
+        """Current batch size and the measurements it was derived from."""
+        with self._lock:
+            return {
+                "batch_size": self.batch_size,
+                "last_latency_ms": round(self.last_latency * 1000, 3),
+                "items_per_sec": round(self.items_per_sec, 2),
+                "fixed_ms": round(self.fixed_sec * 1000, 3),
+                "us_per_byte": round(self.sec_per_byte * 1e6, 4),
+                "failures": self.failures,
+            }
+
+
+_batchers: Dict[str, AdaptiveBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key: str, **kwargs: Any) -> AdaptiveBatcher:
+    """
+    Return the process-wide batcher for key (e.g. "<endpoint>|<model>"),
+    so what was learned carries over between calls. Keyword arguments only
+    apply when the batcher is created.
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = _batchers[key] = AdaptiveBatcher(name=key, **kwargs)
+        return batcher
@@ -0,0 +1,210 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import contextlib
+import json
+import mimetypes
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
+
+import httpx
+import numpy as np
+
+from .client import DEFAULT_ENDPOINT
+from .embeddings import ENCODING_FORMAT, decode_embeddings
+from .sse import ChatStreamParser
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def _encode_json(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _file_to_data_url(path: str) -> str:
+    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return f"data:{mime};base64,{base64.b64encode(_read_file(path)).decode('ascii')}"
+
+
+class AsyncNexaClient:
+    """
+    asyncio client for `nexa serve` with bounded in-flight concurrency.
+
+    At most `max_in_flight` requests are outstanding at any time; further
+    calls wait on a semaphore. JSON encoding, file reads and base64 encoding
+    run in worker threads so they overlap with server compute instead of
+    blocking the event loop. Cancelling a task aborts its HTTP request and
+    frees its slot.
+
+    Args:
+        base_url: Server base URL, e.g. http://127.0.0.1:18181
+        max_in_flight: Max concurrent requests sent to the server
+        timeout: Request timeout in seconds
+    """
+
+    def __init__(self, base_url: str = DEFAULT_ENDPOINT, max_in_flight: int = 4, timeout: float = 300) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be >= 1")
+        self.base_url = base_url.rstrip("/")
+        self.max_in_flight = max_in_flight
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self._http = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight),
+        )
+
+    async def __aenter__(self) -> "AsyncNexaClient":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    # ---------------------------------------------------------------- low level
+    @staticmethod
+    def _raise_for_status(resp: httpx.Response) -> None:
+        if resp.status_code >= 400:
+            raise httpx.HTTPStatusError(
+                f"{resp.status_code} {resp.request.url}\n{resp.text}", request=resp.request, response=resp
+            )
+
+    async def post_json(self, path: str, payload: Any) -> Any:
+        body = await asyncio.to_thread(_encode_json, payload)
+        async with self._sem:
+            resp = await self._http.post(path, content=body, headers=_JSON_HEADERS)
+            self._raise_for_status(resp)
+            return resp.json()
+
+    async def stream_bytes(self, path: str, payload: Any) -> AsyncIterator[bytes]:
+        """POST a JSON payload and yield raw response chunks; holds one slot until exhausted or closed."""
+        body = await asyncio.to_thread(_encode_json, payload)
+        async with self._sem:
+            async with self._http.stream("POST", path, content=body, headers=_JSON_HEADERS) as resp:
+                if resp.status_code >= 400:
+                    await resp.aread()
+                    self._raise_for_status(resp)
+                async for chunk in resp.aiter_bytes():
+                    yield chunk
+
+    # -------------------------------------------------------------------- chat
+    async def chat(self, model: str, messages: List[Dict[str, Any]], **params: Any) -> Dict[str, Any]:
+        payload = {"model": model, "messages": messages, "stream": False, **params}
+        return await self.post_json("/v1/chat/completions", payload)
+
+    async def chat_stream(self, model: str, messages: List[Dict[str, Any]], **params: Any) -> AsyncIterator[str]:
+        """Stream /v1/chat/completions over SSE, yielding content deltas."""
+        payload = {"model": model, "messages": messages, "stream": True, **params}
+        parser = ChatStreamParser()
+        # aclosing releases the response and the slot as soon as [DONE] arrives
+        async with contextlib.aclosing(self.stream_bytes("/v1/chat/completions", payload)) as chunks:
+            async for chunk in chunks:
+                for piece in parser.feed(chunk):
+                    yield piece
+                if parser.done:
+                    return
+        for piece in parser.close():
+            yield piece
+
+    # -------------------------------------------------------------- embeddings
+    async def embeddings(self, model: str, inputs: List[str], **params: Any) -> np.ndarray:
+        """Embed one batch as a float32 (len(inputs), dim) matrix in input order."""
+        payload = {"model": model, "input": inputs, "encoding_format": ENCODING_FORMAT, **params}
+        data = await self.post_json("/v1/embeddings", payload)
+        return await asyncio.to_thread(decode_embeddings, data, len(inputs))
+
+    async def embed_many(self, model: str, inputs: List[str], batch_size: int = 64, **params: Any) -> np.ndarray:
+        """Embed a large input list as concurrent batches, keeping the server busy."""
+        batches = (inputs[i:i + batch_size] for i in range(0, len(inputs), batch_size))
+        parts = [m async for m in self.map_bounded(lambda b: self.embeddings(model, b, **params), batches)]
+        return np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32)
+
+    # ------------------------------------------------------------------ rerank
+    async def rerank(self, model: str, query: str, documents: List[str], **params: Any) -> List[float]:
+        """Return one relevance score per document, in document order."""
+        payload = {"model": model, "query": query, "documents": documents, "batch_size": len(documents), **params}
+        data = await self.post_json("/v1/reranking", payload)
+        return list((data or {}).get("result", []))
+
+    # ------------------------------------------------------------------- audio
+    async def transcribe(self, model: str, path: str, **fields: Any) -> Dict[str, Any]:
+        audio = await asyncio.to_thread(_read_file, path)
+        form = {"model": model, **{k: str(v) for k, v in fields.items()}}
+        async with self._sem:
+            resp = await self._http.post(
+                "/v1/audio/transcriptions",
+                data=form,
+                files={"file": (os.path.basename(path), audio)},
+            )
+            self._raise_for_status(resp)
+            return resp.json()
+
+    async def speech(self, model: str, text: str, voice: str = "", **params: Any) -> bytes:
+        """Synthesize speech and return the audio file bytes."""
+        body = await asyncio.to_thread(_encode_json, {"model": model, "input": text, "voice": voice, **params})
+        async with self._sem:
+            resp = await self._http.post("/v1/audio/speech", content=body, headers=_JSON_HEADERS)
+            self._raise_for_status(resp)
+            return resp.content
+
+    # ------------------------------------------------------------------ images
+    async def image_generations(self, model: str, prompt: str, **params: Any) -> Dict[str, Any]:
+        payload = {"model": model, "prompt": prompt, "response_format": "b64_json", **params}
+        return await self.post_json("/v1/images/generations", payload)
+
+    @staticmethod
+    async def image_data_url(path: str) -> str:
+        """Read and base64-encode an image in a worker thread for use in chat messages."""
+        return await asyncio.to_thread(_file_to_data_url, path)
+
+    # -------------------------------------------------------------- pipelining
+    async def map_bounded(
+        self, fn: Callable[[T], Awaitable[R]], items: Iterable[T], window: Optional[int] = None
+    ) -> AsyncIterator[R]:
+        """
+        Apply fn to items with at most `window` tasks pending, yielding results in input order.
+
+        Items are pulled lazily, so a slow consumer or a busy server applies
+        backpressure all the way to the producer. Leaving the loop early, or
+        an exception from any task, cancels everything still pending.
+        """
+        window = window or self.max_in_flight * 2
+        it = iter(items)
+        pending: List[asyncio.Task[R]] = []
+        try:
+            for item in it:
+                pending.append(asyncio.ensure_future(fn(item)))
+                if len(pending) >= window:
+                    yield await pending.pop(0)
+            while pending:
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,112 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Aggregate QPS of single-text embedding requests, direct vs micro-batched.
+
+Starts a stand-in /v1/embeddings server that, like `nexa serve`, handles one
+request at a time and charges a fixed per-request cost plus a per-input
+cost, then fires --requests one-text requests from --threads threads.
+
+    python bench_microbatch.py --threads 16 --request-ms 8 --input-ms 0.5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from serve_client.client import NexaHTTPClient
+from serve_client.embeddings import decode_embeddings
+from serve_client.microbatch import EmbeddingMicroBatcher
+
+DIM = 256
+
+
+def start_upstream(request_s: float, input_s: float) -> ThreadingHTTPServer:
+    gil = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args) -> None:
+            pass
+
+        def do_POST(self) -> None:
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            inputs = req["input"] if isinstance(req["input"], list) else [req["input"]]
+            with gil:
+                time.sleep(request_s + input_s * len(inputs))
+            data = [{"object": "embedding", "index": i, "embedding": [float(len(t))] * DIM} for i, t in enumerate(inputs)]
+            body = json.dumps({"object": "list", "data": data, "usage": {"prompt_tokens": len(inputs)}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(name: str, embed, threads: int, requests: int) -> None:
+    texts = [f"query number {i}" for i in range(requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for text, vec in zip(texts, pool.map(embed, texts)):
+            assert vec.shape == (1, DIM) and vec[0, 0] == len(text)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<14} {requests / elapsed:8.1f} req/s  {elapsed * 1000 / requests:7.2f} ms/req amortized")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Micro-batching embeddings QPS")
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--request-ms", type=float, default=8.0, help="fixed server cost per request")
+    ap.add_argument("--input-ms", type=float, default=0.5, help="server cost per input text")
+    ap.add_argument("--max-batch", type=int, default=32)
+    ap.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    server = start_upstream(args.request_ms / 1000, args.input_ms / 1000)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    client = NexaHTTPClient(base, pool_maxsize=args.threads)
+    batcher = EmbeddingMicroBatcher(client=client, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+
+    def direct(text):
+        data = client.post_json("/v1/embeddings", {"model": "bench", "input": [text]})
+        return decode_embeddings(data, 1)
+
+    def batched(text):
+        return batcher.embed("bench", [text])
+
+    run("direct", direct, args.threads, args.requests)
+    run("micro-batched", batched, args.threads, args.requests)
+    print(f"batcher: {batcher.stats()}")
+    batcher.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
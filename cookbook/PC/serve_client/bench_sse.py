@@ -0,0 +1,140 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Per-token client overhead of SSE chat stream parsing.
+
+Replays a synthetic /v1/chat/completions stream, split into random network
+chunk sizes, through the incremental parser and through the previous
+`iter_lines(decode_unicode=True)` + str slicing loop, and prints µs/token.
+
+    python bench_sse.py --tokens 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from serve_client.sse import DONE, ChatStreamParser, SSEParser, iter_chat_content
+
+
+def make_stream(tokens: int) -> bytes:
+    words = ["the", " quick", " brown", " fox", " jumps", " über", " 懒", " dog", ".\n", " \"quoted\""]
+    out = bytearray()
+    for i in range(tokens):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "bench",
+            "choices": [{"index": 0, "delta": {"content": words[i % len(words)]}}],
+        }
+        out += b"data:" + json.dumps(chunk).encode() + b"\n\n"
+    usage = {"choices": [], "usage": {"prompt_tokens": 10, "completion_tokens": tokens, "total_tokens": tokens + 10}}
+    out += b"data:" + json.dumps(usage).encode() + b"\n\ndata:[DONE]\n\n"
+    return bytes(out)
+
+
+def split_chunks(data: bytes, seed: int = 0) -> List[bytes]:
+    rng = random.Random(seed)
+    chunks, i = [], 0
+    while i < len(data):
+        n = rng.randint(1, 512)
+        chunks.append(data[i:i + n])
+        i += n
+    return chunks
+
+
+def legacy_iter_lines(chunks: List[bytes]) -> Iterator[str]:
+    """Same algorithm as requests' iter_lines(decode_unicode=True) over the same chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = None
+    for raw in chunks:
+        chunk = decoder.decode(raw)
+        if pending is not None:
+            chunk = pending + chunk
+        lines = chunk.splitlines()
+        if lines and lines[-1] and chunk and lines[-1][-1] == chunk[-1]:
+            pending = lines.pop()
+        else:
+            pending = None
+        yield from lines
+    if pending is not None:
+        yield pending
+
+
+def legacy_parse(chunks: List[bytes]) -> Iterator[str]:
+    for raw in legacy_iter_lines(chunks):
+        if not raw:
+            continue
+        if raw.startswith("data:"):
+            data = raw[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                obj = json.loads(data)
+            except Exception:
+                continue
+            choices = obj.get("choices", [])
+            if choices:
+                piece = (choices[0].get("delta") or {}).get("content", "")
+                if piece:
+                    yield piece
+
+
+def check_split_crlf() -> None:
+    """CRLF streams must parse the same however the reads split each "\\r\\n"."""
+    data = b'data: {"choices":[{"delta":{"content":"a"}}]}\r\n\r\ndata: [DONE]\r\n\r\n'
+    for cut in range(1, len(data)):
+        parser = SSEParser()
+        events = parser.feed(data[:cut]) + parser.feed(data[cut:])
+        assert events == ['{"choices":[{"delta":{"content":"a"}}]}', DONE], (cut, events)
+
+
+def run(name: str, fn, chunks: List[bytes], tokens: int, repeat: int) -> None:
+    best = float("inf")
+    text = ""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        text = "".join(fn(chunks))
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<12} {best * 1e6 / tokens:8.2f} us/token  {tokens / best:12,.0f} tokens/s  ({len(text)} chars)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SSE chat stream parsing overhead")
+    ap.add_argument("--tokens", type=int, default=20000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    chunks = split_chunks(make_stream(args.tokens))
+    parser = ChatStreamParser()
+    assert "".join(iter_chat_content(chunks, parser)) == "".join(legacy_parse(chunks))
+    assert parser.done and parser.usage and parser.usage["completion_tokens"] == args.tokens
+    check_split_crlf()
+
+    run("incremental", iter_chat_content, chunks, args.tokens, args.repeat)
+    run("legacy", legacy_parse, chunks, args.tokens, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Response cache for deterministic /v1/chat/completions requests.
+
+Agents and eval loops resend identical temperature-0 prompts many times.
+`ChatCache` keys each request by its normalized JSON (model, messages,
+tools, sampling params; transport fields like `stream` excluded) and
+`CachedChat` answers repeats from the cache in either form: a JSON
+completion, or an SSE stream replayed with the original token boundaries.
+A completion first seen as a stream can be replayed as JSON and vice versa.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional
+
+from .client import NexaHTTPClient
+from .sse import ChatStreamParser
+
+# Request fields that change the transport, not the completion
+_TRANSPORT_FIELDS = ("stream", "stream_options", "user")
+
+
+def is_deterministic(payload: Dict[str, Any], default: bool = False) -> bool:
+    """
+    Whether a request always yields the same completion: greedy decoding
+    (temperature 0 or top_k 1) or a fixed seed, with a single choice.
+
+    Args:
+        default: Answer for requests that set none of these, i.e. when the
+            server's own sampler defaults are known to be greedy
+    """
+    if payload.get("n", 1) != 1:
+        return False
+    if payload.get("temperature") == 0 or payload.get("top_k") == 1 or payload.get("seed") is not None:
+        return True
+    return default and all(payload.get(k) is None for k in ("temperature", "top_k", "top_p"))
+
+
+def cache_key(payload: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON of the request, minus transport fields."""
+    body = {k: v for k, v in payload.items() if k not in _TRANSPORT_FIELDS and v is not None}
+    canonical = json.dumps(body, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CachedCompletion:
+    """One cached completion: the final JSON body plus the streamed content pieces."""
+
+    __slots__ = ("completion", "pieces", "latency_s", "created", "size")
+
+    def __init__(self, completion: Dict[str, Any], pieces: List[str], latency_s: float) -> None:
+        self.completion = completion
+        self.pieces = pieces
+        self.latency_s = latency_s
+        self.created = time.monotonic()
+        self.size = len(json.dumps(completion, ensure_ascii=False)) + sum(len(p) for p in pieces)
+
+
+class ChatCache:
+    """
+    Thread-safe LRU of completions with a TTL and entry/size bounds.
+
+    Args:
+        max_entries: Max cached completions
+        max_bytes: Approximate max total size of cached completions
+        ttl: Seconds an entry stays valid; None keeps entries until evicted
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 << 20, ttl: Optional[float] = 3600) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedCompletion]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.expired = 0
+        self.saved_s = 0.0
+
+    def get(self, key: str) -> Optional[CachedCompletion]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry.created > self.ttl:
+                self._drop(key)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_s += entry.latency_s
+            return entry
+
+    def put(self, key: str, entry: CachedCompletion) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key).size
+
+    def bypass(self) -> None:
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate, size, and upstream seconds saved by hits."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "saved_s": round(self.saved_s, 3),
+            }
+
+
+def _merge_tool_calls(deltas: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Assemble streamed tool_call fragments (keyed by index) into complete calls."""
+    calls: Dict[int, Dict[str, Any]] = {}
+    for d in deltas:
+        call = calls.setdefault(d.get("index", 0), {"id": "", "type": "function", "function": {"name": "", "arguments": ""}})
+        if d.get("id"):
+            call["id"] = d["id"]
+        fn = d.get("function") or {}
+        call["function"]["name"] += fn.get("name") or ""
+        call["function"]["arguments"] += fn.get("arguments") or ""
+    return [calls[i] for i in sorted(calls)]
+
+
+def completion_from_stream(model: str, pieces: List[str], parser: ChatStreamParser) -> Dict[str, Any]:
+    """Build the JSON completion a non-streaming request would have returned."""
+    message: Dict[str, Any] = {"role": "assistant", "content": "".join(pieces)}
+    if parser.tool_calls:
+        message["tool_calls"] = _merge_tool_calls(parser.tool_calls)
+    completion: Dict[str, Any] = {
+        "id": "chatcmpl-cache",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": parser.finish_reason or "stop"}],
+    }
+    if parser.usage:
+        completion["usage"] = parser.usage
+    return completion
+
+
+def _frame(obj: Any) -> bytes:
+    return b"data:" + json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n\n"
+
+
+def replay_stream(entry: CachedCompletion, include_usage: bool = False) -> Iterator[bytes]:
+    """SSE frames for a cached completion, in the server's own chunk format."""
+    completion = entry.completion
+    choice = (completion.get("choices") or [{}])[0]
+    message = choice.get("message") or {}
+    base = {
+        "id": completion.get("id", "chatcmpl-cache"),
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": completion.get("model", ""),
+    }
+    # Entries first seen as JSON have no token boundaries; send the content in one delta
+    pieces = entry.pieces or ([message["content"]] if message.get("content") else [])
+    for piece in pieces:
+        yield _frame({**base, "choices": [{"index": 0, "delta": {"content": piece}}]})
+    if message.get("tool_calls"):
+        calls = [{"index": i, **c} for i, c in enumerate(message["tool_calls"])]
+        yield _frame({**base, "choices": [{"index": 0, "delta": {"tool_calls": calls}}]})
+    yield _frame({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": choice.get("finish_reason", "stop")}]})
+    if include_usage and completion.get("usage"):
+        yield _frame({**base, "choices": [], "usage": completion["usage"]})
+    yield b"data:[DONE]\n\n"
+
+
+class CachedChat:
+    """
+    /v1/chat/completions through a `ChatCache`.
+
+    Deterministic requests are answered from the cache when possible and
+    stored after a successful upstream call; all other requests go straight
+    to the server.
+
+    Args:
+        client: Upstream client
+        cache: Cache to use; a new default-sized one when omitted
+        deterministic_default: Treat requests without sampling params as
+            deterministic (only if the server's defaults are greedy)
+    """
+
+    PATH = "/v1/chat/completions"
+
+    def __init__(self, client: NexaHTTPClient, cache: Optional[ChatCache] = None,
+                 deterministic_default: bool = False) -> None:
+        self.client = client
+        self.cache = cache if cache is not None else ChatCache()
+        self.deterministic_default = deterministic_default
+
+    def _key(self, payload: Dict[str, Any]) -> Optional[str]:
+        if not is_deterministic(payload, self.deterministic_default):
+            self.cache.bypass()
+            return None
+        return cache_key(payload)
+
+    def complete(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Non-streaming completion, from the cache when possible."""
+        payload = {**payload, "stream": False}
+        key = self._key(payload)
+        if key is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry.completion
+        start = time.perf_counter()
+        data = self.client.post_json(self.PATH, payload)
+        if key is not None and data.get("choices"):
+            self.cache.put(key, CachedCompletion(data, [], time.perf_counter() - start))
+        return data
+
+    def stream(self, payload: Dict[str, Any]) -> Iterator[bytes]:
+        """
+        Raw SSE bytes of a streaming completion, from the cache when possible.
+
+        On a miss the upstream stream is passed through as it arrives and
+        stored once it ends with [DONE] and no error frame.
+        """
+        payload = {**payload, "stream": True}
+        include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+        key = self._key(payload)
+        if key is not None:
+            entry = self.cache.get(key)
+            if entry is not None:
+                yield from replay_stream(entry, include_usage)
+                return
+        parser = ChatStreamParser()
+        pieces: List[str] = []
+        start = time.perf_counter()
+        with self.client.stream(self.PATH, payload) as resp:
+            for chunk in resp.iter_content(chunk_size=None):
+                if key is not None:
+                    pieces.extend(parser.feed(chunk))
+                yield chunk
+        if key is not None and parser.done and parser.error is None:
+            completion = completion_from_stream(payload.get("model", ""), pieces, parser)
+            self.cache.put(key, CachedCompletion(completion, pieces, time.perf_counter() - start))
@@ -0,0 +1,231 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_ENDPOINT = "http://127.0.0.1:18181"
+
+# Statuses retried with backoff: the server is restarting or overloaded
+RETRY_STATUS = (502, 503, 504)
+# POST endpoints that are safe to repeat; chat, audio and image generation are not
+REPEATABLE_POSTS = ("/v1/embeddings", "/v1/reranking")
+
+
+class EndpointStats:
+    """Latency counters for a single endpoint path."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.bytes_sent = 0
+
+    def record(self, elapsed: float, sent: int, ok: bool) -> None:
+        self.count += 1
+        self.total_s += elapsed
+        self.max_s = max(self.max_s, elapsed)
+        self.bytes_sent += sent
+        if not ok:
+            self.errors += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_s": round(self.total_s, 6),
+            "avg_ms": round(self.total_s / self.count * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.max_s * 1000, 3),
+            "bytes_sent": self.bytes_sent,
+        }
+
+
+class NexaHTTPClient:
+    """
+    Connection-pooled HTTP client for `nexa serve`.
+
+    One keep-alive session is shared by every call so embedding batches and
+    chat turns reuse TCP connections instead of reconnecting per request.
+
+    Args:
+        base_url: Server base URL, e.g. http://127.0.0.1:18181
+        timeout: Default request timeout in seconds
+        pool_maxsize: Max pooled connections kept alive per host
+        retries: Retries on connection errors, and on 502/503/504 responses for GET
+            and REPEATABLE_POSTS only (other POSTs may already have run on the server)
+        backoff_factor: Exponential backoff factor between retries (seconds)
+        compress_min_bytes: Gzip request bodies at least this large; None disables
+            request compression (older servers cannot decode gzip bodies)
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_ENDPOINT,
+        timeout: float = 300,
+        pool_maxsize: int = 8,
+        retries: int = 2,
+        backoff_factor: float = 0.5,
+        compress_min_bytes: Optional[int] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.compress_min_bytes = compress_min_bytes
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+
+        # Connection errors are retried for every method (the request never reached
+        # the server); status retries only for GET, see post() for REPEATABLE_POSTS
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS,
+            allowed_methods=frozenset({"GET"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Connection": "keep-alive",
+            "Accept-Encoding": "gzip",
+            "Content-Type": "application/json",
+        })
+
+        self._stats: Dict[str, EndpointStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        return self.base_url + "/" + path.lstrip("/")
+
+    def _encode(self, payload: Any) -> tuple[bytes, Dict[str, str]]:
+        """Serialize once to compact UTF-8 JSON, gzip it above the threshold."""
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if self.compress_min_bytes is not None and len(body) >= self.compress_min_bytes:
+            return gzip.compress(body, compresslevel=1), {"Content-Encoding": "gzip"}
+        return body, {}
+
+    def _record(self, path: str, elapsed: float, sent: int, ok: bool) -> None:
+        with self._stats_lock:
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = self._stats[path] = EndpointStats()
+            stats.record(elapsed, sent, ok)
+
+    def post(self, path: str, payload: Any, timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+        """
+        POST a JSON payload and return the raw response. 502/503/504 responses
+        are retried with backoff for REPEATABLE_POSTS only.
+
+        Raises:
+            requests.HTTPError: If the server answers with a 4xx or 5xx status
+        """
+        body, headers = self._encode(payload)
+        attempts = self.retries + 1 if "/" + path.lstrip("/") in REPEATABLE_POSTS else 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            for attempt in range(attempts):
+                resp = self.session.post(
+                    self.url(path), data=body, headers=headers, timeout=timeout or self.timeout, **kwargs
+                )
+                if resp.status_code not in RETRY_STATUS or attempt == attempts - 1:
+                    break
+                resp.close()
+                time.sleep(self.backoff_factor * (2 ** attempt))
+            if resp.status_code >= 400:
+                raise requests.HTTPError(f"{resp.status_code} {self.url(path)}\n{resp.text}", response=resp)
+            ok = True
+            return resp
+        finally:
+            self._record(path, time.perf_counter() - start, len(body), ok)
+
+    def post_json(self, path: str, payload: Any, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """POST a JSON payload and return the decoded JSON response."""
+        return self.post(path, payload, timeout=timeout).json()
+
+    @contextmanager
+    def stream(self, path: str, payload: Any, timeout: Optional[float] = None) -> Iterator[requests.Response]:
+        """
+        POST a JSON payload and yield the streaming response.
+
+        The latency counter covers the whole stream, up to when the caller
+        leaves the context.
+        """
+        body, headers = self._encode(payload)
+        start = time.perf_counter()
+        ok = False
+        try:
+            with self.session.post(
+                self.url(path), data=body, headers=headers, stream=True, timeout=timeout or self.timeout
+            ) as resp:
+                resp.raise_for_status()
+                yield resp
+                ok = True
+        finally:
+            self._record(path, time.perf_counter() - start, len(body), ok)
+
+    def get_json(self, path: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        start = time.perf_counter()
+        ok = False
+        try:
+            resp = self.session.get(self.url(path), timeout=timeout or self.timeout)
+            resp.raise_for_status()
+            ok = True
+            return resp.json()
+        finally:
+            self._record(path, time.perf_counter() - start, 0, ok)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint latency counters: count, errors, avg/max latency, bytes sent."""
+        with self._stats_lock:
+            return {path: s.as_dict() for path, s in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self._stats.clear()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: Dict[str, NexaHTTPClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url: str = DEFAULT_ENDPOINT, **kwargs: Any) -> NexaHTTPClient:
+    """
+    Return the process-wide client for base_url, creating it on first use.
+    Keyword arguments only apply when the client is created.
+    """
+    key = base_url.rstrip("/")
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = NexaHTTPClient(key, **kwargs)
+        return client
@@ -0,0 +1,65 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Request this from /v1/embeddings: each vector comes back as base64 of its
+# little-endian float32 bytes instead of a JSON array of decimal numbers.
+ENCODING_FORMAT = "base64"
+
+_F32LE = np.dtype("<f4")
+
+
+def decode_embeddings(data: Optional[Dict[str, Any]], n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Decode a /v1/embeddings response into an (n, dim) float32 matrix.
+
+    Rows are placed by each item's "index". Both base64 and float-list items
+    are accepted, so servers that ignore encoding_format still work.
+
+    Args:
+        data: Parsed JSON response
+        n: Number of inputs in the request
+        out: Optional preallocated (n, dim) float32 array (e.g. a slice of the
+            index matrix) to decode into without an intermediate copy
+
+    Raises:
+        ValueError: If the response does not contain exactly n embeddings
+    """
+    items: List[Dict[str, Any]] = (data or {}).get("data") or []
+    if len(items) != n:
+        raise ValueError(f"Expected {n} embeddings, got {len(items)}")
+    if n == 0:
+        return out if out is not None else np.empty((0, 0), dtype=np.float32)
+
+    indices = [it.get("index", i) for i, it in enumerate(items)]
+    if sorted(indices) != list(range(n)):
+        # Tolerate missing/duplicate indices: assume response order matches input order
+        indices = list(range(n))
+
+    for row, item in zip(indices, items):
+        emb = item.get("embedding")
+        if isinstance(emb, str):
+            vec = np.frombuffer(base64.b64decode(emb), dtype=_F32LE)
+        else:
+            vec = np.asarray(emb, dtype=np.float32)
+        if out is None:
+            out = np.empty((n, vec.shape[0]), dtype=np.float32)
+        out[row] = vec
+    return out
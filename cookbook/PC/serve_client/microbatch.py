@@ -0,0 +1,208 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro-batching for /v1/embeddings.
+
+`nexa serve` handles one request at a time, so many threads each embedding
+a single query pay the full per-request overhead one after another.
+`EmbeddingMicroBatcher` queues concurrent requests for the same model,
+sends them as one batched call once `max_batch` inputs are waiting or the
+oldest has waited `max_wait` seconds, and hands each caller its own rows.
+While a batch is in flight the next one keeps filling, so the batch size
+grows with load by itself.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .client import DEFAULT_ENDPOINT, NexaHTTPClient, get_client
+from .embeddings import ENCODING_FORMAT, decode_embeddings
+
+
+class BatchedEmbedding(NamedTuple):
+    """Rows of one caller's request and its share of the batch's prompt tokens."""
+    vectors: np.ndarray
+    prompt_tokens: int
+
+
+class _Pending(NamedTuple):
+    inputs: List[str]
+    future: "Future[BatchedEmbedding]"
+    enqueued: float
+
+
+class _ModelQueue:
+    """Pending requests for one (model, params) key, drained by one worker thread."""
+
+    def __init__(self) -> None:
+        self.items: List[_Pending] = []
+        self.cond = threading.Condition()
+        self.thread: Optional[threading.Thread] = None
+
+
+class EmbeddingMicroBatcher:
+    """
+    Coalesces concurrent /v1/embeddings requests into batched calls.
+
+    Args:
+        base_url: Upstream `nexa serve` URL (ignored when client is given)
+        client: Client to send batches with; defaults to the shared pooled client
+        max_batch: Max inputs per upstream call; a single larger request is
+            still sent whole
+        max_wait: Max seconds the oldest queued request waits for others
+            before its batch is sent
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_ENDPOINT,
+        client: Optional[NexaHTTPClient] = None,
+        max_batch: int = 32,
+        max_wait: float = 0.005,
+    ) -> None:
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self.client = client or get_client(base_url)
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._queues: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], _ModelQueue] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.requests = 0
+        self.inputs = 0
+        self.batches = 0
+        self.max_batch_seen = 0
+        self.queue_wait_s = 0.0
+
+    # ---------------------------------------------------------------- public
+    def submit(self, model: str, inputs: List[str], **params: Any) -> "Future[BatchedEmbedding]":
+        """
+        Queue inputs for embedding and return a future for their rows.
+
+        Requests are only combined with others for the same model and the
+        same extra params (e.g. dimensions).
+        """
+        future: Future[BatchedEmbedding] = Future()
+        if not inputs:
+            future.set_result(BatchedEmbedding(np.empty((0, 0), dtype=np.float32), 0))
+            return future
+
+        key = (model, tuple(sorted(params.items())))
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingMicroBatcher is closed")
+            q = self._queues.get(key)
+            if q is None:
+                q = self._queues[key] = _ModelQueue()
+            if q.thread is None:
+                q.thread = threading.Thread(
+                    target=self._worker, args=(key, q), name=f"embed-batch-{model}", daemon=True
+                )
+                q.thread.start()
+        with q.cond:
+            q.items.append(_Pending(list(inputs), future, time.perf_counter()))
+            q.cond.notify()
+        return future
+
+    def embed(self, model: str, inputs: List[str], timeout: Optional[float] = None, **params: Any) -> np.ndarray:
+        """Blocking helper: an (len(inputs), dim) float32 matrix for inputs."""
+        return self.submit(model, inputs, **params).result(timeout).vectors
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests, inputs and upstream batches so far, with average batch size and queue wait."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "inputs": self.inputs,
+                "batches": self.batches,
+                "avg_batch": round(self.inputs / self.batches, 2) if self.batches else 0.0,
+                "max_batch": self.max_batch_seen,
+                "avg_queue_wait_ms": round(self.queue_wait_s / self.requests * 1000, 3) if self.requests else 0.0,
+            }
+
+    def close(self) -> None:
+        """Stop the workers once their queues are drained."""
+        with self._lock:
+            self._closed = True
+            queues = list(self._queues.values())
+        for q in queues:
+            with q.cond:
+                q.cond.notify_all()
+        for q in queues:
+            if q.thread is not None:
+                q.thread.join()
+
+    # -------------------------------------------------------------- internal
+    def _take_batch(self, q: _ModelQueue) -> List[_Pending]:
+        """Wait for the first request, then collect more until max_batch or max_wait."""
+        with q.cond:
+            while not q.items:
+                if self._closed:
+                    return []
+                q.cond.wait()
+            deadline = q.items[0].enqueued + self.max_wait
+            while sum(len(p.inputs) for p in q.items) < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                q.cond.wait(remaining)
+
+            batch, count = [], 0
+            while q.items and (not batch or count + len(q.items[0].inputs) <= self.max_batch):
+                pending = q.items.pop(0)
+                batch.append(pending)
+                count += len(pending.inputs)
+            return batch
+
+    def _worker(self, key: Tuple[str, Tuple[Tuple[str, Any], ...]], q: _ModelQueue) -> None:
+        model, params = key
+        while True:
+            batch = self._take_batch(q)
+            if not batch:
+                return
+            sent = time.perf_counter()
+            texts = [t for p in batch for t in p.inputs]
+            try:
+                payload = {"model": model, "input": texts, "encoding_format": ENCODING_FORMAT, **dict(params)}
+                data = self.client.post_json("/v1/embeddings", payload)
+                mat = decode_embeddings(data, len(texts))
+                total_tokens = int(((data or {}).get("usage") or {}).get("prompt_tokens") or 0)
+            except Exception as e:  # fan the failure out to every waiting caller
+                for p in batch:
+                    p.future.set_exception(e)
+                continue
+
+            with self._lock:
+                self.requests += len(batch)
+                self.inputs += len(texts)
+                self.batches += 1
+                self.max_batch_seen = max(self.max_batch_seen, len(texts))
+                self.queue_wait_s += sum(sent - p.enqueued for p in batch)
+
+            row = 0
+            for p in batch:
+                n = len(p.inputs)
+                # Upstream usage covers the whole batch; split it by input count
+                share = total_tokens * n // len(texts)
+                p.future.set_result(BatchedEmbedding(mat[row:row + n], share))
+                row += n
@@ -0,0 +1,257 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Local proxy for `nexa serve`.
+
+Point OpenAI-compatible clients at the proxy instead of the server.
+/v1/embeddings requests with string inputs are coalesced by
+`EmbeddingMicroBatcher`. With --chat-cache, deterministic
+/v1/chat/completions requests are answered through `CachedChat`.
+Everything else is forwarded unchanged (streamed).
+
+    python -m serve_client.proxy --upstream http://127.0.0.1:18181 --port 18182 \
+        --max-batch 32 --max-wait-ms 5 --chat-cache
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+import requests
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    __package__ = "serve_client"
+
+from .chat_cache import CachedChat, ChatCache
+from .client import DEFAULT_ENDPOINT, NexaHTTPClient
+from .microbatch import EmbeddingMicroBatcher
+
+# Hop-by-hop and framing headers are recomputed when forwarding. A gzip request body is
+# forwarded as is, so it keeps its Content-Encoding; response bodies arrive decoded from
+# iter_content, so theirs is dropped.
+_SKIP_REQUEST_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "host"}
+_SKIP_RESPONSE_HEADERS = _SKIP_REQUEST_HEADERS | {"content-encoding"}
+
+
+def embeddings_response(model: str, vectors: np.ndarray, prompt_tokens: int, encoding_format: str) -> Dict[str, Any]:
+    """Build an OpenAI-style embeddings response for one caller's rows."""
+    if encoding_format == "base64":
+        rows = [base64.b64encode(np.ascontiguousarray(v, dtype="<f4").tobytes()).decode("ascii") for v in vectors]
+    else:
+        rows = vectors.tolist()
+    return {
+        "object": "list",
+        "model": model,
+        "data": [{"object": "embedding", "index": i, "embedding": e} for i, e in enumerate(rows)],
+        "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+    }
+
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "NexaProxy"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, obj: Any) -> None:
+        body = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _compressed(self) -> bool:
+        return "gzip" in (self.headers.get("Content-Encoding") or "")
+
+    def do_POST(self) -> None:
+        body = self._read_body()
+        path = self.path.rstrip("/")
+        # Compressed bodies are not parsed here; they go to the server untouched
+        if path == "/v1/chat/completions" and self.server.chat is not None and not self._compressed():
+            try:
+                req = json.loads(body or b"{}")
+            except ValueError:
+                req = None
+            if isinstance(req, dict):
+                self._cached_chat(req)
+                return
+        if path == "/v1/embeddings" and not self._compressed():
+            try:
+                req = json.loads(body or b"{}")
+            except ValueError:
+                req = None
+            inputs = req.get("input") if isinstance(req, dict) else None
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            if isinstance(inputs, list) and inputs and all(isinstance(t, str) for t in inputs):
+                self._batched_embeddings(req, inputs)
+                return
+            # Token-id inputs and malformed bodies go to the server as they are
+        self._forward("POST", body)
+
+    def do_GET(self) -> None:
+        if self.path == "/proxy/stats":
+            stats = {"batcher": self.server.batcher.stats(), "upstream": self.server.client.stats()}
+            if self.server.chat is not None:
+                stats["chat_cache"] = self.server.chat.cache.stats()
+            self._send_json(200, stats)
+            return
+        self._forward("GET", None)
+
+    def _batched_embeddings(self, req: Dict[str, Any], inputs: list) -> None:
+        model = req.get("model", "")
+        encoding_format = req.get("encoding_format") or "float"
+        params = {k: v for k, v in req.items() if k not in ("model", "input", "encoding_format")}
+        try:
+            result = self.server.batcher.submit(model, inputs, **params).result()
+        except requests.RequestException as e:
+            self._send_upstream_error(e)
+            return
+        except Exception as e:
+            self._send_json(502, {"error": str(e)})
+            return
+        self._send_json(200, embeddings_response(model, result.vectors, result.prompt_tokens, encoding_format))
+
+    def _send_upstream_error(self, e: requests.RequestException) -> None:
+        resp = e.response
+        if resp is not None:
+            self._send_json(resp.status_code, {"error": resp.text})
+        else:
+            self._send_json(502, {"error": str(e)})
+
+    def _cached_chat(self, req: Dict[str, Any]) -> None:
+        chat = self.server.chat
+        if not req.get("stream"):
+            try:
+                data = chat.complete(req)
+            except requests.RequestException as e:
+                self._send_upstream_error(e)
+                return
+            self._send_json(200, data)
+            return
+
+        frames = chat.stream(req)
+        try:
+            # Pull the first frame before committing to a 200 so upstream errors keep their status
+            first = next(frames, b"")
+        except requests.RequestException as e:
+            self._send_upstream_error(e)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        try:
+            if first:
+                self.wfile.write(first)
+            for frame in frames:
+                self.wfile.write(frame)
+                self.wfile.flush()
+        except (requests.RequestException, OSError):
+            pass
+        finally:
+            frames.close()
+        self.close_connection = True
+
+    def _forward(self, method: str, body: Any) -> None:
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in _SKIP_REQUEST_HEADERS}
+        try:
+            with self.server.client.session.request(
+                method, self.server.client.url(self.path), data=body, headers=headers,
+                stream=True, timeout=self.server.client.timeout,
+            ) as resp:
+                self.send_response(resp.status_code)
+                for k, v in resp.headers.items():
+                    if k.lower() not in _SKIP_RESPONSE_HEADERS:
+                        self.send_header(k, v)
+                # Length is unknown while streaming (SSE), so close after the body
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for chunk in resp.iter_content(chunk_size=None):
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+            self.close_connection = True
+        except requests.RequestException as e:
+            self._send_json(502, {"error": str(e)})
+
+
+class NexaProxy(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, batcher: EmbeddingMicroBatcher, chat: Optional[CachedChat] = None,
+                 verbose: bool = False) -> None:
+        super().__init__(address, ProxyHandler)
+        self.batcher = batcher
+        self.client = batcher.client
+        self.chat = chat
+        self.verbose = verbose
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Micro-batching and caching proxy for nexa serve")
+    ap.add_argument("--upstream", default=DEFAULT_ENDPOINT, help="nexa serve base URL")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=18182)
+    ap.add_argument("--max-batch", type=int, default=32, help="max inputs per upstream embeddings call")
+    ap.add_argument("--max-wait-ms", type=float, default=5.0, help="max time a request waits for others")
+    ap.add_argument("--chat-cache", action="store_true", help="cache deterministic chat completions")
+    ap.add_argument("--chat-cache-ttl", type=float, default=3600, help="seconds a cached completion stays valid")
+    ap.add_argument("--chat-cache-size", type=int, default=1024, help="max cached completions")
+    ap.add_argument("--chat-cache-mb", type=int, default=64, help="max total size of cached completions")
+    ap.add_argument("--greedy-default", action="store_true",
+                    help="also cache requests without sampling params (server defaults are greedy)")
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    args = ap.parse_args()
+
+    client = NexaHTTPClient(args.upstream, pool_maxsize=16)
+    batcher = EmbeddingMicroBatcher(client=client, max_batch=args.max_batch, max_wait=args.max_wait_ms / 1000)
+    chat = None
+    if args.chat_cache:
+        cache = ChatCache(max_entries=args.chat_cache_size, max_bytes=args.chat_cache_mb << 20, ttl=args.chat_cache_ttl)
+        chat = CachedChat(client, cache, deterministic_default=args.greedy_default)
+    server = NexaProxy((args.host, args.port), batcher, chat=chat, verbose=args.verbose)
+    print(f"[info] Proxy on http://{args.host}:{args.port} -> {args.upstream} "
+          f"(max_batch={args.max_batch}, max_wait={args.max_wait_ms}ms, chat_cache={'on' if chat else 'off'}); "
+          f"stats at /proxy/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        print(f"[info] {batcher.stats()}")
+        if chat is not None:
+            print(f"[info] {chat.cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Incremental byte-level Server-Sent Events parser for /v1/chat/completions.
+
+Feed raw network chunks in whatever sizes they arrive; complete events come
+out as soon as their terminating blank line is seen. Event boundaries are
+found on the raw receive buffer, every complete run of events is decoded
+with a single bytes.decode and split in C, and the common single-line
+`data:` event takes a fast path with no per-line Python loop.
+
+Stdlib only, so it can be copied next to a single-file app if needed.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+DONE = "[DONE]"
+
+_loads = json.loads
+
+
+class SSEParser:
+    """
+    Incremental SSE event splitter.
+
+    Multi-line events (several `data:` lines) are joined with "\\n" as the
+    SSE spec requires. `event:`, `id:`, `retry:` and comment lines are
+    skipped; chat completions only use `data:`. CRLF line endings are
+    accepted.
+    """
+
+    def __init__(self) -> None:
+        self._buf = bytearray()
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Consume a network chunk and return the data payloads of the events it completed."""
+        buf = self._buf
+        buf += chunk
+        if b"\r" in buf:
+            # Scan the buffer, not the chunk: a CRLF split across reads leaves its CR
+            # in the buffer and the LF-only chunk that completes it must still fold it.
+            # A trailing lone CR stays until its LF arrives.
+            buf[:] = buf.replace(b"\r\n", b"\n")
+        end = buf.rfind(b"\n\n")
+        if end < 0:
+            return []
+        # "\n\n" is always a UTF-8 character boundary, so the block decodes cleanly
+        block = buf[:end].decode("utf-8", "replace")
+        del buf[:end + 2]
+        events = block.split("\n\n")
+        if block.count("\n") == 2 * (len(events) - 1):
+            # Fast path: every event is a single line
+            return [e[6:] if e[5:6] == " " else e[5:] for e in events if e.startswith("data:")]
+        return _split_events(events)
+
+    def close(self) -> List[str]:
+        """Flush an event left unterminated when the stream ended."""
+        out = self.feed(b"\n\n") if self._buf.strip() else []
+        self._buf.clear()
+        return out
+
+
+def _split_events(events: List[str]) -> List[str]:
+    """Slow path: multi-line events, other fields, comments or stray blank lines."""
+    out: List[str] = []
+    for event in events:
+        data = [
+            line[6:] if line[5:6] == " " else line[5:]
+            for line in event.split("\n")
+            if line.startswith("data:")
+        ]
+        if data:
+            out.append("\n".join(data))
+    return out
+
+
+class ChatStreamParser:
+    """
+    Turns /v1/chat/completions SSE bytes into content deltas.
+
+    Besides yielding text, it keeps what the stream reported on the side:
+    `usage` (from `stream_options.include_usage` chunks), `finish_reason`,
+    server `error` frames, the number of `malformed` frames skipped, and
+    whether `[DONE]` was seen.
+    """
+
+    def __init__(self) -> None:
+        self.sse = SSEParser()
+        self.done = False
+        self.usage: Optional[Dict[str, Any]] = None
+        self.finish_reason: Optional[str] = None
+        self.error: Optional[Dict[str, Any]] = None
+        self.malformed = 0
+        self.tool_calls: List[Dict[str, Any]] = []
+
+    def _side(self, obj: Any) -> None:
+        """Record a frame without a content delta: usage, error, tool calls, finish_reason."""
+        if not isinstance(obj, dict):
+            self.malformed += 1
+            return
+        if "error" in obj:
+            self.error = obj
+            return
+        if obj.get("usage"):
+            self.usage = obj["usage"]
+        choices = obj.get("choices")
+        if not choices or not isinstance(choices[0], dict):
+            return
+        choice = choices[0]
+        if choice.get("finish_reason"):
+            self.finish_reason = choice["finish_reason"]
+        delta = choice.get("delta") or {}
+        if delta.get("tool_calls"):
+            self.tool_calls.extend(delta["tool_calls"])
+
+    def _parse(self, events: List[str]) -> List[str]:
+        pieces: List[str] = []
+        for data in events:
+            if data == DONE:
+                self.done = True
+                break
+            try:
+                obj = _loads(data)
+            except ValueError:
+                self.malformed += 1
+                continue
+            try:
+                # Fast path: a plain token delta with nothing else to record
+                choice = obj["choices"][0]
+                piece = choice["delta"]["content"]
+                if piece and choice.get("finish_reason") is None and "usage" not in obj:
+                    pieces.append(piece)
+                    continue
+            except (KeyError, IndexError, TypeError):
+                pass
+            self._side(obj)
+            try:
+                piece = obj["choices"][0]["delta"]["content"]
+            except (KeyError, IndexError, TypeError):
+                continue
+            if piece:
+                pieces.append(piece)
+        return pieces
+
+    def feed(self, chunk: bytes) -> List[str]:
+        """Consume a network chunk and return the content deltas it completed."""
+        if self.done:
+            return []
+        return self._parse(self.sse.feed(chunk))
+
+    def close(self) -> List[str]:
+        if self.done:
+            return []
+        return self._parse(self.sse.close())
+
+
+def iter_chat_content(chunks: Iterable[bytes], parser: Optional[ChatStreamParser] = None) -> Iterator[str]:
+    """
+    Yield content deltas from an iterable of raw response chunks,
+    e.g. `resp.iter_content(chunk_size=None)` of a streaming requests call.
+
+    Pass your own `parser` to read usage / finish_reason / error afterwards.
+    Stops at `[DONE]`.
+    """
+    parser = parser or ChatStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
@@ -0,0 +1,151 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+GBNF grammars for tool calls, built from OpenAI-style tool schemas.
+
+`tools_grammar(tools)` returns a grammar that only accepts
+`{"name": <tool>, "arguments": {...}}` objects whose arguments follow the
+tool's JSON schema: required properties always present, optional ones in
+declared order, enums as literals. Pass it as `SamplerConfig.grammar_string`
+so tool calls decode as valid JSON on the first try. With `allow_text=True`
+the output may instead be a plain-text answer that does not start with `{`,
+and with `parallel=True` it may hold several calls, one per line.
+
+Grammars are cached per toolset, so the agents can call this on every turn.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import re
+from typing import Any, Dict, List
+
+_BASE_RULES = r'''
+space ::= " "?
+char ::= [^"\\\x7F\x00-\x1F] | [\\] (["\\bfnrt] | "u" [0-9a-fA-F]{4})
+string ::= "\"" char* "\"" space
+integer ::= "-"? ([0-9] | [1-9] [0-9]{0,15}) space
+number ::= "-"? ([0-9] | [1-9] [0-9]{0,15}) ("." [0-9]+)? ([eE] [-+]? [0-9]+)? space
+boolean ::= ("true" | "false") space
+null ::= "null" space
+value ::= object | array | string | number | boolean | null
+object ::= "{" space ( string ":" space value ( "," space string ":" space value )* )? "}" space
+array ::= "[" space ( value ( "," space value )* )? "]" space
+text ::= [^{] [^\x00]*
+'''
+
+_PRIMITIVES = {"string": "string", "integer": "integer", "number": "number", "boolean": "boolean", "null": "null"}
+
+
+def _literal(value: Any) -> str:
+    """GBNF literal matching the JSON encoding of value."""
+    encoded = json.dumps(value, ensure_ascii=False)
+    return '"' + encoded.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+class _Builder:
+    def __init__(self) -> None:
+        self.rules: Dict[str, str] = {}
+
+    def add(self, name: str, body: str) -> str:
+        name = re.sub(r"[^a-zA-Z0-9]+", "-", name).strip("-") or "rule"
+        base, i = name, 1
+        while name in self.rules and self.rules[name] != body:
+            i += 1
+            name = f"{base}{i}"
+        self.rules[name] = body
+        return name
+
+    def schema(self, name: str, schema: Dict[str, Any]) -> str:
+        """Rule name for a JSON schema; unknown or open shapes fall back to any JSON value."""
+        if "enum" in schema:
+            return self.add(name, "(" + " | ".join(_literal(v) for v in schema["enum"]) + ") space")
+        if "const" in schema:
+            return self.add(name, _literal(schema["const"]) + " space")
+        typ = schema.get("type")
+        if isinstance(typ, list):
+            return self.add(name, " | ".join(self.schema(f"{name}-{t}", {**schema, "type": t}) for t in typ))
+        if typ in _PRIMITIVES:
+            return _PRIMITIVES[typ]
+        if typ == "array":
+            if "items" not in schema:
+                return "array"
+            item = self.schema(f"{name}-item", schema["items"])
+            return self.add(name, f'"[" space ( {item} ( "," space {item} )* )? "]" space')
+        if typ == "object" and schema.get("properties"):
+            return self.add(name, self.properties(name, schema))
+        if typ == "object":
+            return "object"
+        return "value"
+
+    def properties(self, name: str, schema: Dict[str, Any]) -> str:
+        required = set(schema.get("required") or [])
+        kvs = []
+        for prop, prop_schema in schema["properties"].items():
+            rule = self.schema(f"{name}-{prop}", prop_schema or {})
+            kvs.append((f"{_literal(prop)} space \":\" space {rule}", prop in required))
+        req = [kv for kv, is_req in kvs if is_req]
+        opt = [kv for kv, is_req in kvs if not is_req]
+        if req:
+            body = ' "," space '.join(req) + "".join(f' ( "," space {kv} )?' for kv in opt)
+        else:
+            body = _optional_chain(opt)
+        return f'"{{" space {body} "}}" space'
+
+
+def _optional_chain(kvs: List[str]) -> str:
+    """Any ordered subset of kvs (possibly empty), comma separated."""
+    if not kvs:
+        return ""
+    alts = []
+    for i, kv in enumerate(kvs):
+        alts.append(kv + "".join(f' ( "," space {rest} )?' for rest in kvs[i + 1 :]))
+    return "( " + " | ".join(alts) + " )?"
+
+
+@functools.lru_cache(maxsize=32)
+def _grammar(tools_json: str, allow_text: bool, parallel: bool) -> str:
+    b = _Builder()
+    calls = []
+    for tool in json.loads(tools_json):
+        func = tool.get("function", tool)
+        name = func["name"]
+        params = func.get("parameters") or {}
+        if params.get("properties"):
+            args = b.add(f"{name}-args", b.properties(f"{name}-args", params))
+        else:
+            args = b.add(f"{name}-args", '"{" space "}" space')
+        calls.append(b.add(
+            f"{name}-call",
+            f'"{{" space "\\"name\\"" space ":" space {_literal(name)} space "," space '
+            f'"\\"arguments\\"" space ":" space {args} "}}" space',
+        ))
+    call = " | ".join(calls)
+    if parallel:
+        call = f'( {call} ) ( "\\n" ( {call} ) )*'
+    root = f"{call} | text" if allow_text else call
+    rules = [f"root ::= {root}"] + [f"{k} ::= {v}" for k, v in b.rules.items()]
+    return "\n".join(rules) + _BASE_RULES
+
+
+def tools_grammar(tools: List[Dict[str, Any]], allow_text: bool = False, parallel: bool = False) -> str:
+    """
+    GBNF grammar accepting one call of any tool in tools (OpenAI format, as built
+    by `mcp_tool_to_openai_format` or listed in `FUNCTION_TOOLS`). With allow_text,
+    plain text that does not start with "{" is accepted as well; with parallel,
+    one or more calls separated by newlines.
+    """
+    return _grammar(json.dumps(tools), allow_text, parallel)
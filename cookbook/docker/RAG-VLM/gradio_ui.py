@@ -20,6 +20,7 @@ import logging
 import sys
 import threading
 import time
+from pathlib import Path
 from typing import Optional, Generator, Tuple, Dict
 
 import gradio as gr
@@ -28,6 +29,12 @@ import numpy as np
 from PIL import Image
 import imageio
 
+# serve_client lives in cookbook/PC; the Docker image copies it next to this file (/app)
+_parents = Path(__file__).resolve().parents
+if len(_parents) > 2 and (_parents[2] / "PC" / "serve_client").is_dir():
+    sys.path.insert(0, str(_parents[2] / "PC"))
+from serve_client.sse import ChatStreamParser, iter_chat_content
+
 # Configuration
 DEFAULT_MODEL = "NexaAI/AutoNeural"
 DEFAULT_ENDPOINT = "http://127.0.0.1:18181"
@@ -146,39 +153,22 @@ def call_nexa_chat_stream(
         with session.post(url, json=payload, stream=True, timeout=300) as resp:
             resp.raise_for_status()
 
-            for line in resp.iter_lines(decode_unicode=True):
-                if not line:
-                    continue
-
-                if line.startswith("data:"):
-                    chunk = line[len("data:") :].strip()
-                    if chunk == "[DONE]":
-                        break
-
-                    try:
-                        obj = json.loads(chunk)
-                        if usage := obj.get("usage"):
-                            completion_tokens = usage.get("completion_tokens")
-
-                        choices = obj.get("choices", [])
-                        if choices:
-                            delta = choices[0].get("delta") or {}
-                            piece = delta.get("content", "")
-                            if piece:
-                                # Calculate TTFT on first token
-                                if first_token_time is None:
-                                    first_token_time = time.time()
-                                    ttft = first_token_time - request_start_time
-                                    last_token_time = first_token_time
-                                    yield piece, ttft, None
-                                else:
-                                    last_token_time = time.time()
-                                    yield piece, None, None
-                    except json.JSONDecodeError:
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Error parsing stream chunk: {e}")
-                        continue
+            parser = ChatStreamParser()
+            for piece in iter_chat_content(resp.iter_content(chunk_size=None), parser):
+                # Calculate TTFT on first token
+                if first_token_time is None:
+                    first_token_time = time.time()
+                    ttft = first_token_time - request_start_time
+                    last_token_time = first_token_time
+                    yield piece, ttft, None
+                else:
+                    last_token_time = time.time()
+                    yield piece, None, None
+
+            if parser.malformed:
+                logger.warning(f"Skipped {parser.malformed} malformed stream chunk(s)")
+            if parser.usage:
+                completion_tokens = parser.usage.get("completion_tokens")
 
             if first_token_time is not None and last_token_time is not None:
                 decode_time = max(last_token_time - first_token_time, 0.0)
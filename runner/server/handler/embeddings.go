@@ -15,7 +15,10 @@
 package handler
 
 import (
+	"encoding/base64"
+	"encoding/binary"
 	"log/slog"
+	"math"
 	"net/http"
 
 	"github.com/gin-gonic/gin"
@@ -34,6 +37,29 @@ type EmbeddingRequest struct {
 	TaskType string `json:"task_type"`
 }
 
+// Base64Embedding carries one vector as base64 of its little-endian float32
+// bytes, returned when the request sets encoding_format to "base64".
+type Base64Embedding struct {
+	Object    string `json:"object"`
+	Embedding string `json:"embedding"`
+	Index     int64  `json:"index"`
+}
+
+type Base64EmbeddingResponse struct {
+	Object string                              `json:"object"`
+	Data   []Base64Embedding                   `json:"data"`
+	Model  string                              `json:"model"`
+	Usage  openai.CreateEmbeddingResponseUsage `json:"usage"`
+}
+
+func encodeFloat32LE(vec []float32) string {
+	buf := make([]byte, 4*len(vec))
+	for i, v := range vec {
+		binary.LittleEndian.PutUint32(buf[4*i:], math.Float32bits(v))
+	}
+	return base64.StdEncoding.EncodeToString(buf)
+}
+
 func defaultEmbeddingRequest() EmbeddingRequest {
 	return EmbeddingRequest{
 		TaskType: "default",
@@ -90,12 +116,37 @@ func Embeddings(c *gin.Context) {
 		return
 	}
 
-	embeddings := make([]openai.Embedding, len(texts))
 	if len(res.Embeddings) != len(texts) {
 		c.JSON(http.StatusInternalServerError, map[string]any{"error": "embedding count mismatch"})
 		return
 	}
 
+	usage := openai.CreateEmbeddingResponseUsage{
+		PromptTokens: res.ProfileData.PromptTokens,
+		TotalTokens:  res.ProfileData.TotalTokens(),
+	}
+
+	// base64 skips the float64 widening and decimal formatting entirely
+	if param.EncodingFormat == openai.EmbeddingNewParamsEncodingFormatBase64 {
+		data := make([]Base64Embedding, len(texts))
+		for i := range len(texts) {
+			data[i] = Base64Embedding{
+				Object:    "embedding",
+				Embedding: encodeFloat32LE(res.Embeddings[i]),
+				Index:     int64(i),
+			}
+		}
+		c.JSON(http.StatusOK, Base64EmbeddingResponse{
+			Object: "list",
+			Data:   data,
+			Model:  string(param.Model),
+			Usage:  usage,
+		})
+		return
+	}
+
+	embeddings := make([]openai.Embedding, len(texts))
+
 	// Convert embeddings to the format expected by OpenAI API
 	for i := range len(texts) {
 		embeddingSlice := res.Embeddings[i]
@@ -115,10 +166,7 @@ func Embeddings(c *gin.Context) {
 	response := openai.CreateEmbeddingResponse{
 		Data:  embeddings,
 		Model: param.Model,
-		Usage: openai.CreateEmbeddingResponseUsage{
-			PromptTokens: res.ProfileData.PromptTokens,
-			TotalTokens:  res.ProfileData.TotalTokens(),
-		},
+		Usage: usage,
 	}
 
 	c.JSON(http.StatusOK, response)
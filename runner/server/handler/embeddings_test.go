@@ -0,0 +1,46 @@
+// Copyright 2024-2026 Nexa AI, Inc.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package handler
+
+import (
+	"encoding/base64"
+	"encoding/binary"
+	"math"
+	"testing"
+)
+
+func TestEncodeFloat32LE(t *testing.T) {
+	vec := []float32{0, 1, -2.5, 3.1415927, float32(math.Inf(1))}
+
+	raw, err := base64.StdEncoding.DecodeString(encodeFloat32LE(vec))
+	if err != nil {
+		t.Fatal(err)
+	}
+	if len(raw) != 4*len(vec) {
+		t.Fatalf("expected %d bytes, got %d", 4*len(vec), len(raw))
+	}
+	for i, want := range vec {
+		got := math.Float32frombits(binary.LittleEndian.Uint32(raw[4*i:]))
+		if got != want {
+			t.Errorf("index %d: got %v, want %v", i, got, want)
+		}
+	}
+}
+
+func TestEncodeFloat32LE_Empty(t *testing.T) {
+	if got := encodeFloat32LE(nil); got != "" {
+		t.Errorf("expected empty string, got %q", got)
+	}
+}
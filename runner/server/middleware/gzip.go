@@ -0,0 +1,100 @@
+// Copyright 2024-2026 Nexa AI, Inc.
+//
+// Licensed under the Apache License, Version 2.0 (the "License");
+// you may not use this file except in compliance with the License.
+// You may obtain a copy of the License at
+//
+//     http://www.apache.org/licenses/LICENSE-2.0
+//
+// Unless required by applicable law or agreed to in writing, software
+// distributed under the License is distributed on an "AS IS" BASIS,
+// WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+// See the License for the specific language governing permissions and
+// limitations under the License.
+
+package middleware
+
+import (
+	"compress/gzip"
+	"net/http"
+	"strings"
+
+	"github.com/gin-gonic/gin"
+)
+
+// Gzip decodes gzip-encoded request bodies and compresses JSON responses for
+// clients that send "Accept-Encoding: gzip". Streaming (SSE) and binary
+// responses are passed through untouched so tokens are never held back.
+func Gzip(c *gin.Context) {
+	if strings.Contains(c.GetHeader("Content-Encoding"), "gzip") {
+		zr, err := gzip.NewReader(c.Request.Body)
+		if err != nil {
+			c.AbortWithStatusJSON(http.StatusBadRequest, map[string]any{"error": "invalid gzip body: " + err.Error()})
+			return
+		}
+		defer zr.Close()
+		c.Request.Body = zr
+		c.Request.Header.Del("Content-Encoding")
+		c.Request.Header.Del("Content-Length")
+		c.Request.ContentLength = -1
+	}
+
+	if !strings.Contains(c.GetHeader("Accept-Encoding"), "gzip") {
+		c.Next()
+		return
+	}
+
+	w := &gzipWriter{ResponseWriter: c.Writer}
+	c.Writer = w
+	defer w.close()
+
+	c.Next()
+}
+
+type gzipWriter struct {
+	gin.ResponseWriter
+	zw      *gzip.Writer
+	decided bool
+}
+
+// decide runs on the first body write, once the handler has set Content-Type.
+func (w *gzipWriter) decide() {
+	if w.decided {
+		return
+	}
+	w.decided = true
+
+	h := w.Header()
+	if !strings.HasPrefix(h.Get("Content-Type"), "application/json") || h.Get("Content-Encoding") != "" {
+		return
+	}
+	h.Set("Content-Encoding", "gzip")
+	h.Add("Vary", "Accept-Encoding")
+	h.Del("Content-Length")
+	w.zw = gzip.NewWriter(w.ResponseWriter)
+}
+
+func (w *gzipWriter) Write(data []byte) (int, error) {
+	w.decide()
+	if w.zw == nil {
+		return w.ResponseWriter.Write(data)
+	}
+	return w.zw.Write(data)
+}
+
+func (w *gzipWriter) WriteString(s string) (int, error) {
+	return w.Write([]byte(s))
+}
+
+func (w *gzipWriter) Flush() {
+	if w.zw != nil {
+		w.zw.Flush()
+	}
+	w.ResponseWriter.Flush()
+}
+
+func (w *gzipWriter) close() {
+	if w.zw != nil {
+		w.zw.Close()
+	}
+}
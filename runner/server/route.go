@@ -40,7 +40,7 @@ func RegisterSwagger(r *gin.Engine) {
 
 func RegisterAPIv1(r *gin.Engine) {
 	g := r.Group("/v1")
-	g.Use(middleware.CORS, middleware.GIL)
+	g.Use(middleware.CORS, middleware.Gzip, middleware.GIL)
 
 	// ==== legacy ====
 	g.POST("/completions", func(c *gin.Context) {
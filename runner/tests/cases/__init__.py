@@ -14,14 +14,18 @@
 
 from .asr import ASR
 from .audio_multi_round import AudioMultiRound
-from .base import BaseCase
+from .base import BaseCase, ServeCase
+from .concurrency import ConcurrentChat, concurrency_sweep, model_thrash
 from .cv import OCR, ImageRecognition
 from .image_multi_round import ImageMultiRound
 from .multi_round import MultiRound
+from .prefill_sweep import PrefillSweep, context_sweep, prefill_sweep
 from .reranker import QueryDocument
 from .single_round import SingleRound
+from .throughput import EmbedSweep, RerankSweep
 
 __all__ = [
     'BaseCase', 'SingleRound', 'MultiRound', 'ImageMultiRound', 'AudioMultiRound', 'OCR', 'ImageRecognition', 'ASR',
-    'QueryDocument'
+    'QueryDocument', 'PrefillSweep', 'prefill_sweep', 'context_sweep', 'ServeCase', 'ConcurrentChat',
+    'concurrency_sweep', 'model_thrash', 'EmbedSweep', 'RerankSweep'
 ]
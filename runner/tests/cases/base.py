@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any
+from typing import Any, override
 
 
 class BaseCase:
+    # Timing-sensitive: the runner starts it only when no other case is running
+    exclusive = False
 
     def name(self) -> str:
         return self.__class__.__name__
@@ -28,3 +30,28 @@ class BaseCase:
         Optional check function to verify the result.
         '''
         return True
+
+
+class ServeCase(BaseCase):
+    '''
+    A case that drives `nexa serve` over HTTP instead of through `nexa infer`/`nexa run`.
+    It has no infer step; `param` only identifies the case configuration.
+    '''
+
+    exclusive = True
+
+    def serve(self, host: str, model: str) -> dict[str, Any]:
+        '''
+        Run the case against the server at host and return its results.
+        '''
+        raise NotImplementedError
+
+    @override
+    def check(self, res: Any) -> bool:
+        return res.get('errors', 0) == 0
+
+    def summary(self, res: Any) -> str:  # pyright: ignore[reportUnusedParameter]
+        '''
+        Optional one-line summary of the result for the benchmark log.
+        '''
+        return ''
@@ -0,0 +1,150 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import threading
+import time
+from typing import Any, override
+
+from loadgen import Connection, Record, estimate_queue_delay, percentiles
+
+from .base import ServeCase
+
+# same load params as `nexa run`, so requests reuse a model loaded by the CLI or the warm-up
+_LOAD_PARAM = {'ngl': 999, 'nctx': 4096}
+
+
+class ConcurrentChat(ServeCase):
+    '''
+    `sessions` clients each send `requests` chat completions back to back.
+
+    With `other_model` set, odd sessions use that model instead, so the server
+    keeps switching between the two (it holds one model at a time). Swaps are
+    counted from the service order, which the server's global lock makes serial.
+    Use `concurrency_sweep` and `model_thrash` to create the cases.
+    '''
+
+    sessions = 1
+    requests = 4
+    max_tokens = 32
+    other_model: str | None = None
+
+    @override
+    def name(self) -> str:
+        mix = 'Thrash' if self.other_model else 'Same'
+        return f'ConcurrentChat-{mix}-{self.sessions}'
+
+    @override
+    def param(self) -> list[str]:
+        return [f'sessions={self.sessions}', f'requests={self.requests}', f'other_model={self.other_model}']
+
+    def _request(self, conn: Connection, model: str, session: int, i: int) -> Record:
+        rec = Record(model, time.perf_counter())  # kind holds the model
+        payload = {
+            'model': model,
+            'messages': [{'role': 'user', 'content': f'Session {session}, question {i}: name a color.'}],
+            'max_tokens': self.max_tokens,
+            **_LOAD_PARAM,
+        }
+        rec.sent = time.perf_counter()
+        try:
+            resp = conn.request('/v1/chat/completions', json.dumps(payload).encode('utf-8'), 'application/json')
+            data = resp.read()
+            rec.end = time.perf_counter()
+            if resp.status != 200:
+                raise RuntimeError(f'HTTP {resp.status}: {data[:200]!r}')
+            rec.tokens = int((json.loads(data).get('usage') or {}).get('completion_tokens') or 0)
+        except Exception as e:
+            conn.close()
+            rec.error = f'{type(e).__name__}: {e}'
+            rec.end = rec.end or time.perf_counter()
+        return rec
+
+    @override
+    def serve(self, host: str, model: str) -> dict[str, Any]:
+        models = [model if s % 2 == 0 or self.other_model is None else self.other_model for s in range(self.sessions)]
+        endpoint = f'http://{host}'
+
+        # load the first model outside the measurement
+        conn = Connection(endpoint, 600)
+        warm = self._request(conn, model, -1, 0)
+        conn.close()
+
+        records: list[Record] = []
+        lock = threading.Lock()
+
+        def session(s: int) -> None:
+            conn = Connection(endpoint, 600)
+            for i in range(self.requests):
+                rec = self._request(conn, models[s], s, i)
+                with lock:
+                    records.append(rec)
+            conn.close()
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=session, args=(s,), daemon=True) for s in range(self.sessions)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+
+        estimate_queue_delay(records)
+        ok = [r for r in records if not r.error]
+        served = sorted(ok, key=lambda r: r.end)
+        swapped = [b for a, b in zip([warm, *served], served) if a.kind != b.kind]
+        swapped_ids = {id(r) for r in swapped}
+        kept = [r for r in served if id(r) not in swapped_ids]
+        return {
+            'sessions': self.sessions,
+            'models': sorted(set(models)),
+            'requests': len(records),
+            'errors': len(records) - len(ok),
+            'wall_s': round(wall, 3),
+            'throughput_rps': round(len(ok) / wall, 3) if wall else 0.0,
+            'output_tokens_per_s': round(sum(r.tokens for r in ok) / wall, 3) if wall else 0.0,
+            'latency_ms': percentiles([r.end - r.sent for r in ok]),
+            'queue_delay_ms': percentiles([r.queue_delay for r in ok]),
+            'swaps': len(swapped),
+            # service time of a request that had to load its model vs one that did not
+            'swap_service_ms': percentiles([r.end - r.sent - r.queue_delay for r in swapped]),
+            'kept_service_ms': percentiles([r.end - r.sent - r.queue_delay for r in kept]),
+            'error_samples': sorted({r.error for r in records if r.error})[:5],
+        }
+
+    @override
+    def summary(self, res: Any) -> str:
+        s = f'{res["throughput_rps"]} req/s'
+        if p := res['latency_ms']:
+            s += f', p50/p99 {p["p50"]:.0f}/{p["p99"]:.0f}ms'
+        return s + f', swaps {res["swaps"]}'
+
+
+def concurrency_sweep(sessions: tuple[int, ...] = (1, 2, 4, 8), requests: int = 4) -> list[type[ConcurrentChat]]:
+    '''Cases with 1..N concurrent sessions on the same model.'''
+    return [
+        type(f'ConcurrentChat_Same_{n}', (ConcurrentChat,), {'sessions': n, 'requests': requests}) for n in sessions
+    ]
+
+
+def model_thrash(other_model: str, sessions: tuple[int, ...] = (2, 4), requests: int = 4) -> list[type[ConcurrentChat]]:
+    '''Cases where half of the sessions use other_model, forcing the server to switch models.'''
+    return [
+        type(
+            f'ConcurrentChat_Thrash_{n}',
+            (ConcurrentChat,),
+            {'sessions': n, 'requests': requests, 'other_model': other_model},
+        )
+        for n in sessions
+    ]
@@ -0,0 +1,88 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import pathlib
+import tempfile
+from typing import Any, override
+
+from .base import BaseCase
+
+_FILLER = (
+    'The committee reviewed the quarterly report on regional water usage, noting that reservoir levels '
+    'in the northern districts had recovered after the spring rains while southern districts continued '
+    'to draw on groundwater. Engineers proposed replacing aging pipes along the river corridor, and the '
+    'finance office estimated the cost over three budget cycles. Several members asked for a comparison '
+    'with neighbouring cities and for data on household consumption by season. '
+)
+
+
+def prompt_file(tokens: int) -> pathlib.Path:
+    '''
+    A text file of roughly `tokens` prompt tokens followed by a short question.
+    English text runs at about 0.75 words per token; the exact count is taken
+    from the profile data of each run.
+    '''
+    path = pathlib.Path(tempfile.gettempdir()) / 'nexa-bench' / f'prompt-{tokens}.txt'
+    if not path.exists():
+        words = _FILLER.split()
+        n = max(1, int(tokens * 0.75))
+        body = ' '.join(words[i % len(words)] for i in range(n))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f'{body}\n\nSummarize the text above in one sentence.', encoding='utf-8')
+    return path
+
+
+class PrefillSweep(BaseCase):
+    '''
+    One long prompt with a few output tokens, so the round is dominated by prefill.
+    Use `prefill_sweep` and `context_sweep` to create the points of a sweep.
+    '''
+
+    exclusive = True
+    tokens = 128
+    nctx = 4096
+
+    @override
+    def name(self) -> str:
+        return f'PrefillSweep-{self.tokens}-{self.nctx}'
+
+    @override
+    def param(self) -> list[str]:
+        return ['-i', str(prompt_file(self.tokens)), '--nctx', str(self.nctx), '--max-tokens', '16']
+
+    @override
+    def check(self, res: Any) -> bool:
+        return not res.get('Error') and res.get('Profile', {}).get('PromptTokens', 0) > 0
+
+
+def _point(tokens: int, nctx: int) -> type[PrefillSweep]:
+    return type(f'PrefillSweep_{tokens}_{nctx}', (PrefillSweep,), {'tokens': tokens, 'nctx': nctx})
+
+
+def prefill_sweep(
+    tokens: tuple[int, ...] = (128, 512, 1024, 2048, 4096, 8192), nctx: int | None = None
+) -> list[type[PrefillSweep]]:
+    '''
+    Cases sweeping the prompt length. Without nctx each point gets the smallest
+    power of two context that fits the prompt and the output.
+    '''
+    return [_point(t, nctx or max(4096, 1 << (t + 512).bit_length())) for t in tokens]
+
+
+def context_sweep(tokens: int = 1024, nctx: tuple[int, ...] = (2048, 8192, 16384)) -> list[type[PrefillSweep]]:
+    '''
+    Cases sweeping the context size at a fixed prompt length. The default leaves
+    out 4096, which prefill_sweep() already runs for a 1024-token prompt.
+    '''
+    return [_point(tokens, n) for n in nctx]
@@ -0,0 +1,150 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import time
+from typing import Any, override
+
+from loadgen import DOCS, Connection, percentiles
+
+from .base import ServeCase
+
+_WORDS = (
+    'retrieval augmented generation splits each document into passages embeds them and stores the vectors '
+    'so that a query can be matched against the closest passages before the model writes an answer'
+).split()
+
+
+def _text(words: int, i: int) -> str:
+    # vary the start per item so inputs in a batch are not identical
+    return ' '.join(_WORDS[(i + j) % len(_WORDS)] for j in range(words))
+
+
+class _Sweep(ServeCase):
+    '''
+    Runs `repeats` requests at each sweep point and reports items/sec and the
+    latency per request, plus the point with the best throughput.
+    '''
+
+    repeats = 5
+
+    def _points(self) -> list[dict[str, int]]:
+        raise NotImplementedError
+
+    def _request(self, conn: Connection, model: str, point: dict[str, int]) -> int:
+        '''Send one request for point, return the number of items processed.'''
+        raise NotImplementedError
+
+    @staticmethod
+    def _post(conn: Connection, path: str, payload: dict[str, Any]) -> Any:
+        resp = conn.request(path, json.dumps(payload).encode('utf-8'), 'application/json')
+        data = resp.read()
+        if resp.status != 200:
+            raise RuntimeError(f'HTTP {resp.status}: {data[:200]!r}')
+        return json.loads(data)
+
+    @override
+    def serve(self, host: str, model: str) -> dict[str, Any]:
+        conn = Connection(f'http://{host}', 600)
+        points: list[dict[str, Any]] = []
+        errors: list[str] = []
+        # load the model outside the measurement
+        self._request(conn, model, self._points()[0])
+
+        for point in self._points():
+            latencies: list[float] = []
+            items = 0
+            for _ in range(self.repeats):
+                start = time.perf_counter()
+                try:
+                    items += self._request(conn, model, point)
+                except Exception as e:
+                    conn.close()
+                    errors.append(f'{point}: {type(e).__name__}: {e}')
+                    continue
+                latencies.append(time.perf_counter() - start)
+            points.append({
+                **point,
+                'items_per_s': round(items / sum(latencies), 3) if latencies else 0.0,
+                'latency_ms': percentiles(latencies),
+            })
+        conn.close()
+
+        best = max(points, key=lambda p: p['items_per_s'])
+        return {
+            'points': points,
+            'best': {k: v for k, v in best.items() if k != 'latency_ms'},
+            'errors': len(errors),
+            'error_samples': errors[:5],
+        }
+
+    @override
+    def summary(self, res: Any) -> str:
+        best = res['best']
+        point = ', '.join(f'{k} {v}' for k, v in best.items() if k != 'items_per_s')
+        return f'best {best["items_per_s"]} items/s at {point}'
+
+
+class EmbedSweep(_Sweep):
+    '''/v1/embeddings over batch sizes and input lengths (in words).'''
+
+    batch_sizes = (1, 4, 16, 64)
+    input_words = (16, 128, 384)
+
+    @override
+    def name(self) -> str:
+        return 'EmbedSweep'
+
+    @override
+    def param(self) -> list[str]:
+        return [f'batch_sizes={self.batch_sizes}', f'input_words={self.input_words}', f'repeats={self.repeats}']
+
+    @override
+    def _points(self) -> list[dict[str, int]]:
+        return [{'batch': b, 'words': w} for w in self.input_words for b in self.batch_sizes]
+
+    @override
+    def _request(self, conn: Connection, model: str, point: dict[str, int]) -> int:
+        inputs = [_text(point['words'], i) for i in range(point['batch'])]
+        data = self._post(conn, '/v1/embeddings', {'model': model, 'input': inputs})
+        if len(data.get('data') or []) != len(inputs):
+            raise RuntimeError('embedding count mismatch')
+        return len(inputs)
+
+
+class RerankSweep(_Sweep):
+    '''/v1/reranking over document counts.'''
+
+    doc_counts = (2, 8, 32, 64)
+
+    @override
+    def name(self) -> str:
+        return 'RerankSweep'
+
+    @override
+    def param(self) -> list[str]:
+        return [f'doc_counts={self.doc_counts}', f'repeats={self.repeats}']
+
+    @override
+    def _points(self) -> list[dict[str, int]]:
+        return [{'docs': n} for n in self.doc_counts]
+
+    @override
+    def _request(self, conn: Connection, model: str, point: dict[str, int]) -> int:
+        docs = [DOCS[i % len(DOCS)] for i in range(point['docs'])]
+        payload = {'model': model, 'query': 'What is the capital of France?', 'documents': docs}
+        data = self._post(conn, '/v1/reranking', payload)
+        if len((data or {}).get('result') or []) != len(docs):
+            raise RuntimeError('rerank count mismatch')
+        return len(docs)
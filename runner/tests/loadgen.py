@@ -0,0 +1,413 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#!/usr/bin/env python3
+'''
+Load generator for `nexa serve`.
+
+Replays a weighted mix of chat (JSON and SSE), embeddings, rerank and
+transcription requests, either closed-loop at a fixed concurrency or
+open-loop at a Poisson arrival rate. It reports throughput, TTFT,
+inter-token latency, latency percentiles and the queueing delay added by
+the server's GIL middleware, and saves everything as JSON so builds can be
+compared.
+
+    python loadgen.py --concurrency 4 --duration 60 --mix chat_stream=3,embed=2,rerank=1
+    python loadgen.py --rate 2.5 --requests 200 --mix chat_stream=1 --label v0.2.50 --out load.json
+'''
+
+import argparse
+import http.client
+import json
+import platform
+import queue
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+KINDS = ('chat', 'chat_stream', 'embed', 'rerank', 'asr')
+
+DOCS = [
+    'Paris is the capital of France. It is known for its art, culture, and history.',
+    'London is the capital of the United Kingdom. It is famous for its landmarks and museums.',
+    'Berlin is the capital of Germany. It has a rich history and vibrant culture.',
+    'Madrid is the capital of Spain, located in the center of the Iberian Peninsula.',
+]
+
+
+@dataclass
+class Record:
+    kind: str
+    scheduled: float  # when the request was due (open loop) or picked (closed loop)
+    sent: float = 0.0
+    first_token: float = 0.0  # first content delta, streaming chat only
+    end: float = 0.0
+    tokens: int = 0
+    itl: list[float] = field(default_factory=list)
+    error: str = ''
+    queue_delay: float = 0.0  # filled in by estimate_queue_delay
+
+
+class Connection:
+    '''One keep-alive HTTP connection per worker thread.'''
+
+    def __init__(self, base: str, timeout: float) -> None:
+        u = urllib.parse.urlsplit(base)
+        self.host = u.hostname or '127.0.0.1'
+        self.port = u.port or 80
+        self.timeout = timeout
+        self.conn: http.client.HTTPConnection | None = None
+
+    def request(self, path: str, body: bytes, content_type: str) -> http.client.HTTPResponse:
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request('POST', path, body, {'Content-Type': content_type})
+                return self.conn.getresponse()
+            except (ConnectionError, http.client.HTTPException):
+                # the server may close an idle keep-alive connection; reconnect once
+                self.close()
+                if attempt:
+                    raise
+        raise AssertionError('unreachable')
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Workload:
+    '''Builds request bodies and runs one request of a given kind.'''
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.args = args
+        self.audio = Path(args.audio).read_bytes() if 'asr' in args.mix else b''
+
+    def run(self, conn: Connection, rec: Record) -> None:
+        getattr(self, f'_{rec.kind}')(conn, rec)
+
+    def _post_json(self, conn: Connection, rec: Record, path: str, payload: Any) -> Any:
+        body = json.dumps(payload).encode('utf-8')
+        rec.sent = time.perf_counter()
+        resp = conn.request(path, body, 'application/json')
+        data = resp.read()
+        rec.end = time.perf_counter()
+        if resp.status != 200:
+            raise RuntimeError(f'HTTP {resp.status}: {data[:200]!r}')
+        return json.loads(data or b'null')
+
+    def _chat_payload(self, stream: bool) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            'model': self.args.chat_model,
+            'messages': [{'role': 'user', 'content': self.args.prompt}],
+            'max_tokens': self.args.max_tokens,
+            'stream': stream,
+        }
+        if stream:
+            payload['stream_options'] = {'include_usage': True}
+        return payload
+
+    def _chat(self, conn: Connection, rec: Record) -> None:
+        data = self._post_json(conn, rec, '/v1/chat/completions', self._chat_payload(False))
+        rec.tokens = int((data.get('usage') or {}).get('completion_tokens') or 0)
+
+    def _chat_stream(self, conn: Connection, rec: Record) -> None:
+        body = json.dumps(self._chat_payload(True)).encode('utf-8')
+        rec.sent = time.perf_counter()
+        resp = conn.request('/v1/chat/completions', body, 'application/json')
+        if resp.status != 200:
+            raise RuntimeError(f'HTTP {resp.status}: {resp.read()[:200]!r}')
+        buf = b''
+        last = 0.0
+        deltas = 0
+        usage_tokens = 0
+        done = False
+        while not done:
+            chunk = resp.read1(65536)
+            if not chunk:
+                break
+            now = time.perf_counter()
+            # Fold CRLF on the buffer so a CRLF split across reads is still folded
+            buf = (buf + chunk).replace(b'\r\n', b'\n')
+            *events, buf = buf.split(b'\n\n')
+            arrived = 0
+            for event in events:
+                for line in event.split(b'\n'):
+                    if not line.startswith(b'data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == b'[DONE]':
+                        done = True
+                        break
+                    obj = json.loads(data)
+                    if 'error' in obj:
+                        raise RuntimeError(f'stream error: {obj}')
+                    if obj.get('usage'):
+                        usage_tokens = int(obj['usage'].get('completion_tokens') or 0)
+                    choices = obj.get('choices') or []
+                    if choices and (choices[0].get('delta') or {}).get('content'):
+                        arrived += 1
+            if not arrived:
+                continue
+            # Deltas read together carry one timestamp: spread the gap since the previous read
+            # over them instead of recording zero gaps. Deltas batched with the first token
+            # have no earlier read to measure from and only count towards the token total.
+            deltas += arrived
+            if rec.first_token == 0.0:
+                rec.first_token = now
+            else:
+                rec.itl.extend([(now - last) / arrived] * arrived)
+            last = now
+        resp.read()  # drain so the connection can be reused
+        rec.end = time.perf_counter()
+        rec.tokens = usage_tokens or deltas
+
+    def _embed(self, conn: Connection, rec: Record) -> None:
+        inputs = [f'{self.args.prompt} #{i}' for i in range(self.args.embed_batch)]
+        data = self._post_json(conn, rec, '/v1/embeddings', {'model': self.args.embed_model, 'input': inputs})
+        if len(data.get('data') or []) != len(inputs):
+            raise RuntimeError('embedding count mismatch')
+        rec.tokens = len(inputs)
+
+    def _rerank(self, conn: Connection, rec: Record) -> None:
+        docs = [DOCS[i % len(DOCS)] for i in range(self.args.rerank_docs)]
+        payload = {'model': self.args.rerank_model, 'query': 'What is the capital of France?', 'documents': docs}
+        data = self._post_json(conn, rec, '/v1/reranking', payload)
+        if len((data or {}).get('result') or []) != len(docs):
+            raise RuntimeError('rerank count mismatch')
+        rec.tokens = len(docs)
+
+    def _asr(self, conn: Connection, rec: Record) -> None:
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="model"\r\n\r\n{self.args.asr_model}\r\n'
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{Path(self.args.audio).name}"\r\n'
+            'Content-Type: application/octet-stream\r\n\r\n'
+        ).encode('utf-8') + self.audio + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+        rec.sent = time.perf_counter()
+        resp = conn.request('/v1/audio/transcriptions', body, f'multipart/form-data; boundary={boundary}')
+        data = resp.read()
+        rec.end = time.perf_counter()
+        if resp.status != 200:
+            raise RuntimeError(f'HTTP {resp.status}: {data[:200]!r}')
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    mix: dict[str, float] = {}
+    for part in spec.split(','):
+        kind, _, weight = part.partition('=')
+        kind = kind.strip()
+        if kind not in KINDS:
+            raise ValueError(f'unknown request kind {kind!r}, expected one of {KINDS}')
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def percentiles(values: list[float], scale: float = 1000.0) -> dict[str, float]:
+    '''p50/p95/p99/mean/max of values, scaled (seconds -> ms by default).'''
+    if not values:
+        return {}
+    s = sorted(values)
+
+    def pct(p: float) -> float:
+        k = (len(s) - 1) * p
+        lo = int(k)
+        hi = min(lo + 1, len(s) - 1)
+        return s[lo] + (s[hi] - s[lo]) * (k - lo)
+
+    return {
+        'p50': round(pct(0.50) * scale, 3),
+        'p95': round(pct(0.95) * scale, 3),
+        'p99': round(pct(0.99) * scale, 3),
+        'mean': round(sum(s) / len(s) * scale, 3),
+        'max': round(s[-1] * scale, 3),
+    }
+
+
+def estimate_queue_delay(records: list[Record]) -> None:
+    '''
+    Time each request waited for the server's global lock.
+
+    middleware.GIL holds one mutex for the whole request, so service
+    intervals never overlap: a request starts when it is sent or when the
+    previous one (by completion) ends, whichever is later. Only meaningful
+    when this generator is the server's only client.
+    '''
+    prev_end = 0.0
+    for rec in sorted((r for r in records if r.end), key=lambda r: r.end):
+        rec.queue_delay = max(0.0, prev_end - rec.sent)
+        prev_end = rec.end
+
+
+def summarize(records: list[Record], wall: float) -> dict[str, Any]:
+    ok = [r for r in records if not r.error]
+    first = [r.first_token - r.sent for r in ok if r.first_token]
+    return {
+        'requests': len(records),
+        'errors': len(records) - len(ok),
+        'throughput_rps': round(len(ok) / wall, 3) if wall else 0.0,
+        'output_tokens_per_s': round(sum(r.tokens for r in ok if r.kind.startswith('chat')) / wall, 3) if wall else 0.0,
+        'latency_ms': percentiles([r.end - r.sent for r in ok]),
+        'ttft_ms': percentiles(first),
+        'itl_ms': percentiles([x for r in ok for x in r.itl]),
+        'queue_delay_ms': percentiles([r.queue_delay for r in ok]),
+        'schedule_lag_ms': percentiles([r.sent - r.scheduled for r in ok]),
+    }
+
+
+def run_load(args: argparse.Namespace, workload: Workload) -> tuple[list[Record], float]:
+    mix = args.mix
+    kinds = list(mix)
+    weights = [mix[k] for k in kinds]
+    rng = random.Random(args.seed)
+    records: list[Record] = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else float('inf')
+    budget = [args.requests or 0]
+
+    def take() -> bool:
+        with lock:
+            if args.requests:
+                if budget[0] <= 0:
+                    return False
+                budget[0] -= 1
+            return time.perf_counter() < deadline
+
+    def execute(conn: Connection, rec: Record) -> None:
+        try:
+            workload.run(conn, rec)
+        except Exception as e:
+            conn.close()
+            rec.error = f'{type(e).__name__}: {e}'
+            rec.end = rec.end or time.perf_counter()
+        with lock:
+            records.append(rec)
+
+    def closed_worker(seed: int) -> None:
+        wrng = random.Random(seed)
+        conn = Connection(args.endpoint, args.timeout)
+        while take():
+            execute(conn, Record(wrng.choices(kinds, weights)[0], time.perf_counter()))
+        conn.close()
+
+    work: queue.Queue[Record | None] = queue.Queue()
+
+    def open_worker() -> None:
+        conn = Connection(args.endpoint, args.timeout)
+        while (rec := work.get()) is not None:
+            execute(conn, rec)
+        conn.close()
+
+    if args.rate:
+        threads = [threading.Thread(target=open_worker, daemon=True) for _ in range(args.max_workers)]
+        for t in threads:
+            t.start()
+        due = start
+        while take():
+            due += rng.expovariate(args.rate)
+            if due >= deadline:
+                break
+            time.sleep(max(0.0, due - time.perf_counter()))
+            work.put(Record(rng.choices(kinds, weights)[0], due))
+        for _ in threads:
+            work.put(None)
+    else:
+        threads = [
+            threading.Thread(target=closed_worker, args=(rng.getrandbits(32),), daemon=True)
+            for _ in range(args.concurrency)
+        ]
+        for t in threads:
+            t.start()
+    for t in threads:
+        t.join()
+    return records, time.perf_counter() - start
+
+
+def main(argv: list[str] | None = None) -> dict[str, Any]:
+    ap = argparse.ArgumentParser(description='Load generator for nexa serve')
+    ap.add_argument('--endpoint', default='http://127.0.0.1:18181')
+    ap.add_argument('--mix', type=parse_mix, default=parse_mix('chat_stream=1'),
+                    help=f'weighted request mix, e.g. chat_stream=3,embed=2 (kinds: {",".join(KINDS)})')
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument('--concurrency', type=int, default=1, help='closed loop: requests in flight')
+    mode.add_argument('--rate', type=float, default=0.0, help='open loop: Poisson arrivals per second')
+    ap.add_argument('--max-workers', type=int, default=64, help='open loop: max requests in flight')
+    ap.add_argument('--duration', type=float, default=0.0, help='seconds to run (0: until --requests)')
+    ap.add_argument('--requests', type=int, default=0, help='total requests (0: until --duration)')
+    ap.add_argument('--warmup', type=int, default=1, help='unmeasured requests per kind first (loads models)')
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--timeout', type=float, default=600)
+    ap.add_argument('--chat-model', default='Qwen/Qwen3-1.7B-GGUF:Q8_0')
+    ap.add_argument('--embed-model', default='djuna/jina-embeddings-v2-small-en-Q5_K_M-GGUF:Q5_K_M')
+    ap.add_argument('--rerank-model', default='NexaAI/jina-v2-rerank-npu')
+    ap.add_argument('--asr-model', default='NexaAI/parakeet-tdt-0.6b-v3-npu')
+    ap.add_argument('--prompt', default='Tell me a short story about a robot learning to paint.')
+    ap.add_argument('--max-tokens', type=int, default=128)
+    ap.add_argument('--embed-batch', type=int, default=1)
+    ap.add_argument('--rerank-docs', type=int, default=4)
+    ap.add_argument('--audio', default=str(Path(__file__).parent / 'assets' / 'storytelling.wav'))
+    ap.add_argument('--label', default='', help='build/version label stored in the result')
+    ap.add_argument('--out', default='', help='write results as JSON to this path')
+    args = ap.parse_args(argv)
+    if not args.duration and not args.requests:
+        ap.error('set --duration and/or --requests')
+
+    workload = Workload(args)
+    conn = Connection(args.endpoint, args.timeout)
+    for kind in args.mix:
+        for _ in range(args.warmup):
+            workload.run(conn, Record(kind, time.perf_counter()))
+    conn.close()
+
+    records, wall = run_load(args, workload)
+    estimate_queue_delay(records)
+
+    result: dict[str, Any] = {
+        'label': args.label,
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'host': {'os': platform.system(), 'arch': platform.machine(), 'python': sys.version.split()[0]},
+        'config': {k: v for k, v in vars(args).items() if k not in ('out',)},
+        'wall_s': round(wall, 3),
+        'overall': summarize(records, wall),
+        'by_kind': {k: summarize([r for r in records if r.kind == k], wall) for k in args.mix},
+        'errors': sorted({r.error for r in records if r.error})[:20],
+    }
+
+    o = result['overall']
+    print(f'{len(records)} requests in {wall:.1f}s: {o["throughput_rps"]} req/s, {o["errors"]} errors')
+    for kind, s in result['by_kind'].items():
+        print(f'  {kind:<12} n={s["requests"]:<6} lat p50/p95/p99={_fmt(s["latency_ms"])} ms'
+              f'  ttft={_fmt(s["ttft_ms"])} itl={_fmt(s["itl_ms"])} queue={_fmt(s["queue_delay_ms"])}')
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2), encoding='utf-8')
+        print(f'Results saved to {args.out}')
+    return result
+
+
+def _fmt(p: dict[str, float]) -> str:
+    return '/'.join(f'{p[k]:.1f}' for k in ('p50', 'p95', 'p99')) if p else '-'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,381 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#!/usr/bin/env python3
+'''
+Mock `nexa serve` for measuring client overhead without models or the nexa binary.
+
+Implements the /v1 routes clients use with the same request and response shapes
+as runner/server: chat completions (JSON and SSE, with stream_options usage),
+embeddings (float and base64), reranking, audio speech/transcriptions and models.
+Outputs are deterministic functions of the request, and latency follows a simple
+configurable model. By default requests are serialized like the server's GIL
+middleware.
+
+    python mock_server.py --port 18181 --ttft-ms 150 --decode-tps 30 --embed-item-ms 4
+'''
+
+import argparse
+import base64
+import email.parser
+import email.policy
+import hashlib
+import io
+import json
+import random
+import re
+import struct
+import threading
+import time
+import wave
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+
+WORDS = (
+    'the model answers with a short deterministic reply so that clients can be measured without weights '
+    'and every run of the same request produces the same tokens in the same order'
+).split()
+
+
+@dataclass
+class LatencyModel:
+    request_ms: float = 2.0  # fixed per-request overhead
+    ttft_ms: float = 100.0  # time to first token, before prefill cost
+    prefill_tps: float = 0.0  # prompt tokens/s added to TTFT; 0 disables
+    decode_tps: float = 50.0  # generated tokens/s; 0 streams as fast as possible
+    max_tokens: int = 64  # completion length when the request sets none
+    embed_item_ms: float = 3.0  # per embedding input
+    rerank_doc_ms: float = 5.0  # per reranked document
+    asr_ms_per_kb: float = 1.0  # per KB of uploaded audio
+    tts_ms_per_char: float = 0.5  # per input character
+    jitter: float = 0.0  # +/- fraction applied to every delay, seeded by the request
+    serialize: bool = True  # one request at a time, like middleware.GIL
+
+
+def _seed(*parts: Any) -> int:
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+    return int.from_bytes(hashlib.sha256(raw).digest()[:8], 'little')
+
+
+def _form_fields(body: bytes, content_type: str) -> dict[str, bytes]:
+    '''Fields of a multipart/form-data body by name, file parts as their raw bytes.'''
+    msg = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body
+    )
+    if not msg.is_multipart():
+        return {}
+    fields: dict[str, bytes] = {}
+    for part in msg.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        if name:
+            fields[str(name)] = part.get_payload(decode=True) or b''
+    return fields
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def fake_reply(model: str, messages: Any, n: int) -> list[str]:
+    rng = random.Random(_seed(model, messages))
+    return [(' ' if i else '') + rng.choice(WORDS) for i in range(n)]
+
+
+def fake_embedding(model: str, text: str, dim: int) -> list[float]:
+    rng = random.Random(_seed(model, text))
+    vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = sum(v * v for v in vec) ** 0.5 or 1.0
+    return [v / norm for v in vec]
+
+
+def fake_score(query: str, doc: str) -> float:
+    q = set(re.findall(r'\w+', query.lower()))
+    d = set(re.findall(r'\w+', doc.lower()))
+    overlap = len(q & d) / (len(q) or 1)
+    return round(overlap * 10 - 5 + (_seed(query, doc) % 1000) / 1000, 6)
+
+
+def fake_wav(seconds: float, rate: int = 16000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b'\0\0' * int(seconds * rate))
+    return buf.getvalue()
+
+
+class Stats:
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests: dict[str, int] = {}
+        self.queue_wait_s = 0.0
+        self.busy_s = 0.0
+
+    def record(self, path: str, wait: float, busy: float) -> None:
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.queue_wait_s += wait
+            self.busy_s += busy
+
+    def as_dict(self) -> dict[str, Any]:
+        with self.lock:
+            return {
+                'requests': dict(self.requests),
+                'queue_wait_s': round(self.queue_wait_s, 6),
+                'busy_s': round(self.busy_s, 6),
+            }
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], latency: LatencyModel, models: list[str], dim: int,
+                 verbose: bool = False) -> None:
+        super().__init__(address, Handler)
+        self.latency = latency
+        self.models = models
+        self.dim = dim
+        self.verbose = verbose
+        self.gil = threading.Lock()
+        self.stats = Stats()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server: MockServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    # ==== helpers ====
+
+    def _sleep(self, ms: float, seed: int) -> None:
+        lat = self.server.latency
+        if lat.jitter:
+            ms *= 1 + random.Random(seed).uniform(-lat.jitter, lat.jitter)
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        '''Hold the global slot for the whole request, like middleware.GIL.'''
+        start = time.perf_counter()
+        if self.server.latency.serialize:
+            self.server.gil.acquire()
+        acquired = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.server.latency.serialize:
+                self.server.gil.release()
+            self.server.stats.record(self.path, acquired - start, time.perf_counter() - acquired)
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json') -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, obj: Any) -> None:
+        self._send(status, json.dumps(obj, separators=(',', ':')).encode('utf-8'))
+
+    def _sse(self, obj: Any) -> None:
+        # gin's SSEvent writes "data:<json>\n\n" without a space
+        data = obj if isinstance(obj, str) else json.dumps(obj, separators=(',', ':'))
+        self.wfile.write(f'data:{data}\n\n'.encode('utf-8'))
+        self.wfile.flush()
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(length) if length else b''
+
+    # ==== routes ====
+
+    def do_GET(self) -> None:
+        if self.path == '/mock/stats':
+            self._json(200, {'latency': asdict(self.server.latency), **self.server.stats.as_dict()})
+        elif self.path == '/v1/models':
+            self._json(200, {'object': 'list', 'data': [
+                {'id': m, 'object': 'model', 'created': 0, 'owned_by': m.split('/')[0]} for m in self.server.models
+            ]})
+        elif self.path == '/':
+            self._send(200, b'Nexa SDK is running', 'text/plain')
+        else:
+            self._json(404, {'error': 'not found'})
+
+    def do_POST(self) -> None:
+        body = self._body()
+        routes = {
+            '/v1/chat/completions': self._chat,
+            '/v1/embeddings': self._embeddings,
+            '/v1/reranking': self._reranking,
+            '/v1/audio/speech': self._speech,
+            '/v1/audio/transcriptions': self._transcriptions,
+        }
+        route = routes.get(self.path.rstrip('/'))
+        if route is None:
+            self._json(404, {'error': 'not found'})
+            return
+        if self.path.rstrip('/') != '/v1/audio/transcriptions':
+            try:
+                body = json.loads(body or b'{}')
+            except ValueError as e:
+                self._json(400, {'error': str(e)})
+                return
+        with self._slot():
+            route(body)
+
+    def _chat(self, req: dict[str, Any]) -> None:
+        lat = self.server.latency
+        model = req.get('model', '')
+        messages = req.get('messages') or []
+        seed = _seed(model, messages)
+        prompt_tokens = _tokens(json.dumps(messages, ensure_ascii=False))
+        n = int(req.get('max_completion_tokens') or req.get('max_tokens') or lat.max_tokens)
+        pieces = fake_reply(model, messages, n)
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': n, 'total_tokens': prompt_tokens + n}
+        base = {'id': f'chatcmpl-{seed:x}', 'created': int(time.time()), 'model': model}
+
+        ttft = lat.request_ms + lat.ttft_ms + (prompt_tokens / lat.prefill_tps * 1000 if lat.prefill_tps else 0)
+        step = 1000 / lat.decode_tps if lat.decode_tps else 0
+        self._sleep(ttft, seed)
+
+        if not req.get('stream'):
+            self._sleep(step * (n - 1), seed + 1)
+            self._json(200, {
+                **base,
+                'object': 'chat.completion',
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': ''.join(pieces)},
+                    'finish_reason': 'length',
+                }],
+                'usage': usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        chunk = {**base, 'object': 'chat.completion.chunk'}
+        for i, piece in enumerate(pieces):
+            if i:
+                self._sleep(step, seed + i)
+            self._sse({**chunk, 'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': piece}}]})
+        self._sse({**chunk, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'length'}]})
+        if (req.get('stream_options') or {}).get('include_usage'):
+            self._sse({**chunk, 'choices': [], 'usage': usage})
+        self._sse('[DONE]')
+
+    def _embeddings(self, req: dict[str, Any]) -> None:
+        model = req.get('model', '')
+        inputs = req.get('input')
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        if not isinstance(inputs, list):
+            self._json(400, {'error': 'input must be a string or a list of strings'})
+            return
+        inputs = [t if isinstance(t, str) else json.dumps(t) for t in inputs]
+        lat = self.server.latency
+        self._sleep(lat.request_ms + lat.embed_item_ms * len(inputs), _seed(model, inputs))
+
+        b64 = req.get('encoding_format') == 'base64'
+        data = []
+        for i, text in enumerate(inputs):
+            vec = fake_embedding(model, text, self.server.dim)
+            emb: Any = base64.b64encode(struct.pack(f'<{len(vec)}f', *vec)).decode('ascii') if b64 else vec
+            data.append({'object': 'embedding', 'index': i, 'embedding': emb})
+        tokens = sum(_tokens(t) for t in inputs)
+        self._json(200, {
+            'object': 'list',
+            'model': model,
+            'data': data,
+            'usage': {'prompt_tokens': tokens, 'total_tokens': tokens},
+        })
+
+    def _reranking(self, req: dict[str, Any]) -> None:
+        query = req.get('query') or ''
+        docs = req.get('documents') or []
+        if not query or not docs:
+            # like nexa serve: an empty request only loads the model
+            if query or docs:
+                self._json(400, {'error': 'both query and documents must be provided'})
+            else:
+                self._json(200, None)
+            return
+        lat = self.server.latency
+        self._sleep(lat.request_ms + lat.rerank_doc_ms * len(docs), _seed(query, docs))
+        self._json(200, {'result': [fake_score(query, d) for d in docs]})
+
+    def _speech(self, req: dict[str, Any]) -> None:
+        text = req.get('input') or ''
+        if not text:
+            self._json(200, None)
+            return
+        lat = self.server.latency
+        self._sleep(lat.request_ms + lat.tts_ms_per_char * len(text), _seed(text))
+        # roughly 15 characters of speech per second
+        self._send(200, fake_wav(len(text) / 15), 'audio/wav')
+
+    def _transcriptions(self, body: bytes) -> None:
+        fields = _form_fields(body, self.headers.get('Content-Type') or '')
+        if fields.get('stream', b'').strip() == b'true':
+            self._json(400, {'error': 'streaming not supported'})
+            return
+        # Seed from the audio and model only: the multipart boundary differs per request
+        audio = fields.get('file', b'')
+        model = fields.get('model', b'').decode('utf-8', 'replace')
+        lat = self.server.latency
+        self._sleep(lat.request_ms + lat.asr_ms_per_kb * len(audio) / 1024, _seed(model, len(audio)))
+        rng = random.Random(_seed(model, hashlib.sha256(audio).hexdigest()))
+        self._json(200, {'text': ' '.join(rng.choice(WORDS) for _ in range(max(1, len(audio) // 8000)))})
+
+
+def main():
+    ap = argparse.ArgumentParser(description='Mock OpenAI-compatible nexa serve')
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=18181)
+    ap.add_argument('--models', nargs='*', default=['NexaAI/mock-llm', 'NexaAI/mock-embedder', 'NexaAI/mock-reranker'])
+    ap.add_argument('--dim', type=int, default=768, help='embedding dimension')
+    ap.add_argument('--parallel', action='store_true', help='do not serialize requests')
+    ap.add_argument('--verbose', action='store_true')
+    for name, field in LatencyModel.__dataclass_fields__.items():
+        if name != 'serialize':
+            ap.add_argument(f'--{name.replace("_", "-")}', type=type(field.default), default=field.default)
+    args = ap.parse_args()
+
+    latency = LatencyModel(**{
+        name: getattr(args, name) for name in LatencyModel.__dataclass_fields__ if name != 'serialize'
+    }, serialize=not args.parallel)
+    server = MockServer((args.host, args.port), latency, args.models, args.dim, verbose=args.verbose)
+    print(f'Mock nexa serve on http://{args.host}:{args.port} {asdict(latency)}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
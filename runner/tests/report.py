@@ -0,0 +1,65 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#!/usr/bin/env python3
+'''
+Trend report over the benchmark history store.
+
+run.py adds every run to the store; older run directories can be added with
+--ingest. The report shows TTFT, tokens/s, items/s, peak RSS and load time per
+model and case over the last runs, and flags significant regressions of the
+latest run.
+
+    python report.py --ingest bench-20250101-000000 bench-20250102-000000
+    python report.py --out trend.md
+    python report.py --out trend.html --last 30
+'''
+
+import argparse
+import pathlib
+import sys
+
+from scripts import history
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Benchmark trend report')
+    ap.add_argument('--db', type=pathlib.Path, default=pathlib.Path('bench-history.db'))
+    ap.add_argument('--ingest', type=pathlib.Path, nargs='*', default=[], help='run directories to add first')
+    ap.add_argument('--last', type=int, default=20, help='number of latest runs to include')
+    ap.add_argument('--out', type=pathlib.Path, help='write to this file (.html for HTML, markdown otherwise)')
+    ap.add_argument('--fail-on-regression', action='store_true', help='exit non-zero if a regression is flagged')
+    args = ap.parse_args()
+
+    conn = history.connect(args.db)
+    for d in args.ingest:
+        history.ingest(conn, d)
+        print(f'Ingested {d}')
+    all_series = history.series(conn, args.last)
+    conn.close()
+
+    is_html = args.out is not None and args.out.suffix.lower() in ('.html', '.htm')
+    text = history.render_html(all_series) if is_html else history.markdown(all_series)
+    if args.out is None:
+        print(text)
+    else:
+        args.out.write_text(text, encoding='utf-8')
+        print(f'Report saved to {args.out}')
+
+    if args.fail_on_regression and any(s.regression for s in all_series):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,22 +14,30 @@
 
 #!/usr/bin/env python3
 
+import argparse
+import functools
 import json
 import os
 import pathlib
 import subprocess
 import sys
+import time
 import traceback
+from typing import Any, TypeAlias
 
 import psutil
-from cases import BaseCase
-from scripts import config, log, utils
+from cases import BaseCase, ServeCase
+from scripts import config, fingerprint, history, log, metrics, sampler, scaling, startup, utils
+from scripts.sampler import TreeSampler, Usage
+from scripts.scheduler import Job, Scheduler
 
 # plugin, model, testcases
 testcases: list[config.case]
+# plugin, model, tc, reason, log_file
+failed_case: TypeAlias = tuple[str, str, str, str, str]
 
 
-def init_benchmark():
+def init_benchmark(heavy: bool = False):
     global testcases
     log.print('========= Init Benchmark =========')
 
@@ -38,7 +46,7 @@ def init_benchmark():
     if len(plugins) == 0:
         raise Exception('No supported plugins found')
 
-    testcases = config.get_testcases(plugins)
+    testcases = config.get_testcases(plugins, heavy)
     # count total Testcases
     log.print(f'Found {len(testcases)} Models with {sum(len(tc[2]) for tc in testcases)} TestCases')
     if len(testcases) == 0:
@@ -106,20 +114,55 @@ def _parse_stderr(stderr: str) -> tuple[list[str], list[str]]:
     return out, err
 
 
-def _do_case(type: str, model: str, tc: BaseCase, tc_log: pathlib.Path) -> None | str:
+def _split_wall_time(usage: Usage, profiles: list[dict[str, Any]]):
+    '''
+    Split wall time into inference (sum of the rounds' prompt and decode time, in us)
+    and the rest, which is mostly process start and model load.
+    '''
+    infer_us = sum(max(p.get('TTFT', 0), p.get('PromptTime', 0)) + p.get('DecodeTime', 0) for p in profiles)
+    if infer_us <= 0:
+        return
+    usage.infer_s = min(infer_us / 1e6, usage.wall_s)
+    usage.load_s = usage.wall_s - usage.infer_s
+
+
+def _do_case(
+    type: str,
+    model: str,
+    tc: BaseCase,
+    tc_log: pathlib.Path,
+    env: dict[str, str] | None = None,
+    profiles: list[dict[str, Any]] | None = None,
+    usage: Usage | None = None,
+    server_pid: int | None = None,
+) -> None | str:
+    '''
+    Run one nexa command for a testcase while sampling the resource usage of its
+    process tree (and of the server it talks to, if server_pid is given).
+    '''
     of = None
+    usage = usage if usage is not None else Usage()
     try:
         of = open(f'{tc_log}.{type}.log', 'w', encoding='utf-8')
         of.write('===== Output Log =====\n')
         of.flush()
-        p = utils.start_nexa([type, model] + tc.param(), debug_log=True, stdout=of)
-        _, stderr = p.communicate(timeout=600)
+        p = utils.start_nexa([type, model] + tc.param(), debug_log=True, stdout=of, env=env)
+        with TreeSampler([p.pid] + ([server_pid] if server_pid is not None else []), usage):
+            _, stderr = p.communicate(timeout=600)
 
         stdout, stderr = _parse_stderr(stderr)
         of.write('\n====== Debug Log ======\n')
         for line in stdout:
             of.write(f'{line}\n')
 
+        _split_wall_time(usage, [json.loads(line).get('Profile') or {} for line in stderr])
+        of.write('\n====== Resource =======\n')
+        of.write(f'{json.dumps(usage.as_dict())}\n')
+        with open(f'{tc_log}.{type}.resource.json', 'w', encoding='utf-8') as rf:
+            # tc_log is log_dir/plugin/..., so the parent names the plugin
+            key = {'plugin': tc_log.parent.name, 'model': model, 'case': tc.name(), 'mode': type}
+            json.dump({**key, **usage.as_dict()}, rf, indent=2)
+
         if p.returncode != 0:
             raise RuntimeError(f'Non-zero exit code: {p.returncode}')
 
@@ -127,7 +170,10 @@ def _do_case(type: str, model: str, tc: BaseCase, tc_log: pathlib.Path) -> None
         failed = False
         for line in stderr:
             of.write(f'{line}\n')
-            if tc.check(json.loads(line)):
+            res = json.loads(line)
+            if profiles is not None:
+                profiles.append(res.get('Profile') or {})
+            if tc.check(res):
                 of.write('  --> Passed\n')
                 continue
             else:
@@ -150,13 +196,52 @@ def _do_case(type: str, model: str, tc: BaseCase, tc_log: pathlib.Path) -> None
             of.close()
 
 
-def _start_server(tc_log: pathlib.Path):
+def _serve_case(
+    model: str, tc: ServeCase, tc_log: pathlib.Path, host: str, serve: subprocess.Popen[str], result: dict[str, Any]
+) -> None | str:
+    '''
+    Run a ServeCase against the server while sampling the server's resource usage.
+    The case result, with the usage under 'resource', is written to
+    {tc_log}.result.json and copied into result.
+    '''
+    of = None
+    try:
+        of = open(f'{tc_log}.run.log', 'w', encoding='utf-8')
+        if not utils.wait_server(host, serve):
+            return 'Serve Failed'
+        usage = Usage()
+        with TreeSampler([serve.pid], usage):
+            result.update(tc.serve(host, model))
+        result['resource'] = usage.as_dict()
+
+        of.write('====== Json Log =======\n')
+        of.write(f'{json.dumps(result)}\n')
+        with open(f'{tc_log}.result.json', 'w', encoding='utf-8') as rf:
+            json.dump(result, rf, indent=2)
+        if tc.check(result):
+            of.write('  --> Passed\n')
+            return None
+        of.write('  --> Failed\n')
+        return 'Check Failed'
+
+    except Exception as _:
+        if of is not None:
+            of.write('\n====== Exception Log =======\n')
+            of.write(traceback.format_exc())
+        return 'Execution Failed'
+
+    finally:
+        if of is not None:
+            of.close()
+
+
+def _start_server(tc_log: pathlib.Path, env: dict[str, str] | None = None):
     of = None
     try:
         of = open(f'{tc_log}.serve.log', 'w', encoding='utf-8')
         of.write('===== Output Log =====\n')
         of.flush()
-        return utils.start_nexa(['serve'], debug_log=True, stdout=of, stderr=of)
+        return utils.start_nexa(['serve'], debug_log=True, stdout=of, stderr=of, env=env)
 
     except Exception as _:
         if of is not None:
@@ -166,7 +251,25 @@ def _start_server(tc_log: pathlib.Path):
         return 'Serve Failed'
 
 
-def _stop_server():
+def _stop_server(serve: subprocess.Popen[str] | None = None):
+    if serve is not None:
+        # stop only this server (launcher and its nexa-cli child), others may still be running
+        try:
+            procs = [psutil.Process(serve.pid)]
+            procs += procs[0].children(recursive=True)
+        except psutil.NoSuchProcess:
+            return
+        for proc in reversed(procs):
+            try:
+                proc.terminate()
+                proc.wait(timeout=10)
+            except psutil.NoSuchProcess:
+                pass
+            except Exception:
+                proc.kill()
+                proc.wait()
+        return
+
     for proc in psutil.process_iter():  # pyright: ignore[reportUnknownMemberType]
         if 'nexa-cli' in proc.name() and 'serve' in proc.cmdline():
             try:
@@ -177,50 +280,286 @@ def _stop_server():
                 proc.wait()
 
 
-def run_benchmark():
-    log.print('========== Run Benchmark =========')
+def _infer_case(
+    plugin: str, model: str, tcc: type[BaseCase], tc_log: pathlib.Path, mp: str, tcp: str,
+    env: dict[str, str], lines: list[str], failed_cases: list[failed_case], rows: list[metrics.row]
+) -> None:
+    if issubclass(tcc, ServeCase):
+        return
+    tc = tcc()
+    profiles: list[dict[str, Any]] = []
+    usage = Usage()
+    res = _do_case('infer', model, tc, tc_log, env, profiles, usage)
+    rows.extend(metrics.from_profile(plugin, model, tc.name(), 'infer', i + 1, p) for i, p in enumerate(profiles))
+    if res is None:
+        lines.append(f'  --> [{mp}][{tcp}] {tc.name()} Infer: Success, {usage.summary()}')
+    else:
+        lines.append(f'  --> [{mp}][{tcp}] {tc.name()} Infer: {res}')
+        failed_cases.append((plugin, model, tc.name(), res, str(tc_log) + '.infer.log'))
+
+
+def _run_against_server(
+    plugin: str, model: str, tcc: type[BaseCase], tc_log: pathlib.Path, mp: str, tcp: str,
+    env: dict[str, str], lines: list[str], failed_cases: list[failed_case], rows: list[metrics.row],
+    serve: subprocess.Popen[str]
+) -> None:
+    tc = tcc()
+    if isinstance(tc, ServeCase):
+        result: dict[str, Any] = {}
+        res = _serve_case(model, tc, tc_log, env['NEXA_HOST'], serve, result)
+        rows.extend(metrics.from_points(plugin, model, tc.name(), result.get('points', [])))
+        if res is None:
+            lines.append(f'  --> [{mp}][{tcp}] {tc.name()} Run: Success, {tc.summary(result)}')
+        else:
+            lines.append(f'  --> [{mp}][{tcp}] {tc.name()} Run: {res}')
+            failed_cases.append((plugin, model, tc.name(), res, str(tc_log) + '.run.log'))
+        return
+    profiles: list[dict[str, Any]] = []
+    usage = Usage()
+    res = _do_case('run', model, tc, tc_log, env, profiles, usage, serve.pid)
+    rows.extend(metrics.from_profile(plugin, model, tc.name(), 'run', i + 1, p) for i, p in enumerate(profiles))
+    if res is None:
+        lines.append(f'  --> [{mp}][{tcp}] {tc.name()} Run: Success, {usage.summary()}')
+    else:
+        lines.append(f'  --> [{mp}][{tcp}] {tc.name()} Run: {res}')
+        failed_cases.append((plugin, model, tc.name(), res, str(tc_log) + '.run.log'))
+
+
+def _run_case(
+    plugin: str, model: str, tcc: type[BaseCase], tc_log: pathlib.Path, mp: str, tcp: str
+) -> tuple[list[str], list[failed_case], list[metrics.row]]:
+    '''
+    Run one testcase through infer and run (against its own server).
+    Returns the log lines, failures and metrics instead of printing them, so parallel
+    cases can be reported in order.
+    '''
+    lines: list[str] = []
+    failed_cases: list[failed_case] = []
+    rows: list[metrics.row] = []
+    # a private server address so cases can run side by side
+    env = {'NEXA_HOST': f'127.0.0.1:{utils.free_port()}'}
+
+    _infer_case(plugin, model, tcc, tc_log, mp, tcp, env, lines, failed_cases, rows)
+
+    # use finally to ensure server is stopped
+    serve = None
+    try:
+        serve = _start_server(tc_log, env)
+        if not isinstance(serve, subprocess.Popen):
+            lines.append(f'  --> [{mp}][{tcp}] {tcc().name()} Run: {serve}')
+            failed_cases.append((plugin, model, tcc().name(), serve, str(tc_log) + '.serve.log'))
+            return lines, failed_cases, rows
 
-    # plugin, model, tc, reason, log_file
-    failed_cases: list[tuple[str, str, str, str, str]] = []
+        _run_against_server(plugin, model, tcc, tc_log, mp, tcp, env, lines, failed_cases, rows, serve)
+    finally:
+        if isinstance(serve, subprocess.Popen):
+            _stop_server(serve)
+
+    return lines, failed_cases, rows
+
+
+def _run_group(
+    plugin: str, model: str, modal: str, cases: list[tuple[type[BaseCase], pathlib.Path, str]], mp: str,
+    group_log: pathlib.Path
+) -> tuple[list[str], list[failed_case], list[metrics.row], dict[str, Any]]:
+    '''
+    Run all testcases of one model against a single server.
+
+    The server is started once and the model is loaded by a warm-up request before
+    any case runs, so run cases measure inference only. Server start and model load
+    are returned as the cold start metric.
+    '''
+    lines: list[str] = []
+    failed_cases: list[failed_case] = []
+    rows: list[metrics.row] = []
+    host = f'127.0.0.1:{utils.free_port()}'
+    env = {'NEXA_HOST': host}
+    cold: dict[str, Any] = {'plugin': plugin, 'model': model, 'server_start_s': None, 'model_load_s': None}
+
+    for tcc, tc_log, tcp in cases:
+        _infer_case(plugin, model, tcc, tc_log, mp, tcp, env, lines, failed_cases, rows)
+
+    serve = None
+    try:
+        start = time.perf_counter()
+        serve = _start_server(group_log, env)
+        reason = None
+        if not isinstance(serve, subprocess.Popen):
+            reason = serve
+        elif not utils.wait_server(host, serve):
+            reason = 'Serve Failed'
+        else:
+            cold['server_start_s'] = round(time.perf_counter() - start, 3)
+            start = time.perf_counter()
+            try:
+                utils.warmup_model(host, model, modal)
+                cold['model_load_s'] = round(time.perf_counter() - start, 3)
+            except OSError as e:
+                reason = 'Warmup Failed'
+                with open(f'{group_log}.serve.log', 'a', encoding='utf-8') as of:
+                    of.write(f'\n====== Warmup Failed ======\n{e}\n')
+
+        if reason is not None:
+            for tcc, _, tcp in cases:
+                lines.append(f'  --> [{mp}][{tcp}] {tcc().name()} Run: {reason}')
+                failed_cases.append((plugin, model, tcc().name(), reason, str(group_log) + '.serve.log'))
+            return lines, failed_cases, rows, cold
+
+        lines.append(
+            f'  --> [{mp}] Cold Start: server {cold["server_start_s"]}s, model load {cold["model_load_s"]}s'
+        )
+        for tcc, tc_log, tcp in cases:
+            _run_against_server(plugin, model, tcc, tc_log, mp, tcp, env, lines, failed_cases, rows, serve)
+    finally:
+        if isinstance(serve, subprocess.Popen):
+            _stop_server(serve)
+
+    return lines, failed_cases, rows, cold
+
+
+def _stored(*result: Any) -> tuple[Any, ...]:
+    return result
+
+
+def run_benchmark(
+    jobs: int = 1,
+    ram_budget_gb: float = 0.0,
+    resources: dict[str, str] | None = None,
+    reuse_server: bool = False,
+    baseline: pathlib.Path | None = None,
+    thresholds: dict[str, float] | None = None,
+    store: fingerprint.ResultStore | None = None,
+    force: bool = False,
+    history_db: pathlib.Path | None = None,
+) -> bool:
+    '''
+    Run all testcases. Returns False if a profile metric regressed against baseline.
+
+    With a store, jobs whose fingerprint has a stored passing result are not run
+    again (unless force) and report the stored result instead. Stored rows are not
+    measurements of this run: they are listed in cached.json with the run they came
+    from and left out of metrics.json, the baseline compare and the history.
+    '''
+    log.print('========== Run Benchmark =========')
 
-    for i, (plugin, model, _, tcs) in enumerate(testcases):
+    # read before this run writes its own metrics, baseline may be the same file
+    baseline_rows = metrics.load(baseline) if baseline is not None else None
+    failed_cases: list[failed_case] = []
+    cold_starts: list[dict[str, Any]] = []
+    rows: list[metrics.row] = []
+
+    # one job per testcase; headers[i] is printed before job i's results
+    work: list[Job] = []
+    headers: list[str | None] = []
+    fps: list[str | None] = []
+    # log dir of the run a cached job's result comes from, None for jobs that run
+    sources: list[str | None] = []
+    job_cases: list[list[dict[str, str]]] = []
+    version = fingerprint.nexa_version() if store is not None else ''
+    extra = {'reuse_server': reuse_server}
+
+    def add(header: str | None, job: Job, case_fps: list[str], cases: list[dict[str, str]]):
+        fp = fingerprint.combine(case_fps) if store is not None and case_fps else None
+        cached = store.get(fp) if store is not None and fp is not None and not force else None
+        source = None
+        if cached is not None:
+            source = cached['log_dir']
+            lines, *rest = cached['result']
+            lines = [f'{line} (cached: {source})' for line in lines]
+            job = Job(job.resource, 0.0, functools.partial(_stored, lines, *rest))
+            fp = None
+        headers.append(header)
+        work.append(job)
+        fps.append(fp)
+        sources.append(source)
+        job_cases.append(cases)
+
+    for i, (plugin, model, modal, tcs) in enumerate(testcases):
         os.makedirs(log.log_dir / plugin, exist_ok=True)
         mp = f'{i + 1:0{len(str(len(testcases)))}}/{len(testcases)}'
-        log.print(f'==> [{mp}] Plugin: {plugin}, Model: {model}')
+        resource = (resources or {}).get(plugin) or config.get_resource(plugin)
+        ram_gb = config.estimate_ram_gb(model, modal)
+        header = f'==> [{mp}] Plugin: {plugin}, Model: {model}'
+        group: list[tuple[type[BaseCase], pathlib.Path, str]] = []
+        case_fps = [
+            fingerprint.case_fingerprint(version, plugin, model, tcc, extra) if store is not None else ''
+            for tcc in tcs
+        ]
 
         for j, tcc in enumerate(tcs):
-            tc = tcc()
             tcp = f'{j + 1:0{len(str(len(tcs)))}}/{len(tcs)}'
             tc_log = (
                 log.log_dir
                 / plugin
-                / f'{mp.split("/")[0]}-{tcp.split("/")[0]}-{model.replace("/", "-").replace(":", "-")}-{tc.name()}'
+                / f'{mp.split("/")[0]}-{tcp.split("/")[0]}-{model.replace("/", "-").replace(":", "-")}-{tcc().name()}'
             )
-
-            res = _do_case('infer', model, tc, tc_log)
-            if res is None:
-                log.print(f'  --> [{mp}][{tcp}] {tc.name()} Infer: Success')
-            else:
-                log.print(f'  --> [{mp}][{tcp}] {tc.name()} Infer: {res}')
-                failed_cases.append((plugin, model, tc.name(), res, str(tc_log) + '.infer.log'))
-
-            # use finally to ensure server is stopped
-            tc = tcc()
-            try:
-                serve = _start_server(tc_log)
-                if not isinstance(serve, subprocess.Popen):
-                    log.print(f'  --> [{mp}][{tcp}] {tc.name()} Run: {serve}')
-                    failed_cases.append((plugin, model, tc.name(), serve, str(tc_log) + '.serve.log'))
-                    continue
-
-                res = _do_case('run', model, tc, tc_log)
-                if res is None:
-                    log.print(f'  --> [{mp}][{tcp}] {tc.name()} Run: Success')
-                else:
-                    log.print(f'  --> [{mp}][{tcp}] {tc.name()} Run: {res}')
-                    failed_cases.append((plugin, model, tc.name(), res, str(tc_log) + '.run.log'))
-            finally:
-                _stop_server()
+            if reuse_server:
+                group.append((tcc, tc_log, tcp))
+                continue
+            add(
+                header if j == 0 else None,
+                Job(resource, ram_gb, functools.partial(_run_case, plugin, model, tcc, tc_log, mp, tcp), tcc.exclusive),
+                [case_fps[j]],
+                [{'plugin': plugin, 'model': model, 'case': tcc().name()}],
+            )
+        if reuse_server and group:
+            # the group shares one server, so it is reused or rerun as a whole
+            group_log = log.log_dir / plugin / f'{mp.split("/")[0]}-{model.replace("/", "-").replace(":", "-")}'
+            add(
+                header,
+                Job(
+                    resource,
+                    ram_gb,
+                    functools.partial(_run_group, plugin, model, modal, group, mp, group_log),
+                    any(tcc.exclusive for tcc, _, _ in group),
+                ),
+                case_fps,
+                [{'plugin': plugin, 'model': model, 'case': tcc().name()} for tcc, _, _ in group],
+            )
+        elif len(tcs) == 0:
+            add(header, Job(resource, 0.0, lambda: ([], [], [])), [], [])
+
+    if ram_budget_gb <= 0:
+        ram_budget_gb = psutil.virtual_memory().available / 2**30 * 0.8
+    slots = {'cpu': max(1, jobs), 'gpu': 1, 'npu': 1}
+    reused: list[dict[str, Any]] = []
+    for i, result in Scheduler(slots, ram_budget_gb).run(work):
+        lines, failed, case_rows, *cold = result
+        fp = fps[i]
+        if store is not None and fp is not None and len(failed) == 0:
+            store.put(fp, log.log_dir, result)
+        if headers[i] is not None:
+            log.print(headers[i])
+        for line in lines:
+            log.print(line)
+        failed_cases.extend(failed)
+        if sources[i] is not None:
+            reused.append({'log_dir': sources[i], 'cases': job_cases[i], 'rows': case_rows, 'cold_start': cold})
+        else:
+            rows.extend(case_rows)
+            cold_starts.extend(cold)
+    _stop_server()
+    if store is not None:
+        store.save()
+
+    if cold_starts:
+        with open(log.log_dir / 'cold_start.json', 'w', encoding='utf-8') as f:
+            json.dump(cold_starts, f, indent=2)
+    if reused:
+        with open(log.log_dir / 'cached.json', 'w', encoding='utf-8') as f:
+            json.dump(reused, f, indent=2)
+    metrics.write(rows, log.log_dir)
+    points = scaling.curve(rows, testcases)
+    if points:
+        scaling.write(points, log.log_dir)
+    sampler.collect(log.log_dir, reused)
+    serve_results = {
+        str(p.relative_to(log.log_dir)).removesuffix('.result.json'): json.loads(p.read_text(encoding='utf-8'))
+        for p in sorted(log.log_dir.rglob('*.result.json'))
+    }
+    if serve_results:
+        with open(log.log_dir / 'serve_cases.json', 'w', encoding='utf-8') as f:
+            json.dump(serve_results, f, indent=2)
 
     log.print('======== Benchmark Result ========')
     if len(failed_cases) == 0:
@@ -228,14 +567,180 @@ def run_benchmark():
     else:
         for plugin, model, tc, reason, log_file in failed_cases:
             log.print(f'==> {reason}: [{plugin}] [{model}] [{tc}] {log_file}')
+
+    if points:
+        log.print('========= Prefill Scaling ========')
+        for line in scaling.summarize(points):
+            log.print(f'==> {line}')
+
+    regressions: list[str] = []
+    if baseline_rows is not None:
+        log.print(f'======= Compare to {baseline} =======')
+        regressions = metrics.compare(rows, baseline_rows, thresholds or metrics.DEFAULT_THRESHOLDS)
+        if reused:
+            log.print(f'Cached results are not compared: {len(reused)} job(s), see cached.json')
+        if len(regressions) == 0:
+            log.print('No regressions')
+        for r in regressions:
+            log.print(f'==> Regression: {r}')
+    if history_db is not None:
+        conn = history.connect(history_db)
+        history.ingest(conn, log.log_dir)
+        conn.close()
+        log.print(f'Results added to {history_db}')
+    log.print(f'Logs saved to {log.log_dir}')
+    return len(regressions) == 0
+
+
+def run_startup(repeats: int = 3, history_db: pathlib.Path | None = None):
+    '''
+    Measure startup of every model: a fresh server with the model files dropped
+    from the page cache (cold) and with them cached (warm). Each sample times
+    server start, model load and the first inference separately, plus the time to
+    the first usable inference. Models run one at a time since the page cache is
+    shared.
+    '''
+    log.print('========== Run Startup ===========')
+
+    results: list[dict[str, Any]] = []
+    for i, (plugin, model, modal, _) in enumerate(testcases):
+        os.makedirs(log.log_dir / plugin, exist_ok=True)
+        mp = f'{i + 1:0{len(str(len(testcases)))}}/{len(testcases)}'
+        log.print(f'==> [{mp}] Plugin: {plugin}, Model: {model}')
+        files = startup.model_files(model)
+
+        for state in ('cold', 'warm'):
+            for r in range(repeats):
+                name = f'{mp.split("/")[0]}-{model.replace("/", "-").replace(":", "-")}-startup-{state}-{r + 1}'
+                res: dict[str, Any] = {'plugin': plugin, 'model': model, 'mode': state, 'round': r + 1}
+                if state == 'cold':
+                    res['evict'] = startup.evict(files)
+                host = f'127.0.0.1:{utils.free_port()}'
+                started = time.perf_counter()
+                serve = _start_server(log.log_dir / plugin / name, {'NEXA_HOST': host})
+                try:
+                    if not isinstance(serve, subprocess.Popen):
+                        raise OSError(serve)
+                    res.update(startup.measure(host, model, modal, serve, started))
+                except OSError as e:
+                    res['error'] = str(e)
+                finally:
+                    if isinstance(serve, subprocess.Popen):
+                        _stop_server(serve)
+                results.append(res)
+
+                if 'error' in res:
+                    log.print(f'  --> [{mp}] {state} {r + 1}: Failed, {res["error"]}')
+                    continue
+                line = f'  --> [{mp}] {state} {r + 1}: server {res["server_start_s"]}s, load {res["load_s"]}s'
+                if 'first_inference_s' in res:
+                    line += f', first inference {res["first_inference_s"]}s'
+                line += f', usable after {res["time_to_first_usable_s"]}s'
+                if 'evict' in res:
+                    line += f' (page cache: {res["evict"]})'
+                log.print(line)
+
+    with open(log.log_dir / 'startup.json', 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    if history_db is not None:
+        conn = history.connect(history_db)
+        history.ingest(conn, log.log_dir)
+        conn.close()
+        log.print(f'Results added to {history_db}')
     log.print(f'Logs saved to {log.log_dir}')
 
 
 def main():
+    ap = argparse.ArgumentParser(description='Nexa SDK benchmark')
+    ap.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='max CPU-only cases running at once; accelerator and performance cases always run one at a '
+        'time. cpu_gpu counts as CPU-only, so raise this only where it does not offload layers to a GPU',
+    )
+    ap.add_argument(
+        '--ram-budget-gb', type=float, default=0.0, help='RAM shared by running cases (default: 80%% of free)'
+    )
+    ap.add_argument(
+        '--resource',
+        action='append',
+        default=[],
+        metavar='PLUGIN=CLASS',
+        help='override the resource class of a plugin, e.g. cpu_gpu=gpu',
+    )
+    ap.add_argument(
+        '--reuse-server',
+        action='store_true',
+        help='start one nexa serve per model, load the model once and run all its cases against it; '
+        'cold start is reported separately in cold_start.json',
+    )
+    ap.add_argument(
+        '--baseline',
+        type=pathlib.Path,
+        help='metrics.json (or log directory) of an earlier run; regressed profile metrics fail the run',
+    )
+    ap.add_argument(
+        '--threshold',
+        action='append',
+        default=[],
+        metavar='METRIC=FRAC',
+        help=f'allowed relative regression of a metric, default {metrics.DEFAULT_THRESHOLDS}',
+    )
+    ap.add_argument(
+        '--cache',
+        type=pathlib.Path,
+        default=pathlib.Path('bench-cache.json'),
+        help='results of passed cases by fingerprint (nexa version, plugin, model manifest, case); '
+        'cases with a stored result are not run again',
+    )
+    ap.add_argument('--force', action='store_true', help='run all cases even if a stored result exists')
+    ap.add_argument(
+        '--heavy',
+        action='store_true',
+        help='also run the long cases in HEAVY_TESTCASE_MAP (prefill and context sweeps up to n_ctx 16384)',
+    )
+    ap.add_argument(
+        '--history',
+        type=pathlib.Path,
+        default=pathlib.Path('bench-history.db'),
+        help='SQLite store the run is added to, see report.py',
+    )
+    ap.add_argument(
+        '--startup',
+        action='store_true',
+        help='instead of the testcases, measure cold and warm startup of each model; '
+        'cold drops the model files from the page cache where permitted',
+    )
+    ap.add_argument('--startup-repeats', type=int, default=3, help='samples per model and state in --startup mode')
+    args = ap.parse_args()
+    resources = dict(r.split('=', 1) for r in args.resource)
+    thresholds = dict(metrics.DEFAULT_THRESHOLDS)
+    for t in args.threshold:
+        metric, frac = t.split('=', 1)
+        if metric not in metrics.DIRECTION:
+            ap.error(f'unknown metric {metric}, choose from {list(metrics.DIRECTION)}')
+        thresholds[metric] = float(frac)
+
     log.init()
-    init_benchmark()
+    init_benchmark(args.heavy)
     check_models()
-    run_benchmark()
+    if args.startup:
+        run_startup(args.startup_repeats, args.history)
+        return
+    store = fingerprint.ResultStore(args.cache)
+    if not run_benchmark(
+        args.jobs,
+        args.ram_budget_gb,
+        resources,
+        args.reuse_server,
+        args.baseline,
+        thresholds,
+        store,
+        args.force,
+        args.history,
+    ):
+        sys.exit(1)
 
 
 if __name__ == '__main__':
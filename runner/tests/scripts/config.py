@@ -36,13 +36,17 @@ PLUGIN_MAP = {
 TESTCASE_MAP: dict[str, dict[str, dict[str, list[type[BaseCase]]]]] = {
     'cpu_gpu': {
         'llm': {
-            'Qwen/Qwen3-1.7B-GGUF:Q8_0': [MultiRound],
+            'Qwen/Qwen3-1.7B-GGUF:Q8_0': [
+                MultiRound,
+                *concurrency_sweep(),
+                *model_thrash('ggml-org/Qwen2.5-Omni-3B-GGUF:Q4_K_M'),
+            ],
             # 'ggml-org/gemma-3-4b-it-GGUF:F16': [MultiRound, ImageMultiRound],
             'ggml-org/Qwen2.5-Omni-3B-GGUF:Q4_K_M': [MultiRound, AudioMultiRound],
         },
         'vlm': {},
         'embedder': {
-            'djuna/jina-embeddings-v2-small-en-Q5_K_M-GGUF:Q5_K_M': [SingleRound],
+            'djuna/jina-embeddings-v2-small-en-Q5_K_M-GGUF:Q5_K_M': [SingleRound, EmbedSweep],
         },
         'reranker': {},
         'tts': {},
@@ -68,7 +72,7 @@ TESTCASE_MAP: dict[str, dict[str, dict[str, list[type[BaseCase]]]]] = {
             'NexaAI/LFM2-1.2B-npu': [MultiRound],
         },
         'embedder': {
-            'NexaAI/embeddinggemma-300m-npu': [SingleRound],
+            'NexaAI/embeddinggemma-300m-npu': [SingleRound, EmbedSweep],
         },
         'asr': {
             'NexaAI/parakeet-tdt-0.6b-v3-npu': [ASR],
@@ -79,7 +83,7 @@ TESTCASE_MAP: dict[str, dict[str, dict[str, list[type[BaseCase]]]]] = {
             'NexaAI/yolov12-npu': [ImageRecognition],
         },
         'reranker': {
-            'NexaAI/jina-v2-rerank-npu': [QueryDocument],
+            'NexaAI/jina-v2-rerank-npu': [QueryDocument, RerankSweep],
         },
     },
     'nexaml': {
@@ -91,6 +95,50 @@ TESTCASE_MAP: dict[str, dict[str, dict[str, list[type[BaseCase]]]]] = {
 }
 
 
+# Long-running cases (prompts up to 8192 tokens, n_ctx up to 16384), added with --heavy
+HEAVY_TESTCASE_MAP: dict[str, dict[str, dict[str, list[type[BaseCase]]]]] = {
+    'cpu_gpu': {
+        'llm': {
+            'Qwen/Qwen3-1.7B-GGUF:Q8_0': [*prefill_sweep(), *context_sweep()],
+        },
+    },
+}
+
+# Resource class each plugin's cases occupy. Cases of the same accelerator class
+# share one exclusive slot; 'cpu' cases may run concurrently.
+PLUGIN_RESOURCE: dict[str, dict[str, str]] = {
+    'Linux': {'cpu_gpu': 'cpu', 'nexaml': 'gpu'},
+    'Windows': {'cpu_gpu': 'cpu', 'npu': 'npu', 'nexaml': 'npu'},
+    'Darwin': {'cpu_gpu': 'gpu', 'metal': 'gpu'},
+}
+
+# Estimated peak RAM (GB) of one case, by modal, with per-model overrides
+RAM_ESTIMATE_GB: dict[str, float] = {
+    'llm': 4.0,
+    'vlm': 6.0,
+    'embedder': 1.0,
+    'reranker': 1.0,
+    'tts': 2.0,
+    'asr': 2.0,
+    'diarize': 1.0,
+    'cv': 1.0,
+    'image_gen': 8.0,
+}
+MODEL_RAM_ESTIMATE_GB: dict[str, float] = {
+    'ggml-org/Qwen2.5-Omni-3B-GGUF:Q4_K_M': 5.0,
+    'NexaAI/OmniNeural-4B': 8.0,
+    'NexaAI/Qwen3-VL-4B-Instruct-NPU': 8.0,
+}
+
+
+def get_resource(plugin: str) -> str:
+    return PLUGIN_RESOURCE.get(platform.system(), {}).get(plugin, 'cpu')
+
+
+def estimate_ram_gb(model: str, modal: str) -> float:
+    return MODEL_RAM_ESTIMATE_GB.get(model, RAM_ESTIMATE_GB.get(modal, 4.0))
+
+
 def get_plugins() -> list[str]:
     system = platform.system()
     machine = platform.machine()
@@ -100,13 +148,15 @@ def get_plugins() -> list[str]:
 case: TypeAlias = tuple[str, str, str, list[type[BaseCase]]]
 
 
-def get_testcases(plugins: list[str]) -> list[case]:
+def get_testcases(plugins: list[str], heavy: bool = False) -> list[case]:
     res: list[case] = []
     for plugin in TESTCASE_MAP:
         if plugin not in plugins:
             continue
         for modal, model_cases in TESTCASE_MAP[plugin].items():
             for model, cases in model_cases.items():
+                if heavy:
+                    cases = cases + HEAVY_TESTCASE_MAP.get(plugin, {}).get(modal, {}).get(model, [])
                 res.append((plugin, model, modal, cases))
 
     return res
@@ -0,0 +1,100 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+from typing import Any
+
+from cases import BaseCase
+
+from . import utils
+
+
+def nexa_version() -> str:
+    res = utils.execute_nexa(['version'])
+    if res.returncode != 0:
+        raise RuntimeError('Failed to get nexa version')
+    return res.stdout.strip()
+
+
+def models_dir() -> pathlib.Path:
+    data_dir = os.environ.get('NEXA_DATADIR')
+    if data_dir:
+        return pathlib.Path(data_dir) / 'models'
+    return pathlib.Path.home() / '.cache' / 'nexa.ai' / 'nexa_sdk' / 'models'
+
+
+def manifest_hash(model: str) -> str:
+    '''sha256 of the model's nexa.manifest, empty if the model is not downloaded.'''
+    path = models_dir() / model.split(':')[0] / 'nexa.manifest'
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ''
+
+
+def case_fingerprint(version: str, plugin: str, model: str, tcc: type[BaseCase], extra: dict[str, Any]) -> str:
+    '''
+    Hash of everything that decides a case's result: nexa version, plugin, model
+    manifest, case parameters and check code, and harness options in extra.
+    '''
+    # generated cases (e.g. sweep points) have no source of their own, use their bases'
+    source = ''
+    for cls in tcc.__mro__:
+        try:
+            source += inspect.getsource(cls)
+        except (OSError, TypeError):
+            pass
+    data = {
+        'version': version,
+        'plugin': plugin,
+        'model': model,
+        'manifest': manifest_hash(model),
+        'case': tcc.__name__,
+        'param': tcc().param(),
+        'source': hashlib.sha256(source.encode()).hexdigest(),
+        **extra,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def combine(fingerprints: list[str]) -> str:
+    return hashlib.sha256('\n'.join(fingerprints).encode()).hexdigest()
+
+
+class ResultStore:
+    '''
+    Results of passed jobs by fingerprint, kept in one JSON file across runs.
+    '''
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self.path = path
+        self.results: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                self.results = json.load(f)
+
+    def get(self, fp: str) -> dict[str, Any] | None:
+        return self.results.get(fp)
+
+    def put(self, fp: str, log_dir: pathlib.Path, result: tuple[Any, ...]) -> None:
+        self.results[fp] = {'log_dir': str(log_dir), 'result': list(result)}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f)
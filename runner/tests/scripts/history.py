@@ -0,0 +1,258 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import html
+import json
+import pathlib
+import sqlite3
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any
+
+from . import metrics
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    log_dir TEXT UNIQUE NOT NULL,
+    started TEXT NOT NULL,
+    os TEXT,
+    arch TEXT,
+    python TEXT,
+    nexa_version TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    plugin TEXT NOT NULL,
+    model TEXT NOT NULL,
+    "case" TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    round INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_series ON samples (plugin, model, "case", mode, metric);
+'''
+
+# metrics shown in the report, with True if higher is better
+REPORT_METRICS: dict[str, bool] = {
+    'ttft_ms': False,
+    'prefill_tps': True,
+    'decode_tps': True,
+    'items_per_s': True,
+    'peak_rss_mb': False,
+    'load_s': False,
+    'time_to_first_usable_s': False,
+}
+# resource fields stored per case, as round 0
+RESOURCE_METRICS = ('peak_rss_mb', 'cpu_user_s', 'cpu_system_s', 'peak_threads', 'wall_s', 'load_s', 'infer_s')
+# startup.json fields, stored under case 'Startup' with mode cold/warm
+STARTUP_METRICS = ('server_start_s', 'load_s', 'first_inference_s', 'time_to_first_usable_s')
+
+
+def connect(path: pathlib.Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _started(log_dir: pathlib.Path, env: dict[str, str]) -> str:
+    '''
+    ISO start time of a run, so runs sort chronologically. Runs without it in
+    environment.json are dated from their bench-YYYYmmdd-HHMMSS directory name,
+    or the directory's modification time.
+    '''
+    if env.get('started'):
+        return env['started']
+    try:
+        started = datetime.strptime(log_dir.name, 'bench-%Y%m%d-%H%M%S')
+    except ValueError:
+        started = datetime.fromtimestamp(log_dir.stat().st_mtime)
+    return started.isoformat(timespec='seconds')
+
+
+def ingest(conn: sqlite3.Connection, log_dir: pathlib.Path) -> int:
+    '''
+    Store one run directory: environment.json, metrics.json, startup.json and the
+    per-case *.resource.json files. Ingesting the same directory again replaces it.
+
+    Returns:
+        The run id
+    '''
+    env_file = log_dir / 'environment.json'
+    env: dict[str, str] = json.loads(env_file.read_text(encoding='utf-8')) if env_file.exists() else {}
+    key = str(log_dir.resolve())
+    with conn:
+        conn.execute('DELETE FROM runs WHERE log_dir = ?', (key,))
+        cur = conn.execute(
+            'INSERT INTO runs (log_dir, started, os, arch, python, nexa_version) VALUES (?, ?, ?, ?, ?, ?)',
+            (key, _started(log_dir, env), env.get('os'), env.get('arch'), env.get('python'),
+             env.get('nexa_version')),
+        )
+        run_id = cur.lastrowid or 0
+
+        samples: list[tuple[Any, ...]] = []
+        if (log_dir / 'metrics.json').exists():
+            for r in metrics.load(log_dir):
+                for field in metrics.FIELDS[len(metrics.KEY):]:
+                    if isinstance(r.get(field), (int, float)):
+                        samples.append((run_id, *(r[k] for k in metrics.KEY), field, r[field]))
+        for path in log_dir.rglob('*.resource.json'):
+            r = json.loads(path.read_text(encoding='utf-8'))
+            if 'plugin' not in r:
+                continue
+            for field in RESOURCE_METRICS:
+                if isinstance(r.get(field), (int, float)):
+                    samples.append((run_id, r['plugin'], r['model'], r['case'], r['mode'], 0, field, r[field]))
+        if (log_dir / 'startup.json').exists():
+            for r in json.loads((log_dir / 'startup.json').read_text(encoding='utf-8')):
+                for field in STARTUP_METRICS:
+                    if isinstance(r.get(field), (int, float)):
+                        samples.append((run_id, r['plugin'], r['model'], 'Startup', r['mode'], r['round'], field,
+                                        r[field]))
+        conn.executemany('INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)', samples)
+    return run_id
+
+
+@dataclass
+class Series:
+    plugin: str
+    model: str
+    case: str
+    mode: str
+    metric: str
+    points: list[tuple[str, str, float]]  # (started, nexa version, mean over rounds), oldest first
+    regression: str = ''
+    # the newest run did not measure it (model not run, or its result was cached)
+    stale: bool = False
+
+
+def series(conn: sqlite3.Connection, last: int = 20) -> list[Series]:
+    '''
+    Per-run means of the report metrics over the last runs. Only series measured
+    by the newest run are checked for a regression; the others are marked stale.
+    '''
+    runs = conn.execute('SELECT id FROM runs ORDER BY started DESC, id DESC LIMIT ?', (last,)).fetchall()
+    if not runs:
+        return []
+    ids = [r[0] for r in runs]
+    marks = ','.join('?' * len(ids))
+    names = ','.join('?' * len(REPORT_METRICS))
+    rows = conn.execute(
+        f'''SELECT s.plugin, s.model, s."case", s.mode, s.metric, r.id, r.started, r.nexa_version, AVG(s.value)
+            FROM samples s JOIN runs r ON r.id = s.run_id
+            WHERE s.run_id IN ({marks}) AND s.metric IN ({names})
+            GROUP BY s.run_id, s.plugin, s.model, s."case", s.mode, s.metric
+            ORDER BY r.started, r.id''',
+        (*ids, *REPORT_METRICS),
+    ).fetchall()
+    grouped: dict[tuple[str, ...], list[tuple[str, str, float]]] = defaultdict(list)
+    last_run: dict[tuple[str, ...], int] = {}
+    for plugin, model, case, mode, metric, run_id, started, version, value in rows:
+        key = (plugin, model, case, mode, metric)
+        # nexa version output may span lines, keep the first
+        grouped[key].append((started, (version or '').split('\n')[0], value))
+        last_run[key] = run_id
+    res = [Series(*k, points=v, stale=last_run[k] != ids[0]) for k, v in grouped.items()]
+    for s in res:
+        if not s.stale:
+            s.regression = detect(s)
+    return res
+
+
+def detect(s: Series, min_history: int = 3, z: float = 3.0, min_change: float = 0.05) -> str:
+    '''
+    Flag the latest run if it is worse than the earlier runs by more than z robust
+    standard deviations (1.4826 * MAD around the median) and by at least min_change
+    relative to the median. Needs min_history earlier runs.
+    '''
+    if len(s.points) < min_history + 1:
+        return ''
+    history = [v for _, _, v in s.points[:-1]]
+    latest = s.points[-1][2]
+    median = statistics.median(history)
+    mad = statistics.median(abs(v - median) for v in history) * 1.4826
+    worse = (median - latest) if REPORT_METRICS[s.metric] else (latest - median)
+    if median == 0 or worse / abs(median) < min_change:
+        return ''
+    score = worse / mad if mad > 0 else float('inf')
+    if score <= z:
+        return ''
+    return f'{worse / abs(median):.1%} worse than the median of {len(history)} runs ({score:.1f} sigma)'
+
+
+def _fmt(v: float) -> str:
+    return f'{v:.1f}' if abs(v) >= 10 else f'{v:.3g}'
+
+
+def _stale(s: Series) -> str:
+    return f'stale (last run {s.points[-1][0]})' if s.stale else ''
+
+
+def markdown(all_series: list[Series]) -> str:
+    out = ['# Benchmark trend', '']
+    flagged = [s for s in all_series if s.regression]
+    out.append(f'{len(flagged)} significant regression(s) in the latest run.')
+    stale = sum(s.stale for s in all_series)
+    if stale:
+        out.append(f'{stale} series not measured in the latest run are marked stale and not checked.')
+    out.append('')
+    for s in flagged:
+        out.append(f'- **[{s.plugin}] {s.model} {s.case} ({s.mode}) {s.metric}**: {s.regression}')
+    by_model: dict[tuple[str, str], list[Series]] = defaultdict(list)
+    for s in all_series:
+        by_model[(s.plugin, s.model)].append(s)
+    for (plugin, model), group in by_model.items():
+        out += [
+            '', f'## [{plugin}] {model}', '',
+            '| case | mode | metric | trend (oldest → latest) | latest | flag |', '|---|---|---|---|---|---|',
+        ]
+        for s in group:
+            trend = ' → '.join(_fmt(v) for _, _, v in s.points)
+            flag = f'⚠ {s.regression}' if s.regression else _stale(s)
+            out.append(f'| {s.case} | {s.mode} | {s.metric} | {trend} | {_fmt(s.points[-1][2])} | {flag} |')
+    return '\n'.join(out) + '\n'
+
+
+def _sparkline(values: list[float], width: int = 160, height: int = 32) -> str:
+    if len(values) < 2:
+        return ''
+    lo, hi = min(values), max(values)
+    span = hi - lo or 1.0
+    step = width / (len(values) - 1)
+    pts = ' '.join(f'{i * step:.1f},{height - 2 - (v - lo) / span * (height - 4):.1f}' for i, v in enumerate(values))
+    return (f'<svg width="{width}" height="{height}"><polyline points="{pts}" fill="none" stroke="#36c" '
+            'stroke-width="1.5"/></svg>')
+
+
+def render_html(all_series: list[Series]) -> str:
+    rows: list[str] = []
+    for s in all_series:
+        values = [v for _, _, v in s.points]
+        title = html.escape(' | '.join(f'{t} {ver}: {_fmt(v)}' for t, ver, v in s.points))
+        style = ' style="background:#fdd"' if s.regression else ''
+        rows.append(
+            f'<tr{style}><td>{html.escape(s.plugin)}</td><td>{html.escape(s.model)}</td><td>{html.escape(s.case)}</td>'
+            f'<td>{s.mode}</td><td>{s.metric}</td><td title="{title}">{_sparkline(values)}</td>'
+            f'<td>{_fmt(values[-1])}</td><td>{html.escape(s.regression or _stale(s))}</td></tr>'
+        )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Benchmark trend</title>'
+        '<style>body{font-family:sans-serif}td,th{padding:2px 8px;border-bottom:1px solid #ddd}</style></head><body>'
+        '<h1>Benchmark trend</h1><table><tr><th>plugin</th><th>model</th><th>case</th><th>mode</th><th>metric</th>'
+        '<th>trend</th><th>latest</th><th>regression</th></tr>' + ''.join(rows) + '</table></body></html>\n'
+    )
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import builtins
+import json
 import os
 import platform
 import sys
@@ -24,6 +25,8 @@ from . import utils
 
 log_dir = Path('bench-' + datetime.now().strftime('%Y%m%d-%H%M%S'))
 log_file: TextIOWrapper
+# environment of this run, also saved as environment.json
+env: dict[str, str] = {}
 
 
 def init():
@@ -43,6 +46,16 @@ def init():
         print(line)
     log_file.close()
 
+    env.update({
+        'started': datetime.now().isoformat(timespec='seconds'),
+        'os': platform.system(),
+        'arch': platform.machine(),
+        'python': sys.version.split()[0],
+        'nexa_version': res.stdout.strip(),
+    })
+    with open(log_dir / 'environment.json', 'w', encoding='utf-8') as f:
+        json.dump(env, f, indent=2)
+
     log_file = open(log_dir / 'bench.log', 'w', encoding='utf-8')
 
 
@@ -0,0 +1,148 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import json
+import pathlib
+from typing import Any, TypeAlias
+
+# one row per round: plugin, model, case, mode, round and the profile metrics
+row: TypeAlias = dict[str, Any]
+
+KEY = ('plugin', 'model', 'case', 'mode', 'round')
+FIELDS = (
+    *KEY,
+    'ttft_ms',
+    'prompt_tokens',
+    'generated_tokens',
+    'prefill_tps',
+    'decode_tps',
+    'real_time_factor',
+    'items_per_s',
+    'latency_ms',
+)
+
+# metric -> True if higher is better
+DIRECTION: dict[str, bool] = {
+    'ttft_ms': False,
+    'prefill_tps': True,
+    'decode_tps': True,
+    'real_time_factor': False,
+    'items_per_s': True,
+    'latency_ms': False,
+}
+
+# default allowed relative regression per metric
+DEFAULT_THRESHOLDS: dict[str, float] = {
+    'ttft_ms': 0.2,
+    'prefill_tps': 0.2,
+    'decode_tps': 0.2,
+    'items_per_s': 0.2,
+}
+
+
+def from_profile(plugin: str, model: str, case: str, mode: str, round_no: int, profile: dict[str, Any]) -> row:
+    '''
+    Build a row from the `Profile` object the CLI prints per round in test mode.
+    TTFT is reported in microseconds, speeds in tokens per second.
+    '''
+    return {
+        'plugin': plugin,
+        'model': model,
+        'case': case,
+        'mode': mode,
+        'round': round_no,
+        'ttft_ms': _num(profile.get('TTFT'), 1e-3),
+        'prompt_tokens': profile.get('PromptTokens'),
+        'generated_tokens': profile.get('GeneratedTokens'),
+        'prefill_tps': _num(profile.get('PrefillSpeed')),
+        'decode_tps': _num(profile.get('DecodingSpeed')),
+        'real_time_factor': _num(profile.get('RealTimeFactor')),
+    }
+
+
+def from_points(plugin: str, model: str, case: str, points: list[dict[str, Any]]) -> list[row]:
+    '''
+    Build rows from the sweep points of a ServeCase, one "round" per point in
+    sweep order, with mode 'serve'. Latency is the median per request.
+    '''
+    return [
+        {
+            'plugin': plugin,
+            'model': model,
+            'case': case,
+            'mode': 'serve',
+            'round': i + 1,
+            'items_per_s': _num(p.get('items_per_s')),
+            'latency_ms': _num((p.get('latency_ms') or {}).get('p50')),
+        }
+        for i, p in enumerate(points)
+    ]
+
+
+def _num(v: Any, scale: float = 1.0) -> float | None:
+    # zero means the plugin did not report the metric
+    if not isinstance(v, (int, float)) or v == 0:
+        return None
+    return round(v * scale, 3)
+
+
+def write(rows: list[row], out_dir: pathlib.Path) -> None:
+    '''Write rows to metrics.csv and metrics.json in out_dir.'''
+    with open(out_dir / 'metrics.json', 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2)
+    with open(out_dir / 'metrics.csv', 'w', encoding='utf-8', newline='') as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS)
+        w.writeheader()
+        w.writerows(rows)
+
+
+def load(path: pathlib.Path) -> list[row]:
+    '''Load rows from a metrics.json (or a directory containing one).'''
+    if path.is_dir():
+        path = path / 'metrics.json'
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(rows: list[row], baseline: list[row], thresholds: dict[str, float]) -> list[str]:
+    '''
+    Compare rows against baseline rows with the same key.
+
+    A metric regresses when it is worse than the baseline by more than its
+    threshold, relative to the baseline value. Rows or metrics missing on either
+    side are skipped.
+
+    Returns:
+        One message per regression
+    '''
+    base = {tuple(r[k] for k in KEY): r for r in baseline}
+    regressions: list[str] = []
+    for r in rows:
+        b = base.get(tuple(r[k] for k in KEY))
+        if b is None:
+            continue
+        for metric, limit in thresholds.items():
+            cur, old = r.get(metric), b.get(metric)
+            if not cur or not old:
+                continue
+            change = (cur - old) / old
+            if DIRECTION.get(metric, True):
+                change = -change
+            if change > limit:
+                regressions.append(
+                    f'[{r["plugin"]}] [{r["model"]}] [{r["case"]}] {r["mode"]} round {r["round"]}: '
+                    f'{metric} {old} -> {cur} ({change:.1%} worse, limit {limit:.0%})'
+                )
+    return regressions
@@ -0,0 +1,136 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import json
+import pathlib
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Self
+
+import psutil
+
+INTERVAL = 0.1  # seconds between samples
+
+
+@dataclass
+class Usage:
+    wall_s: float = 0.0
+    peak_rss_mb: float = 0.0
+    cpu_user_s: float = 0.0
+    cpu_system_s: float = 0.0
+    peak_threads: int = 0
+    samples: int = 0
+    # split of wall_s, filled from the profile data when available
+    load_s: float | None = None
+    infer_s: float | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {k: round(v, 3) if isinstance(v, float) else v for k, v in asdict(self).items()}
+
+    def summary(self) -> str:
+        s = f'rss {self.peak_rss_mb:.0f}MB, cpu {self.cpu_user_s + self.cpu_system_s:.1f}s, wall {self.wall_s:.1f}s'
+        if self.load_s is not None and self.infer_s is not None:
+            s += f' (load {self.load_s:.1f}s, infer {self.infer_s:.1f}s)'
+        return s
+
+
+class TreeSampler:
+    '''
+    Samples the process trees under the given pids in a background thread.
+
+    RSS and thread count are summed over the tree and their peaks kept. CPU time
+    is summed per process since it was first seen, so a long running root (a
+    shared server) only counts the time spent during the sampling window.
+    '''
+
+    def __init__(self, pids: list[int], usage: Usage | None = None, interval: float = INTERVAL) -> None:
+        self.pids = pids
+        self.interval = interval
+        self.usage = usage if usage is not None else Usage()
+        self._cpu_start: dict[int, tuple[float, float]] = {}
+        self._cpu_last: dict[int, tuple[float, float]] = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._start = 0.0
+
+    def __enter__(self) -> Self:
+        self._start = time.perf_counter()
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.usage.wall_s = time.perf_counter() - self._start
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def _tree(self) -> list[psutil.Process]:
+        procs: list[psutil.Process] = []
+        for pid in self.pids:
+            try:
+                root = psutil.Process(pid)
+                procs += [root] + root.children(recursive=True)
+            except psutil.Error:
+                pass
+        return procs
+
+    def _sample(self) -> None:
+        rss = 0
+        threads = 0
+        for proc in self._tree():
+            try:
+                with proc.oneshot():
+                    rss += proc.memory_info().rss
+                    threads += proc.num_threads()
+                    cpu = proc.cpu_times()
+            except psutil.Error:
+                continue
+            self._cpu_start.setdefault(proc.pid, (cpu.user, cpu.system))
+            self._cpu_last[proc.pid] = (cpu.user, cpu.system)
+
+        u = self.usage
+        u.samples += 1
+        u.peak_rss_mb = max(u.peak_rss_mb, rss / 2**20)
+        u.peak_threads = max(u.peak_threads, threads)
+        u.cpu_user_s = sum(last[0] - self._cpu_start[pid][0] for pid, last in self._cpu_last.items())
+        u.cpu_system_s = sum(last[1] - self._cpu_start[pid][1] for pid, last in self._cpu_last.items())
+
+
+def collect(log_dir: pathlib.Path, reused: list[dict[str, Any]] | None = None) -> None:
+    '''
+    Gather the per-case *.resource.json files under log_dir into resources.csv.
+
+    reused lists cached results as written to cached.json. Their resource usage
+    is taken from the run that measured them, named in the cached_from column.
+    '''
+    with open(log_dir / 'resources.csv', 'w', encoding='utf-8', newline='') as f:
+        w = csv.DictWriter(f, fieldnames=['plugin', 'model', 'case', 'mode', *Usage().as_dict(), 'cached_from'])
+        w.writeheader()
+        for path in sorted(log_dir.rglob('*.resource.json')):
+            with open(path, encoding='utf-8') as rf:
+                w.writerow(json.load(rf))
+        for entry in reused or []:
+            source = pathlib.Path(entry['log_dir'])
+            keys = {(c['plugin'], c['model'], c['case']) for c in entry['cases']}
+            for path in sorted(source.rglob('*.resource.json')) if source.is_dir() else []:
+                with open(path, encoding='utf-8') as rf:
+                    r = json.load(rf)
+                if (r.get('plugin'), r.get('model'), r.get('case')) in keys:
+                    w.writerow({**r, 'cached_from': str(source)})
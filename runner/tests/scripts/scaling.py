@@ -0,0 +1,102 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import csv
+import math
+import pathlib
+from collections import defaultdict
+from typing import Any
+
+from cases.prefill_sweep import PrefillSweep
+
+from . import config, metrics
+
+FIELDS = ('plugin', 'model', 'mode', 'tokens', 'nctx', 'prompt_tokens', 'ttft_ms', 'prefill_tps')
+
+# TTFT growing faster than tokens^SUPERLINEAR is reported
+SUPERLINEAR = 1.3
+
+
+def _fit_exponent(points: list[tuple[float, float]]) -> float:
+    '''Least squares slope of log(y) over log(x).'''
+    xs = [math.log(x) for x, _ in points]
+    ys = [math.log(y) for _, y in points]
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else 0.0
+
+
+def curve(rows: list[metrics.row], testcases: list[config.case]) -> list[dict[str, Any]]:
+    '''The prefill sweep points among rows, ordered by model, mode, nctx and tokens.'''
+    sweeps = {
+        (plugin, model, tcc().name()): tcc
+        for plugin, model, _, tcs in testcases
+        for tcc in tcs
+        if issubclass(tcc, PrefillSweep)
+    }
+    points: list[dict[str, Any]] = []
+    for r in rows:
+        tcc = sweeps.get((r['plugin'], r['model'], r['case']))
+        if tcc is None or r['round'] != 1:
+            continue
+        points.append({
+            'plugin': r['plugin'],
+            'model': r['model'],
+            'mode': r['mode'],
+            'tokens': tcc.tokens,
+            'nctx': tcc.nctx,
+            'prompt_tokens': r['prompt_tokens'],
+            'ttft_ms': r['ttft_ms'],
+            'prefill_tps': r['prefill_tps'],
+        })
+    points.sort(key=lambda p: (p['plugin'], p['model'], p['mode'], p['nctx'], p['tokens']))
+    return points
+
+
+def summarize(points: list[dict[str, Any]]) -> list[str]:
+    '''
+    One line per (plugin, model, mode): the fitted exponent of TTFT over prompt
+    tokens (1 is linear, 2 quadratic) and how TTFT moves with nctx at a fixed
+    prompt length.
+    '''
+    groups: dict[tuple[str, str, str], list[dict[str, Any]]] = defaultdict(list)
+    for p in points:
+        if p['ttft_ms'] and (p['prompt_tokens'] or p['tokens']):
+            groups[(p['plugin'], p['model'], p['mode'])].append(p)
+
+    lines: list[str] = []
+    for (plugin, model, mode), ps in groups.items():
+        by_tokens = {p['prompt_tokens'] or p['tokens']: p['ttft_ms'] for p in ps}
+        msg = f'[{plugin}] [{model}] {mode}:'
+        if len(by_tokens) >= 3:
+            k = _fit_exponent(list(by_tokens.items()))
+            msg += f' TTFT ~ tokens^{k:.2f} over {min(by_tokens)}..{max(by_tokens)} tokens'
+            if k > SUPERLINEAR:
+                msg += ' (superlinear)'
+        by_nctx: dict[int, dict[int, float]] = defaultdict(dict)
+        for p in ps:
+            by_nctx[p['tokens']][p['nctx']] = p['ttft_ms']
+        for tokens, ttft in by_nctx.items():
+            if len(ttft) >= 2:
+                lo, hi = min(ttft), max(ttft)
+                msg += f'; {tokens} tokens: TTFT x{ttft[hi] / ttft[lo]:.2f} from nctx {lo} to {hi}'
+        lines.append(msg)
+    return lines
+
+
+def write(points: list[dict[str, Any]], out_dir: pathlib.Path) -> None:
+    with open(out_dir / 'prefill_scaling.csv', 'w', encoding='utf-8', newline='') as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS)
+        w.writeheader()
+        w.writerows(points)
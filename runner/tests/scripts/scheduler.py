@@ -0,0 +1,80 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+
+@dataclass
+class Job:
+    resource: str  # resource class, e.g. 'cpu', 'gpu', 'npu'
+    ram_gb: float  # estimated peak RAM while the job runs
+    fn: Callable[[], Any]
+    exclusive: bool = False  # runs with no other job running, e.g. performance measurements
+
+
+class Scheduler:
+    '''
+    Runs jobs concurrently within resource limits and yields results in submission order.
+
+    Each resource class has a number of slots (accelerators usually 1, so their jobs
+    run one at a time) and all running jobs share a RAM budget. A job that does not
+    fit waits; later jobs that do fit may start first. A job larger than the whole
+    budget still runs, but only when nothing else is running. An exclusive job
+    starts only when nothing else is running, and nothing starts next to it.
+    '''
+
+    def __init__(self, slots: dict[str, int], ram_budget_gb: float) -> None:
+        self.slots = slots
+        self.ram_budget_gb = ram_budget_gb
+
+    def _fits(self, job: Job, used: dict[str, int], ram: float, running: int, exclusive: bool) -> bool:
+        if exclusive or (job.exclusive and running > 0):
+            return False
+        if used[job.resource] >= self.slots.get(job.resource, 1):
+            return False
+        return running == 0 or ram + job.ram_gb <= self.ram_budget_gb
+
+    def run(self, jobs: list[Job]) -> Iterator[tuple[int, Any]]:
+        '''Yield (index, result) for every job, in the order of jobs.'''
+        pending = list(range(len(jobs)))
+        running: dict[Future[Any], int] = {}
+        finished: dict[int, Future[Any]] = {}
+        used: dict[str, int] = defaultdict(int)
+        ram = 0.0
+        next_out = 0
+
+        with ThreadPoolExecutor(max_workers=max(1, sum(self.slots.values()))) as pool:
+            while pending or running:
+                for i in list(pending):
+                    job = jobs[i]
+                    exclusive = any(jobs[j].exclusive for j in running.values())
+                    if self._fits(job, used, ram, len(running), exclusive):
+                        pending.remove(i)
+                        used[job.resource] += 1
+                        ram += job.ram_gb
+                        running[pool.submit(job.fn)] = i
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for f in done:
+                    i = running.pop(f)
+                    used[jobs[i].resource] -= 1
+                    ram -= jobs[i].ram_gb
+                    finished[i] = f
+
+                while next_out in finished:
+                    yield next_out, finished.pop(next_out).result()
+                    next_out += 1
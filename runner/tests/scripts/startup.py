@@ -0,0 +1,107 @@
+# Copyright 2024-2026 Nexa AI, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import time
+import urllib.request
+from typing import Any
+
+from . import fingerprint, utils
+
+# request that runs one minimal inference, per modal; modals without one only measure load
+_FIRST: dict[str, tuple[str, dict[str, Any]]] = {
+    'llm': ('/v1/chat/completions', {'messages': [{'role': 'user', 'content': 'hi'}], 'max_tokens': 1,
+                                     'ngl': 999, 'nctx': 4096}),
+    'vlm': ('/v1/chat/completions', {'messages': [{'role': 'user', 'content': 'hi'}], 'max_tokens': 1,
+                                     'ngl': 999, 'nctx': 4096}),
+    'embedder': ('/v1/embeddings', {'input': ['hi']}),
+    'reranker': ('/v1/reranking', {'query': 'hi', 'documents': ['hello']}),
+    'tts': ('/v1/audio/speech', {'input': 'hi', 'voice': ''}),
+}
+
+
+def model_files(model: str) -> list[pathlib.Path]:
+    d = fingerprint.models_dir() / model.split(':')[0]
+    return [p for p in d.rglob('*') if p.is_file()]
+
+
+def evict(files: list[pathlib.Path]) -> str:
+    '''
+    Drop files from the OS page cache where the platform allows it.
+
+    Returns:
+        The method used: 'drop_caches' (Linux, root), 'fadvise' (Linux, per file)
+        or 'none' when the cache could not be dropped
+    '''
+    if platform.system() != 'Linux':
+        return 'none'
+    try:
+        os.sync()
+        with open('/proc/sys/vm/drop_caches', 'w') as f:
+            f.write('3\n')
+        return 'drop_caches'
+    except OSError:
+        pass
+    evicted = False
+    for path in files:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            evicted = True
+        finally:
+            os.close(fd)
+    return 'fadvise' if evicted else 'none'
+
+
+def first_inference(host: str, model: str, modal: str, timeout: float = 600) -> bool:
+    '''
+    Run one minimal inference. Returns False if the modal has none defined.
+    '''
+    if modal not in _FIRST:
+        return False
+    path, extra = _FIRST[modal]
+    data = json.dumps({'model': model, **extra}).encode()
+    req = urllib.request.Request(f'http://{host}{path}', data=data, headers={'Content-Type': 'application/json'},
+                                 method='POST')
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        resp.read()
+    return True
+
+
+def measure(host: str, model: str, modal: str, serve: subprocess.Popen[str], started: float) -> dict[str, Any]:
+    '''
+    Time a freshly started server: until it answers, model load, and the first
+    inference. time_to_first_usable_s covers all three. Raises OSError on failure.
+    '''
+    res: dict[str, Any] = {}
+    if not utils.wait_server(host, serve):
+        raise OSError('server did not start')
+    now = time.perf_counter()
+    res['server_start_s'] = round(now - started, 3)
+
+    utils.warmup_model(host, model, modal)
+    res['load_s'] = round(time.perf_counter() - now, 3)
+
+    now = time.perf_counter()
+    if first_inference(host, model, modal):
+        res['first_inference_s'] = round(time.perf_counter() - now, 3)
+    res['time_to_first_usable_s'] = round(time.perf_counter() - started, 3)
+    return res
@@ -12,10 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
 import platform
 import shutil
+import socket
 import subprocess
+import time
+import urllib.request
 from pathlib import Path
 from typing import Any
 
@@ -46,6 +50,7 @@ def start_nexa(
     debug_log: bool = False,
     stdout: Any = subprocess.PIPE,
     stderr: Any = subprocess.PIPE,
+    env: dict[str, str] | None = None,
     **kwargs: Any,
 ) -> subprocess.Popen[str]:
     global nexa_path
@@ -53,7 +58,7 @@ def start_nexa(
     if nexa_path is None:
         nexa_path = _search_nexa()
 
-    env = os.environ.copy()
+    env = {**os.environ, **(env or {})}
     env['NEXA_LOG'] = 'trace' if debug_log else ''
     env['NO_COLOR'] = '1'
 
@@ -78,3 +83,61 @@ def execute_nexa(
     proc = start_nexa(args, debug_log=debug_log, **kwargs)
     stdout, stderr = proc.communicate(timeout=timeout)
     return subprocess.CompletedProcess(proc.args, proc.returncode, stdout, stderr)
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_server(host: str, proc: subprocess.Popen[str], timeout: float = 60) -> bool:
+    '''
+    Poll the server root until it answers, the process exits or timeout passes.
+    '''
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f'http://{host}/', timeout=2) as resp:
+                if resp.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.1)
+    return False
+
+
+# (path, json body) that loads a model without running inference, per modal;
+# llm/vlm send the CLI defaults of ngl/nctx so `nexa run` reuses the loaded model
+_WARMUP: dict[str, tuple[str, dict[str, Any]]] = {
+    'llm': ('/v1/chat/completions', {'messages': [], 'ngl': 999, 'nctx': 4096}),
+    'vlm': ('/v1/chat/completions', {'messages': [], 'ngl': 999, 'nctx': 4096}),
+    'embedder': ('/v1/embeddings', {'input': []}),
+    'reranker': ('/v1/reranking', {}),
+    'tts': ('/v1/audio/speech', {'input': '', 'voice': ''}),
+    'diarize': ('/v1/audio/diarize', {}),
+    'cv': ('/v1/cv', {}),
+    'image_gen': ('/v1/images/generations', {}),
+}
+
+
+def warmup_model(host: str, model: str, modal: str, timeout: float = 600) -> None:
+    '''
+    Load model into the server through the endpoint's warm-up path.
+
+    Raises:
+        OSError: If the request fails or the server answers with an error status
+    '''
+    if modal == 'asr':
+        # multipart form with a model and no file
+        boundary = 'nexa-warmup'
+        body = f'--{boundary}\r\nContent-Disposition: form-data; name="model"\r\n\r\n{model}\r\n--{boundary}--\r\n'
+        path, data, ctype = '/v1/audio/transcriptions', body.encode(), f'multipart/form-data; boundary={boundary}'
+    else:
+        path, extra = _WARMUP[modal]
+        data, ctype = json.dumps({'model': model, **extra}).encode(), 'application/json'
+    req = urllib.request.Request(f'http://{host}{path}', data=data, headers={'Content-Type': ctype}, method='POST')
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        resp.read()
@@ -14,7 +14,10 @@
 
 # !/usr/bin/env python3
 
+import base64
 from typing import Union, List
+
+import numpy as np
 from openai import OpenAI
 
 
@@ -46,8 +49,8 @@ class NexaClient:
             input: Single text string, image path, or list of texts/image paths
             
         Returns:
-            list of embeddings. If single input, returns 1D list.
-            If list input, returns 2D list with shape (len(input), embedding_dim).
+            float32 numpy array. If single input, returns shape (embedding_dim,).
+            If list input, returns shape (len(input), embedding_dim).
         """
         if isinstance(input, str):
             input_list = [input]
@@ -57,13 +60,16 @@ class NexaClient:
             single_input = False
         
         try:
+            # Ask for base64 explicitly so the SDK hands back the raw strings
+            # and we decode the little-endian float32 bytes with np.frombuffer.
             response = self.client.embeddings.create(
                 model=self.model,
                 input=input_list,
-                encoding_format="float"
+                encoding_format="base64"
             )
             
-            embeddings = [item.embedding for item in response.data]
+            items = sorted(response.data, key=lambda item: item.index)
+            embeddings = np.stack([self._decode(item.embedding) for item in items])
             
             if single_input:
                 return embeddings[0]
@@ -72,3 +78,10 @@ class NexaClient:
         except Exception as e:
             raise RuntimeError(f"Failed to get embedding from Nexa API: {e}")
 
+    @staticmethod
+    def _decode(embedding) -> np.ndarray:
+        """Decode a base64 float32 vector; older servers still answer with float lists."""
+        if isinstance(embedding, str):
+            return np.frombuffer(base64.b64decode(embedding), dtype="<f4")
+        return np.asarray(embedding, dtype=np.float32)
+
@@ -18,6 +18,8 @@ from dataclasses import dataclass
 from typing import List
 from pathlib import Path
 
+import numpy as np
+
 from nexa_client import NexaClient
 
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tiff', '.tif'}
@@ -105,14 +107,13 @@ class NexaImageSearch:
         print(f"Calculating embedding for query: {query}")
         query_embedding = self.client.get_embedding(query)
         
-        distances = []
-        for image_path, image_embedding in self._image_embeddings.items():
-            if metric == "l2":
-                distance = sum((q - i) ** 2 for q, i in zip(query_embedding, image_embedding)) ** 0.5
-            else:
-                raise ValueError(f"Unsupported metric: {metric}. Only 'l2' is supported.")
-            
-            distances.append((image_path, distance))
+        if metric != "l2":
+            raise ValueError(f"Unsupported metric: {metric}. Only 'l2' is supported.")
+        
+        paths = list(self._image_embeddings.keys())
+        matrix = np.stack(list(self._image_embeddings.values()))
+        l2 = np.linalg.norm(matrix - query_embedding, axis=1)
+        distances = [(path, float(d)) for path, d in zip(paths, l2)]
         
         # Sort by distance (smaller is better) and get top-k
         distances.sort(key=lambda x: x[1])